@@ -5,21 +5,33 @@ Provides structured data loading with validation for Mission Control dashboard.
 Supports JSON data sources with fallback to markdown files.
 """
 
+import base64
+import hashlib
+import heapq
 import json
+import math
 import os
 import re
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Iterator, Optional
 from datetime import datetime
 
 # Try to import jsonschema for validation
 try:
-    from jsonschema import validate, ValidationError as JSONSchemaValidationError
+    from jsonschema import ValidationError as JSONSchemaValidationError
+    from jsonschema.exceptions import best_match
+    from jsonschema.validators import validator_for
     HAS_JSONSCHEMA = True
 except ImportError:
     HAS_JSONSCHEMA = False
 
+from file_utils import write_json_atomic
+
 # Base paths - Docker-friendly
+APP_DIR = Path(__file__).resolve().parent
 WORKSPACE_ROOT = Path("/Users/raitsai/.openclaw/workspace")
 PORTFOLIO_DIR = WORKSPACE_ROOT / "portfolio"
 
@@ -33,11 +45,37 @@ else:
     SCHEMAS_DIR = PORTFOLIO_DIR / "schemas"
     ANALYSES_DIR = DATA_DIR / "analyses"
 
+# Persistent index of the analyses/ directory (see update_analysis_manifest)
+ANALYSES_MANIFEST_FILE = DATA_DIR / "analyses_manifest.json"
+
+# Parsed markdown fallbacks, cached as JSON (see _load_compiled_markdown)
+COMPILED_DIR = DATA_DIR / "compiled"
+
+# Storage engine: 'json' (one file per domain, the default) or 'sqlite'
+# (storage_sqlite; import the JSON files first with
+# `python storage_sqlite.py import`)
+STORAGE_BACKEND = os.environ.get("MC_STORAGE", "json").lower()
+SQLITE_FILE = Path(os.environ.get("MC_SQLITE_FILE", str(DATA_DIR / "mission_control.db")))
+
+if STORAGE_BACKEND == "sqlite":
+    from storage_sqlite import DOCUMENT_FILES, SQLiteStore
+    _store = SQLiteStore(SQLITE_FILE)
+else:
+    DOCUMENT_FILES = {}
+    _store = None
+
 # Ensure directories exist
+_ensured_dirs = None
+
 def _ensure_dirs():
-    """Ensure all required directories exist."""
-    for dir_path in [DATA_DIR, SCHEMAS_DIR, ANALYSES_DIR]:
+    """Ensure all required directories exist (created once per process, not per load)."""
+    global _ensured_dirs
+    dirs = (DATA_DIR, SCHEMAS_DIR, ANALYSES_DIR)
+    if dirs == _ensured_dirs:
+        return
+    for dir_path in dirs:
         dir_path.mkdir(parents=True, exist_ok=True)
+    _ensured_dirs = dirs
 
 # ============================================================================
 # SCHEMAS
@@ -216,79 +254,432 @@ SCHEMAS = {
     "holdings": HOLDING_SCHEMA,
     "analyses": ANALYSIS_SCHEMA,
     "earnings": EARNINGS_SCHEMA,
+    "earnings_list": {"type": "array", "items": EARNINGS_SCHEMA},
     "schedule": SCHEDULE_SCHEMA,
     "ideas": IDEA_SCHEMA,
     "corporate": CORPORATE_SCHEMA
 }
 
+# Compiled validators and memoized validation results
+VALIDATION_MEMO_MAX = 4096
+
+_validators: dict[str, tuple] = {}  # name -> (file version or None, validator)
+_validation_memo: "OrderedDict[tuple, tuple[bool, Optional[str]]]" = OrderedDict()
+_validator_lock = threading.Lock()
+_validation_stats = {"compiled": 0, "validated": 0, "skipped": 0}
+
+# ============================================================================
+# FILE CACHE
+# ============================================================================
+
+# Parsed JSON documents are kept in memory keyed on (path, mtime_ns, size) so
+# dashboard polling doesn't re-read and re-parse files that haven't changed.
+# A hit returns the cached object itself, so loaders treat documents as
+# read-only and copy (_copy_json) anything they modify. The byte budget is
+# measured in on-disk size; least recently used entries are evicted first
+# once it is exceeded.
+FILE_CACHE_MAX_BYTES = int(os.environ.get("MC_FILE_CACHE_BYTES", 64 * 1024 * 1024))
+
+_MISSING = object()
+
+_file_cache: "OrderedDict[str, tuple]" = OrderedDict()  # path -> (key, data, size, digest)
+_file_cache_bytes = 0
+_file_cache_lock = threading.Lock()
+_file_cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def _copy_json(obj: Any) -> Any:
+    """Copy a parsed JSON value (much cheaper than copy.deepcopy)."""
+    if isinstance(obj, dict):
+        return {k: _copy_json(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_copy_json(v) for v in obj]
+    return obj
+
+
+def _cache_get(filepath: Path, key: tuple) -> Any:
+    """Return cached (data, digest) for filepath if its (mtime_ns, size) still match."""
+    path = str(filepath)
+    with _file_cache_lock:
+        entry = _file_cache.get(path)
+        if entry is not None and entry[0] == key:
+            _file_cache.move_to_end(path)
+            _file_cache_stats["hits"] += 1
+            return entry[1], entry[3]
+        _file_cache_stats["misses"] += 1
+        return _MISSING
+
+
+def _cache_put(filepath: Path, key: tuple, data: Any, size: int, digest: str) -> None:
+    """Store parsed data for filepath, evicting LRU entries over budget."""
+    global _file_cache_bytes
+    
+    if size > FILE_CACHE_MAX_BYTES:
+        return
+    
+    path = str(filepath)
+    with _file_cache_lock:
+        old = _file_cache.pop(path, None)
+        if old is not None:
+            _file_cache_bytes -= old[2]
+        _file_cache[path] = (key, data, size, digest)
+        _file_cache_bytes += size
+        while _file_cache_bytes > FILE_CACHE_MAX_BYTES and _file_cache:
+            _, evicted = _file_cache.popitem(last=False)
+            _file_cache_bytes -= evicted[2]
+            _file_cache_stats["evictions"] += 1
+
+
+def get_cache_stats() -> dict:
+    """
+    Get file cache and validation counters.
+    
+    Returns:
+        Dict with hits, misses, evictions, entries, bytes, max_bytes and
+        a 'validation' sub-dict.
+    """
+    with _file_cache_lock:
+        stats = {
+            **_file_cache_stats,
+            "entries": len(_file_cache),
+            "bytes": _file_cache_bytes,
+            "max_bytes": FILE_CACHE_MAX_BYTES
+        }
+    with _validator_lock:
+        stats["validation"] = {**_validation_stats, "memo_entries": len(_validation_memo)}
+    return stats
+
+
+def clear_cache() -> None:
+    """Drop all cached files, compiled validators and memoized results."""
+    global _file_cache_bytes
+    
+    with _file_cache_lock:
+        _file_cache.clear()
+        _file_cache_bytes = 0
+        for name in _file_cache_stats:
+            _file_cache_stats[name] = 0
+    with _validator_lock:
+        _validators.clear()
+        _validation_memo.clear()
+        for name in _validation_stats:
+            _validation_stats[name] = 0
+
+
 # ============================================================================
 # UTILITY FUNCTIONS
 # ============================================================================
 
-def _validate_data(data: Any, schema_name: str) -> tuple[bool, Optional[str]]:
+def _content_digest(content: bytes) -> str:
+    """Short content hash used to key the validation memo."""
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def _get_validator(schema_name: str) -> Optional[tuple]:
+    """
+    Get the compiled validator for a schema, compiling it on first use.
+    
+    Looks in SCHEMAS first, then SCHEMAS_DIR/<name>.schema.json
+    (re-compiled when the file changes).
+    
+    Returns:
+        Tuple of (schema_version, validator), or None if no schema is registered.
+    """
+    if schema_name in SCHEMAS:
+        schema_path, version = None, None
+    else:
+        schema_path = SCHEMAS_DIR / f"{schema_name}.schema.json"
+        try:
+            st = schema_path.stat()
+        except OSError:
+            return None
+        version = (st.st_mtime_ns, st.st_size)
+    
+    with _validator_lock:
+        entry = _validators.get(schema_name)
+        if entry is not None and entry[0] == version:
+            return entry
+    
+    if schema_path is None:
+        schema = SCHEMAS[schema_name]
+    else:
+        schema, error = _load_json_file(schema_path)
+        if schema is None:
+            return None
+    
+    cls = validator_for(schema)
+    cls.check_schema(schema)
+    validator = cls(schema)
+    
+    entry = (version, validator)
+    with _validator_lock:
+        _validators[schema_name] = entry
+        _validation_stats["compiled"] += 1
+    return entry
+
+
+def _validate_data(data: Any, schema_name: str, digest: Optional[str] = None) -> tuple[bool, Optional[str]]:
     """
     Validate data against a schema.
     
+    Results are memoized on (schema, schema version, content digest), so a
+    document that has already been validated is not checked again. Pass the
+    digest from _load_json_document when available; otherwise one is
+    computed from the data.
+    
     Returns:
         Tuple of (is_valid, error_message)
     """
     if not HAS_JSONSCHEMA:
         return True, None  # Skip validation if jsonschema not available
     
-    schema = SCHEMAS.get(schema_name)
-    if not schema:
-        return True, None  # No schema found, skip validation
-    
     try:
-        validate(instance=data, schema=schema)
-        return True, None
+        entry = _get_validator(schema_name)
+        if entry is None:
+            return True, None  # No schema found, skip validation
+        version, validator = entry
+        
+        if digest is None:
+            digest = _content_digest(json.dumps(data, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8'))
+        memo_key = (schema_name, version, digest)
+        
+        with _validator_lock:
+            result = _validation_memo.get(memo_key)
+            if result is not None:
+                _validation_memo.move_to_end(memo_key)
+                _validation_stats["skipped"] += 1
+                return result
+        
+        error = best_match(validator.iter_errors(data))
+        if error is None:
+            result = (True, None)
+        else:
+            result = (False, f"Validation error: {error.message} at {list(error.path)}")
+        
+        with _validator_lock:
+            _validation_memo[memo_key] = result
+            _validation_stats["validated"] += 1
+            while len(_validation_memo) > VALIDATION_MEMO_MAX:
+                _validation_memo.popitem(last=False)
+        return result
     except JSONSchemaValidationError as e:
         return False, f"Validation error: {e.message} at {list(e.path)}"
     except Exception as e:
         return False, f"Unexpected validation error: {str(e)}"
 
 
-def _load_json_file(filepath: Path) -> tuple[Optional[Any], Optional[str]]:
+def _load_json_document(filepath: Path) -> tuple[Optional[Any], Optional[str], Optional[str]]:
     """
-    Load and parse a JSON file.
+    Load and parse a JSON file along with a digest of its raw content.
+    
+    Unchanged files are served from the in-process file cache. The data is
+    shared with the cache and other callers: do not mutate it, copy it
+    with _copy_json first. With the SQLite backend, data documents and
+    analyses come from the database instead.
     
     Returns:
-        Tuple of (data, error_message)
+        Tuple of (data, content_digest, error_message)
     """
+    if _store is not None:
+        stored = _load_stored_document(filepath)
+        if stored is not None:
+            return stored
     try:
         if not filepath.exists():
-            return None, f"File not found: {filepath}"
+            return None, None, f"File not found: {filepath}"
         
-        with open(filepath, 'r', encoding='utf-8') as f:
+        with open(filepath, 'rb') as f:
+            st = os.fstat(f.fileno())
+            cache_key = (st.st_mtime_ns, st.st_size)
+            cached = _cache_get(filepath, cache_key)
+            if cached is not _MISSING:
+                return cached[0], cached[1], None
             content = f.read()
         
         if not content.strip():
-            return None, f"File is empty: {filepath}"
+            return None, None, f"File is empty: {filepath}"
         
         data = json.loads(content)
-        return data, None
+        digest = _content_digest(content)
+        _cache_put(filepath, cache_key, data, st.st_size, digest)
+        return data, digest, None
         
     except json.JSONDecodeError as e:
-        return None, f"Invalid JSON in {filepath}: {str(e)}"
+        return None, None, f"Invalid JSON in {filepath}: {str(e)}"
     except PermissionError:
-        return None, f"Permission denied reading {filepath}"
+        return None, None, f"Permission denied reading {filepath}"
     except Exception as e:
-        return None, f"Error loading {filepath}: {str(e)}"
+        return None, None, f"Error loading {filepath}: {str(e)}"
+
+
+def _load_stored_document(filepath: Path) -> Optional[tuple[Optional[Any], Optional[str], Optional[str]]]:
+    """
+    _load_json_document for a file the SQLite store holds, or None if it
+    does not hold that path. The digest is the stored version, which changes
+    on every write.
+    
+    Decoded documents go through the file cache keyed on that version, so
+    an unchanged document costs one indexed version lookup.
+    """
+    try:
+        if filepath.parent == DATA_DIR and filepath.name in DOCUMENT_FILES:
+            name = DOCUMENT_FILES[filepath.name]
+            current_version, load = _store.version, _store.load_document
+        elif filepath.parent == ANALYSES_DIR:
+            name = filepath.name
+            current_version, load = _store.analysis_version, _store.load_analysis
+        else:
+            return None
+        
+        version = current_version(name)
+        if version is not None:
+            cached = _cache_get(filepath, ("sqlite", version))
+            if cached is not _MISSING:
+                return cached[0], cached[1], None
+        data, version, size = load(name)
+    except Exception as e:
+        return None, None, f"Error loading {filepath.name} from {SQLITE_FILE}: {str(e)}"
+    if data is None:
+        return None, None, f"Not in {SQLITE_FILE}: {filepath.name}"
+    digest = f"sqlite:{'analyses/' if filepath.parent == ANALYSES_DIR else ''}{name}:{version}"
+    _cache_put(filepath, ("sqlite", version), data, size, digest)
+    return data, digest, None
+
+
+def _load_json_file(filepath: Path) -> tuple[Optional[Any], Optional[str]]:
+    """
+    Load and parse a JSON file.
+    
+    Returns:
+        Tuple of (data, error_message)
+    """
+    data, _, error = _load_json_document(filepath)
+    return data, error
+
+
+def _write_json_atomic(filepath: Path, data: Any) -> bool:
+    """
+    Write JSON via a temp file and rename, so readers never see a partial file.
+    
+    Returns:
+        True on success; failures are logged, not raised.
+    """
+    try:
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        write_json_atomic(filepath, data)
+        return True
+    except OSError as e:
+        print(f"Could not write {filepath}: {e}")
+        return False
+
+
+def _load_compiled_markdown(md_path: Path, name: str, compiler: Callable[[str], Any], version: int) -> Any:
+    """
+    Return compiler(markdown) for md_path, persisted as a JSON artifact.
+    
+    The compiler gets the file decoded as-is (no newline translation). The
+    artifact (COMPILED_DIR/<name>.json) is keyed on the markdown file's
+    content hash and the compiler version, so the markdown is only parsed
+    once per edit across restarts and workers. The file's (mtime_ns, size)
+    is recorded as well, so an untouched file costs one stat and a cached
+    JSON read.
+    """
+    st = md_path.stat()
+    artifact_path = COMPILED_DIR / f"{name}.json"
+    artifact, _ = _load_json_file(artifact_path)
+    if not isinstance(artifact, dict) or artifact.get("compiler_version") != version:
+        artifact = None
+    elif artifact.get("mtime") == st.st_mtime_ns and artifact.get("size") == st.st_size:
+        return artifact["data"]
+    
+    with open(md_path, 'rb') as f:
+        raw = f.read()
+    digest = _content_digest(raw)
+    
+    if artifact is not None and artifact.get("digest") == digest:
+        data = artifact["data"]  # Touched but unchanged
+    else:
+        data = compiler(raw.decode('utf-8'))
+    
+    _write_json_atomic(artifact_path, {
+        "compiler_version": version,
+        "source": str(md_path),
+        "digest": digest,
+        "mtime": st.st_mtime_ns,
+        "size": st.st_size,
+        "data": data
+    })
+    return data
+
+
+# Bump when a markdown parser's output changes, to invalidate compiled artifacts
+HOLDINGS_MD_COMPILER_VERSION = 1
+
+# Precompiled patterns for the markdown fallbacks
+_MD_TYPE_RE = re.compile(r'\*\*Type:\*\*\s*(.+)')
+_MD_BROKER_RE = re.compile(r'\*\*Broker:\*\*\s*(.+)')
+_MD_CASH_RE = re.compile(r'\|\s*Cash\s*\|\s*\$?([\d,\.]+)')
+_MD_ACCOUNT_META_LINES = 4  # lines after an account header searched for Type/Broker
 
 
 def _parse_markdown_holdings(md_content: str) -> dict:
     """
     Parse holdings data from unified_portfolio_tracker.md format.
     Fallback when JSON not available.
+    
+    Runs in a single pass: the Type/Broker lookahead after an account header
+    and the options table after an 'Options Positions' header are tracked as
+    open windows rather than re-scanned from each header.
     """
     accounts = []
     current_account = None
+    meta_windows = []  # [account, last line index]
+    option_scans = []  # [account, first line index, rows, is_open], in header order
+    open_scans = []
     
-    lines = md_content.split('\n')
-    i = 0
-    
-    while i < len(lines):
-        line = lines[i].strip()
+    for i, raw_line in enumerate(md_content.split('\n')):
+        line = raw_line.strip()
+        
+        # Type/Broker lines following an account header
+        if meta_windows:
+            if '**' in raw_line:
+                type_match = _MD_TYPE_RE.search(raw_line)
+                broker_match = _MD_BROKER_RE.search(raw_line)
+                for account, _ in meta_windows:
+                    if type_match:
+                        account['type'] = type_match.group(1).strip()
+                    if broker_match:
+                        account['broker'] = broker_match.group(1).strip()
+            meta_windows = [w for w in meta_windows if w[1] > i]
+        
+        # Options table rows, up to the next ## heading
+        for scan in open_scans:
+            if i < scan[1]:
+                continue
+            if not line.startswith('|') or line.startswith('|---'):
+                if line.startswith('##'):
+                    scan[3] = False
+                continue
+            parts = [p.strip() for p in line.split('|')]
+            if len(parts) >= 6 and parts[1] not in ['', 'Ticker', '—']:
+                try:
+                    option_type = parts[2].upper() if parts[2] else 'CALL'
+                    strike = float(parts[3].replace('$', '').replace(',', '')) if parts[3] else 0
+                    expiration = parts[4]
+                    contracts = int(parts[5]) if parts[5] else 0
+                    premium = float(parts[6].replace('$', '').replace(',', '')) if len(parts) > 6 and parts[6] else 0
+                    scan[2].append({
+                        'ticker': parts[1],
+                        'type': option_type,
+                        'strike': strike,
+                        'expiration': expiration,
+                        'contracts': contracts,
+                        'premium': premium
+                    })
+                except ValueError:
+                    pass
+        if open_scans and line.startswith('##'):
+            open_scans = [scan for scan in open_scans if scan[3]]
         
         # Match account header
         if line.startswith('## Account:'):
@@ -304,18 +695,13 @@ def _parse_markdown_holdings(md_content: str) -> dict:
                 'cash': 0.0,
                 'cash_equivalents': []
             }
-            
-            # Look for account type and broker in next lines
-            for j in range(i+1, min(i+5, len(lines))):
-                type_match = re.search(r'\*\*Type:\*\*\s*(.+)', lines[j])
-                broker_match = re.search(r'\*\*Broker:\*\*\s*(.+)', lines[j])
-                if type_match:
-                    current_account['type'] = type_match.group(1).strip()
-                if broker_match:
-                    current_account['broker'] = broker_match.group(1).strip()
+            meta_windows.append([current_account, i + _MD_ACCOUNT_META_LINES])
+        
+        if not current_account:
+            continue
         
         # Match stock holdings table rows
-        if current_account and line.startswith('|') and not line.startswith('| Ticker') and not line.startswith('|---'):
+        if line.startswith('|') and not line.startswith('| Ticker') and not line.startswith('|---'):
             parts = [p.strip() for p in line.split('|')]
             if len(parts) >= 4:
                 ticker = parts[1]
@@ -334,98 +720,533 @@ def _parse_markdown_holdings(md_content: str) -> dict:
                         pass
         
         # Match cash
-        cash_match = re.search(r'\|\s*Cash\s*\|\s*\$?([\d,\.]+)', line)
-        if cash_match and current_account:
-            try:
-                current_account['cash'] = float(cash_match.group(1).replace(',', ''))
-            except ValueError:
-                pass
-        
-        # Match options
-        if current_account and 'Options Positions' in line:
-            # Parse options in next lines
-            for j in range(i+2, len(lines)):
-                opt_line = lines[j].strip()
-                if not opt_line.startswith('|') or opt_line.startswith('|---'):
-                    if opt_line.startswith('##') or opt_line.startswith('###'):
-                        break
-                    continue
-                parts = [p.strip() for p in opt_line.split('|')]
-                if len(parts) >= 6 and parts[1] not in ['', 'Ticker', '—']:
-                    try:
-                        option_type = parts[2].upper() if parts[2] else 'CALL'
-                        strike = float(parts[3].replace('$', '').replace(',', '')) if parts[3] else 0
-                        expiration = parts[4]
-                        contracts = int(parts[5]) if parts[5] else 0
-                        premium = float(parts[6].replace('$', '').replace(',', '')) if len(parts) > 6 and parts[6] else 0
-                        current_account['options'].append({
-                            'ticker': parts[1],
-                            'type': option_type,
-                            'strike': strike,
-                            'expiration': expiration,
-                            'contracts': contracts,
-                            'premium': premium
-                        })
-                    except ValueError:
-                        pass
+        if 'Cash' in line:
+            cash_match = _MD_CASH_RE.search(line)
+            if cash_match:
+                try:
+                    current_account['cash'] = float(cash_match.group(1).replace(',', ''))
+                except ValueError:
+                    pass
         
-        i += 1
+        # Match options header; its table starts after the header row
+        if 'Options Positions' in line:
+            scan = [current_account, i + 2, [], True]
+            option_scans.append(scan)
+            open_scans.append(scan)
     
     if current_account:
         accounts.append(current_account)
     
+    for account, _, rows, _ in option_scans:
+        account['options'].extend(rows)
+    
     return {'accounts': accounts}
 
 
-def _parse_markdown_analyses(md_content: str) -> list:
+# Bump when the section index layout or extracted fields change
+ANALYSIS_MD_COMPILER_VERSION = 1
+
+_MD_SECTION_RE = re.compile(r'\n##\s+([A-Z]+)')
+_MD_ANALYZED_RE = re.compile(r'\*\*Analyzed:\*\*\s*(.+)')
+_MD_GRADE_RE = re.compile(r'\*\*Grade:\*\*\s*([A-D][+-]?)')
+_MD_SUMMARY_RE = re.compile(r'\*\*Verdict\*\*|\*\*Recommendation\*\*|### Recommendation')
+
+
+def _normalize_newlines(text: str) -> str:
+    """Translate CRLF and CR line endings to LF, as reading in text mode would."""
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
+
+def _markdown_analysis_fields(ticker: str, content: str) -> dict:
+    """Extract ticker, date, grade and summary from one analysis section."""
+    analysis = {
+        'ticker': ticker,
+        'date': '',
+        'grade': '',
+        'summary': ''
+    }
+    
+    # Extract date
+    date_match = _MD_ANALYZED_RE.search(content)
+    if date_match:
+        analysis['date'] = date_match.group(1).strip()
+    
+    # Extract grade
+    grade_match = _MD_GRADE_RE.search(content)
+    if grade_match:
+        analysis['grade'] = grade_match.group(1)
+    
+    # Extract summary
+    summary_match = _MD_SUMMARY_RE.search(content)
+    if summary_match:
+        start = summary_match.start()
+        end = content.find('\n##', start) if content.find('\n##', start) > 0 else len(content)
+        analysis['summary'] = content[start:end].strip()[:200] + '...'
+    
+    return analysis
+
+
+def _index_markdown_analyses(md_content: str) -> dict:
     """
-    Parse analyses from analysis_history.md.
-    Fallback when JSON not available.
+    Build the section index of analysis_history.md (## TICKER sections).
+    
+    md_content must be the file decoded without newline translation so that
+    the recorded byte offsets match the file on disk. Each section keeps the
+    extracted fields plus 'offset'/'length' of its bytes (header included),
+    which _read_markdown_section uses to load its content with a seek.
     """
-    analyses = []
+    matches = list(_MD_SECTION_RE.finditer(md_content))
+    sections = []
+    offset = len(md_content[:matches[0].start()].encode('utf-8')) if matches else 0
+    
+    for n, match in enumerate(matches):
+        end = matches[n + 1].start() if n + 1 < len(matches) else len(md_content)
+        length = len(md_content[match.start():end].encode('utf-8'))
+        content = _normalize_newlines(md_content[match.end():end])
+        sections.append({
+            **_markdown_analysis_fields(match.group(1), content),
+            'offset': offset,
+            'length': length
+        })
+        offset += length
+    
+    return {'sections': sections}
+
+
+def _read_markdown_section(f, section: dict) -> Optional[str]:
+    """
+    Read one indexed section's content from an open (binary) markdown file.
     
-    # Split by ticker sections (## TICKER pattern)
-    sections = re.split(r'\n##\s+([A-Z]+)', md_content)
-    
-    if len(sections) > 1:
-        for i in range(1, len(sections), 2):
-            ticker = sections[i]
-            content = sections[i + 1] if i + 1 < len(sections) else ''
-            
-            analysis = {
-                'ticker': ticker,
-                'date': '',
-                'grade': '',
-                'summary': '',
-                'content': content.strip()
-            }
-            
-            # Extract date
-            date_match = re.search(r'\*\*Analyzed:\*\*\s*(.+)', content)
-            if date_match:
-                analysis['date'] = date_match.group(1).strip()
-            
-            # Extract grade
-            grade_match = re.search(r'\*\*Grade:\*\*\s*([A-D][+-]?)', content)
-            if grade_match:
-                analysis['grade'] = grade_match.group(1)
-            
-            # Extract summary
-            summary_match = re.search(r'\*\*Verdict\*\*|\*\*Recommendation\*\*|### Recommendation', content)
-            if summary_match:
-                start = summary_match.start()
-                end = content.find('\n##', start) if content.find('\n##', start) > 0 else len(content)
-                analysis['summary'] = content[start:end].strip()[:200] + '...'
-            
-            analyses.append(analysis)
-    
-    return analyses
+    Returns:
+        The stripped section content, or None if the file no longer matches
+        the index.
+    """
+    f.seek(section['offset'])
+    try:
+        text = f.read(section['length']).decode('utf-8')
+    except UnicodeDecodeError:
+        return None
+    match = _MD_SECTION_RE.match(text)
+    if not match or match.group(1) != section['ticker']:
+        return None
+    return _normalize_newlines(text[match.end():]).strip()
+
+
+# ============================================================================
+# ANALYSES MANIFEST
+# ============================================================================
+
+# Light per-analysis fields kept in the manifest; 'content' and the other
+# heavy fields stay in the analysis files.
+MANIFEST_FIELDS = ("ticker", "date", "grade", "summary")
+MANIFEST_OPTIONAL_FIELDS = ("price_target", "entry", "current", "gain")
+MANIFEST_VERSION = 1
+
+# Archive query limits (see query_analyses)
+ANALYSIS_SORT_FIELDS = ("date", "ticker", "grade", "file")
+ANALYSIS_PAGE_SIZE = 50
+ANALYSIS_MAX_PAGE_SIZE = 500
+
+# Rescan interval for in-place edits, which don't touch the directory mtime
+MANIFEST_RESCAN_SECONDS = float(os.environ.get("MC_MANIFEST_RESCAN_SECONDS", 2.0))
+
+_manifest_entries: Optional[dict] = None  # file name -> manifest entry
+_manifest_generation = 0
+_manifest_scan: tuple = (None, 0.0)  # (directory mtime_ns, monotonic time) of last scan
+_manifest_lock = threading.Lock()
+
+
+def _scan_analyses_dir() -> dict[str, tuple[int, int]]:
+    """Map each *.json file name in ANALYSES_DIR to its (mtime_ns, size)."""
+    found = {}
+    try:
+        with os.scandir(ANALYSES_DIR) as it:
+            for dir_entry in it:
+                if dir_entry.name.endswith('.json') and dir_entry.is_file():
+                    st = dir_entry.stat()
+                    found[dir_entry.name] = (st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        pass
+    return found
+
+
+def _build_manifest_entry(name: str, mtime_ns: int, size: int) -> dict:
+    """Read one analysis file and extract its manifest entry."""
+    entry = {"file": name, "mtime": mtime_ns, "size": size}
+    
+    data, digest, error = _load_json_document(ANALYSES_DIR / name)
+    if data is None:
+        entry["_error"] = error
+        return entry
+    
+    is_valid, validation_error = _validate_data(data, "analyses", digest)
+    if not is_valid:
+        entry["_error"] = validation_error
+        return entry
+    
+    for field in MANIFEST_FIELDS:
+        entry[field] = data.get(field, '')
+    for field in MANIFEST_OPTIONAL_FIELDS:
+        if field in data:
+            entry[field] = data[field]
+    return entry
+
+
+def _write_manifest(entries: dict) -> None:
+    """Atomically persist the manifest (best effort)."""
+    _write_json_atomic(ANALYSES_MANIFEST_FILE, {
+        "version": MANIFEST_VERSION,
+        "updated": datetime.now().isoformat(),
+        "entries": [entries[name] for name in sorted(entries)]
+    })
+
+
+def _refresh_manifest(force: bool = False) -> tuple[int, dict]:
+    """
+    Bring the in-memory manifest up to date with ANALYSES_DIR.
+    
+    The directory is rescanned when its own mtime changes (files added,
+    removed or atomically replaced) and otherwise at most every
+    MANIFEST_RESCAN_SECONDS, which catches in-place edits.
+    
+    Returns:
+        Tuple of (generation, entries by file name). The generation changes
+        whenever any entry does. Callers must not mutate the entries.
+    """
+    global _manifest_entries, _manifest_generation, _manifest_scan
+    
+    if _store is not None:
+        return _refresh_stored_manifest()
+    
+    with _manifest_lock:
+        try:
+            dir_mtime = ANALYSES_DIR.stat().st_mtime_ns
+        except OSError:
+            dir_mtime = None
+        now = time.monotonic()
+        if (not force and _manifest_entries is not None and _manifest_scan[0] == dir_mtime
+                and now - _manifest_scan[1] < MANIFEST_RESCAN_SECONDS):
+            return _manifest_generation, _manifest_entries
+        
+        entries = _manifest_entries
+        if entries is None:
+            entries = {}
+            persisted, _ = _load_json_file(ANALYSES_MANIFEST_FILE)
+            if isinstance(persisted, dict) and persisted.get("version") == MANIFEST_VERSION:
+                for entry in persisted.get("entries", []):
+                    if isinstance(entry, dict) and "file" in entry:
+                        entries[entry["file"]] = entry
+        
+        on_disk = _scan_analyses_dir()
+        changed = entries.keys() - on_disk.keys()
+        updated = {}
+        for name, (mtime_ns, size) in on_disk.items():
+            entry = entries.get(name)
+            if entry is None or entry.get("mtime") != mtime_ns or entry.get("size") != size:
+                entry = _build_manifest_entry(name, mtime_ns, size)
+                changed.add(name)
+            updated[name] = entry
+        
+        if changed or (_manifest_entries is None and not ANALYSES_MANIFEST_FILE.exists()):
+            _write_manifest(updated)
+        if changed or _manifest_entries is None:
+            _manifest_generation += 1
+        _manifest_entries = updated
+        _manifest_scan = (dir_mtime, now)
+        
+        return _manifest_generation, updated
+
+
+_stored_manifest: tuple = (None, {})  # (store analyses version, entries by file name)
+
+
+def _refresh_stored_manifest() -> tuple[int, dict]:
+    """_refresh_manifest for the SQLite backend: entries come from the analyses table."""
+    global _stored_manifest, _manifest_generation
+    
+    with _manifest_lock:
+        version = _store.analyses_version()
+        if version != _stored_manifest[0]:
+            _stored_manifest = (version, {entry["file"]: entry for entry in _store.analysis_entries()})
+            _manifest_generation += 1
+        return _manifest_generation, _stored_manifest[1]
+
+
+def update_analysis_manifest(force: bool = False) -> list[dict]:
+    """
+    Bring the analyses manifest up to date with ANALYSES_DIR.
+    
+    Only files that are new or whose (mtime, size) changed are read; the
+    rest of the manifest is reused from memory or from the persisted
+    ANALYSES_MANIFEST_FILE.
+    
+    Args:
+        force: Rescan the directory even inside the rescan window
+        
+    Returns:
+        List of manifest entries sorted by file name. Entries for files that
+        failed to load or validate carry an '_error' key.
+    """
+    _, entries = _refresh_manifest(force)
+    return [dict(entries[name]) for name in sorted(entries)]
+
+
+# ============================================================================
+# ANALYSIS SEARCH INDEX
+# ============================================================================
+
+# In-process inverted index over the analyses/ files. Documents are
+# (re)indexed only when their manifest entry changes; queries are ranked
+# with BM25 over field-weighted term counts.
+SEARCH_FIELD_WEIGHTS = {"ticker": 3, "summary": 2, "content": 1, "scenarios": 1}
+SEARCH_STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it its of on or that the to was were will with".split()
+)
+SEARCH_BM25_K1 = 1.2
+SEARCH_BM25_B = 0.75
+SEARCH_SNIPPET_CHARS = 160
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+
+_search_docs: dict[str, dict] = {}  # file name -> {mtime, size, length, terms}
+_search_postings: dict[str, dict[str, int]] = {}  # term -> {file name: weighted tf}
+_search_total_length = 0
+_search_generation = None  # manifest generation the index was last synced to
+_search_lock = threading.Lock()
+
+
+def _tokenize(text: str) -> list[str]:
+    """Lowercase word tokens with stopwords removed."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in SEARCH_STOPWORDS]
+
+
+def _searchable_fields(data: dict) -> dict[str, str]:
+    """Extract the indexed text of an analysis document by field."""
+    scenarios = []
+    for scenario in data.get("scenarios") or []:
+        if isinstance(scenario, dict):
+            scenarios.extend(str(v) for v in scenario.values() if isinstance(v, str))
+    return {
+        "ticker": str(data.get("ticker", '')),
+        "summary": str(data.get("summary", '')),
+        "content": str(data.get("content", '')),
+        "scenarios": ' '.join(scenarios)
+    }
+
+
+def _unindex_document(name: str) -> None:
+    """Remove one document from the postings (caller holds _search_lock)."""
+    global _search_total_length
+    
+    doc = _search_docs.pop(name, None)
+    if doc is None:
+        return
+    _search_total_length -= doc["length"]
+    for term in doc["terms"]:
+        postings = _search_postings.get(term)
+        if postings is not None:
+            postings.pop(name, None)
+            if not postings:
+                del _search_postings[term]
+
+
+def _index_document(entry: dict) -> None:
+    """Read and index one analysis file (caller holds _search_lock)."""
+    global _search_total_length
+    
+    name = entry["file"]
+    data, _ = _load_json_file(ANALYSES_DIR / name)
+    terms: dict[str, int] = {}
+    if isinstance(data, dict):
+        for field, text in _searchable_fields(data).items():
+            weight = SEARCH_FIELD_WEIGHTS[field]
+            for token in _tokenize(text):
+                terms[token] = terms.get(token, 0) + weight
+    
+    length = sum(terms.values())
+    _search_docs[name] = {"mtime": entry["mtime"], "size": entry["size"], "length": length, "terms": tuple(terms)}
+    _search_total_length += length
+    for term, tf in terms.items():
+        _search_postings.setdefault(term, {})[name] = tf
+
+
+def update_search_index() -> dict[str, dict]:
+    """
+    Sync the search index with the analyses manifest.
+    
+    Returns:
+        Dict of file name -> manifest entry for every manifest file (entries
+        with '_error' are not indexed). Callers must not mutate the entries.
+    """
+    global _search_generation
+    
+    generation, manifest = _refresh_manifest()
+    
+    with _search_lock:
+        if generation == _search_generation:
+            return manifest
+        entries = {name: e for name, e in manifest.items() if "_error" not in e}
+        for name in list(_search_docs):
+            doc = _search_docs[name]
+            entry = entries.get(name)
+            if entry is None or entry["mtime"] != doc["mtime"] or entry["size"] != doc["size"]:
+                _unindex_document(name)
+        for name, entry in entries.items():
+            if name not in _search_docs:
+                _index_document(entry)
+        _search_generation = generation
+    
+    return manifest
+
+
+def _make_snippet(data: dict, terms: list[str]) -> str:
+    """Return a short excerpt around the first query term match."""
+    fields = _searchable_fields(data)
+    for field in ("summary", "content", "scenarios"):
+        text = fields[field]
+        lowered = text.lower()
+        positions = [pos for pos in (lowered.find(t) for t in terms) if pos >= 0]
+        if positions:
+            start = max(0, min(positions) - SEARCH_SNIPPET_CHARS // 3)
+            end = min(len(text), start + SEARCH_SNIPPET_CHARS)
+            snippet = ' '.join(text[start:end].split())
+            return ('...' if start > 0 else '') + snippet + ('...' if end < len(text) else '')
+    return fields["summary"][:SEARCH_SNIPPET_CHARS]
+
+
+def search_analyses(query: str, limit: int = 20) -> dict:
+    """
+    Full-text search over analysis ticker, summary, content and scenarios.
+    
+    Args:
+        query: Free-text query; documents matching more (and rarer) terms
+               rank higher
+        limit: Maximum number of hits to return
+        
+    Returns:
+        Dict with 'query', 'total' (number of matching documents) and 'hits',
+        each hit being the manifest fields plus 'score' and 'snippet'.
+    """
+    terms = list(dict.fromkeys(_tokenize(query or '')))
+    if not terms:
+        return {"query": query, "total": 0, "hits": []}
+    
+    entries = update_search_index()
+    
+    with _search_lock:
+        doc_count = len(_search_docs)
+        avg_length = (_search_total_length / doc_count) if doc_count else 0
+        scores: dict[str, float] = {}
+        for term in terms:
+            postings = _search_postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for name, tf in postings.items():
+                norm = SEARCH_BM25_K1 * (1 - SEARCH_BM25_B + SEARCH_BM25_B * _search_docs[name]["length"] / avg_length)
+                scores[name] = scores.get(name, 0.0) + idf * tf * (SEARCH_BM25_K1 + 1) / (tf + norm)
+    
+    top = heapq.nlargest(max(1, int(limit)), scores.items(), key=lambda item: (item[1], item[0]))
+    
+    hits = []
+    for name, score in top:
+        entry = entries.get(name, {"file": name})
+        data, _ = _load_json_file(ANALYSES_DIR / name)
+        hits.append({
+            **{k: entry[k] for k in ("file", *MANIFEST_FIELDS) if k in entry},
+            "score": round(score, 4),
+            "snippet": _make_snippet(data, terms) if isinstance(data, dict) else ''
+        })
+    
+    return {"query": query, "total": len(scores), "hits": hits}
+
+
+# ============================================================================
+# SOURCE VERSIONS
+# ============================================================================
+
+# Cheap identifiers for the files behind each loader, for callers (HTTP
+# conditional requests, view caches) that need to know whether a loader's
+# result could have changed without calling it. Each is built from stat()
+# results only, so it is the same in every worker process.
+
+_analyses_version = (None, None)  # (manifest generation, version)
+
+
+def _file_version(path: Path) -> Optional[tuple]:
+    """(path, mtime_ns, size) of a file, or None if it does not exist."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (str(path), st.st_mtime_ns, st.st_size)
+
+
+def get_holdings_version(use_markdown_fallback: bool = True) -> Optional[tuple]:
+    """
+    Identify the holdings source load_holdings would read, without reading it.
+    
+    Returns:
+        (path, mtime_ns, size) of holdings.json, or of the markdown fallback
+        when the JSON file is missing; None if neither exists.
+    """
+    if _store is not None:
+        return ("sqlite", str(SQLITE_FILE), "holdings", _store.version("holdings"))
+    version = _file_version(DATA_DIR / "holdings.json")
+    if version is None and use_markdown_fallback:
+        version = _file_version(PORTFOLIO_DIR / "unified_portfolio_tracker.md")
+    return version
+
+
+def get_analyses_version() -> str:
+    """
+    Digest of the analysis archive's manifest (file names, mtimes, sizes)
+    plus the markdown fallback file's stats.
+    """
+    global _analyses_version
+    generation, entries = _refresh_manifest()
+    cached_generation, digest = _analyses_version
+    if cached_generation != generation:
+        listing = [(name, entries[name].get("mtime"), entries[name].get("size")) for name in sorted(entries)]
+        digest = _content_digest(json.dumps(listing).encode())
+        _analyses_version = (generation, digest)
+    return f"{digest}:{_file_version(PORTFOLIO_DIR / 'analysis_history.md')}"
+
+
+def get_source_version(name: str) -> Any:
+    """
+    Version of a loader's source data, without loading it.
+    
+    Args:
+        name: 'holdings', 'analyses', 'earnings', 'schedule', 'ideas',
+            'corporate' or 'api_usage'
+    
+    Returns:
+        A hashable value that changes whenever the source files change.
+    """
+    if name == "holdings":
+        return get_holdings_version()
+    if name == "analyses":
+        return get_analyses_version()
+    files = {
+        "earnings": "earnings.json",
+        "schedule": "schedule.json",
+        "ideas": "ideas.json",
+        "corporate": "corporate.json",
+        "api_usage": "api_usage.json",
+    }
+    if name not in files:
+        raise ValueError(f"Unknown data source: {name}")
+    if _store is not None:
+        return ("sqlite", str(SQLITE_FILE), name, _store.version(name))
+    return _file_version(DATA_DIR / files[name])
 
 
 # ============================================================================
 # MAIN DATA LOADING FUNCTIONS
 # ============================================================================
 
+
 def load_holdings(use_markdown_fallback: bool = True) -> dict:
     """
     Load portfolio holdings data.
@@ -440,10 +1261,10 @@ def load_holdings(use_markdown_fallback: bool = True) -> dict:
     md_path = PORTFOLIO_DIR / "unified_portfolio_tracker.md"
     
     # Try JSON first
-    data, error = _load_json_file(json_path)
+    data, digest, error = _load_json_document(json_path)
     
     if data is not None:
-        is_valid, validation_error = _validate_data(data, "holdings")
+        is_valid, validation_error = _validate_data(data, "holdings", digest)
         if is_valid:
             return data
         else:
@@ -453,12 +1274,12 @@ def load_holdings(use_markdown_fallback: bool = True) -> dict:
                 "_source": str(json_path)
             }
     
-    # Fallback to markdown
+    # Fallback to markdown (parsed once per edit)
     if use_markdown_fallback and md_path.exists():
         try:
-            with open(md_path, 'r', encoding='utf-8') as f:
-                md_content = f.read()
-            data = _parse_markdown_holdings(md_content)
+            data = _load_compiled_markdown(md_path, "unified_portfolio_tracker",
+                                           lambda text: _parse_markdown_holdings(_normalize_newlines(text)),
+                                           HOLDINGS_MD_COMPILER_VERSION)
             return {
                 **data,
                 "_warning": "Parsed from markdown (JSON not found)",
@@ -477,6 +1298,83 @@ def load_holdings(use_markdown_fallback: bool = True) -> dict:
     }
 
 
+def _markdown_section_key(section: dict) -> str:
+    """
+    load_analysis key of a markdown section: 'TICKER@offset'.
+    
+    A ticker can have several sections (one per analysis), so the ticker
+    alone does not identify one. The key stands in for the file name.
+    """
+    return f"{section['ticker']}@{section['offset']}"
+
+
+def _iter_markdown_analyses(sections: list, with_content: bool = True) -> Iterator[dict]:
+    """Yield analyses for indexed sections, reading content lazily by offset."""
+    if not with_content:
+        for section in sections:
+            yield {'file': _markdown_section_key(section),
+                   **{k: section[k] for k in ('ticker', 'date', 'grade', 'summary')}}
+        return
+    
+    md_path = PORTFOLIO_DIR / "analysis_history.md"
+    with open(md_path, 'rb') as f:
+        for section in sections:
+            content = _read_markdown_section(f, section)
+            if content is None:
+                continue
+            yield {
+                'file': _markdown_section_key(section),
+                **{k: section[k] for k in ('ticker', 'date', 'grade', 'summary')},
+                'content': content
+            }
+
+
+def _load_markdown_sections() -> list:
+    """Get the section index of analysis_history.md (built once per file version)."""
+    md_path = PORTFOLIO_DIR / "analysis_history.md"
+    index = _load_compiled_markdown(md_path, "analysis_history", _index_markdown_analyses,
+                                    ANALYSIS_MD_COMPILER_VERSION)
+    return index.get('sections', [])
+
+
+def _load_markdown_analyses(errors: list, with_content: bool = True) -> Optional[dict]:
+    """
+    Load analysis_history.md as a fallback; appends to errors on failure.
+    
+    Listing (with_content=False) only needs the section index, not the file.
+    """
+    md_path = PORTFOLIO_DIR / "analysis_history.md"
+    if md_path.exists():
+        try:
+            analyses = list(_iter_markdown_analyses(_load_markdown_sections(), with_content))
+            if analyses:
+                return {
+                    "_analyses": analyses,
+                    "_warning": "Parsed from markdown (JSON not found)",
+                    "_source": str(md_path)
+                }
+        except Exception as e:
+            errors.append(f"Markdown fallback failed: {str(e)}")
+    return None
+
+
+def _load_markdown_analysis(key: str) -> Optional[dict]:
+    """
+    Load one section of analysis_history.md with a single seek.
+    
+    key is a section key ('TICKER@offset'); a bare ticker loads that
+    ticker's first section.
+    """
+    md_path = PORTFOLIO_DIR / "analysis_history.md"
+    if not md_path.exists():
+        return None
+    ticker, _, offset = key.partition('@')
+    for section in _load_markdown_sections():
+        if section['ticker'] == ticker and (not offset or str(section['offset']) == offset):
+            return next(_iter_markdown_analyses([section]), None)
+    return None
+
+
 def load_analyses(use_markdown_fallback: bool = True) -> list:
     """
     Load stock analyses data.
@@ -489,41 +1387,70 @@ def load_analyses(use_markdown_fallback: bool = True) -> list:
     analyses = []
     errors = []
     
-    # Try individual JSON files in analyses/ directory
-    if ANALYSES_DIR.exists():
-        for json_file in sorted(ANALYSES_DIR.glob("*.json")):
-            data, error = _load_json_file(json_file)
-            if data is not None:
-                is_valid, validation_error = _validate_data(data, "analyses")
-                if is_valid:
-                    analyses.append({
-                        **data,
-                        "_source": str(json_file.name)
-                    })
-                else:
-                    errors.append(f"{json_file.name}: {validation_error}")
+    # Try individual JSON files in analyses/ directory (or the SQLite table)
+    if _store is not None:
+        json_files = [ANALYSES_DIR / name for name in sorted(_refresh_manifest()[1])]
+    else:
+        json_files = sorted(ANALYSES_DIR.glob("*.json")) if ANALYSES_DIR.exists() else []
+    for json_file in json_files:
+        data, digest, error = _load_json_document(json_file)
+        if data is not None:
+            is_valid, validation_error = _validate_data(data, "analyses", digest)
+            if is_valid:
+                analyses.append({
+                    **data,
+                    "_source": str(json_file.name)
+                })
             else:
-                errors.append(f"{json_file.name}: {error}")
+                errors.append(f"{json_file.name}: {validation_error}")
+        else:
+            errors.append(f"{json_file.name}: {error}")
     
     if analyses:
         return analyses
     
     # Fallback to markdown
     if use_markdown_fallback:
-        md_path = PORTFOLIO_DIR / "analysis_history.md"
-        if md_path.exists():
-            try:
-                with open(md_path, 'r', encoding='utf-8') as f:
-                    md_content = f.read()
-                analyses = _parse_markdown_analyses(md_content)
-                if analyses:
-                    return {
-                        "_analyses": analyses,
-                        "_warning": "Parsed from markdown (JSON not found)",
-                        "_source": str(md_path)
-                    }
-            except Exception as e:
-                errors.append(f"Markdown fallback failed: {str(e)}")
+        fallback = _load_markdown_analyses(errors)
+        if fallback:
+            return fallback
+    
+    if errors:
+        return [{"_error": "; ".join(errors), "_count": 0}]
+    
+    return []
+
+
+def load_analysis_summaries(use_markdown_fallback: bool = True) -> list:
+    """
+    Load the analyses list from the manifest, without the heavy fields.
+    
+    Same return shape as load_analyses(), but each item is a manifest entry
+    (ticker, date, grade, summary, file, mtime, size). Use load_analysis()
+    to fetch a full document.
+    
+    Returns:
+        List of manifest entries, possibly with metadata.
+    """
+    _ensure_dirs()
+    
+    analyses = []
+    errors = []
+    
+    for entry in update_analysis_manifest():
+        if "_error" in entry:
+            errors.append(f"{entry['file']}: {entry['_error']}")
+        else:
+            analyses.append(entry)
+    
+    if analyses:
+        return analyses
+    
+    # Fallback to markdown (section index only)
+    if use_markdown_fallback:
+        fallback = _load_markdown_analyses(errors, with_content=False)
+        if fallback:
+            return fallback
     
     if errors:
         return [{"_error": "; ".join(errors), "_count": 0}]
@@ -531,6 +1458,230 @@ def load_analyses(use_markdown_fallback: bool = True) -> list:
     return []
 
 
+def load_analysis(key: str) -> Optional[dict]:
+    """
+    Load a single full analysis document, including content.
+    
+    Args:
+        key: File name as listed in the manifest (e.g. 'AAPL_2024-01-15.json'),
+             or, when the archive comes from the markdown fallback, the
+             section key listed as 'file' (e.g. 'AAPL@1042') or a ticker.
+        
+    Returns:
+        The analysis dict, a dict with '_error' if it failed to load or
+        validate, or None if not found.
+    """
+    if not key or Path(key).name != key:
+        return None
+    
+    if not key.endswith('.json'):
+        return _load_markdown_analysis(key)
+    
+    json_file = ANALYSES_DIR / key
+    if _store is not None:
+        exists = key in _refresh_manifest()[1]
+    else:
+        exists = json_file.is_file()
+    if not exists:
+        return None
+    
+    data, digest, error = _load_json_document(json_file)
+    if data is None:
+        return {"_error": error, "_source": key}
+    
+    is_valid, validation_error = _validate_data(data, "analyses", digest)
+    if not is_valid:
+        return {"_error": validation_error, "_source": key}
+    
+    return {**data, "_source": key}
+
+
+def _encode_cursor(sort_key: tuple) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(sort_key)).encode('utf-8')).decode('ascii')
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        value = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        if not isinstance(value, list) or len(value) != 2:
+            raise ValueError
+        return tuple(str(v) for v in value)
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+def _analysis_matcher(ticker: Optional[str], grade: Optional[str],
+                      date_from: Optional[str], date_to: Optional[str]) -> Callable[[dict], bool]:
+    """Build the archive filter predicate shared by query_analyses and iter_analyses."""
+    tickers = {t.strip().upper() for t in ticker.split(',') if t.strip()} if ticker else None
+    grades = {g.strip() for g in grade.split(',') if g.strip()} if grade else None
+    
+    def matches(entry: dict) -> bool:
+        if tickers is not None and str(entry.get("ticker", '')).upper() not in tickers:
+            return False
+        if grades is not None and entry.get("grade") not in grades:
+            return False
+        date = str(entry.get("date", ''))
+        if date_from and date < date_from:
+            return False
+        if date_to and date[:len(date_to)] > date_to:
+            return False
+        return True
+    
+    return matches
+
+
+def _analysis_sort(sort: str) -> tuple[Callable[[dict], tuple], bool]:
+    """
+    Sort key and direction for an archive sort spec (e.g. '-date').
+    
+    'file' (a file name, or a markdown section key) is unique, so the key
+    never ties: a cursor never skips or repeats entries that share the sort
+    field.
+    
+    Raises:
+        ValueError: On an unknown sort field.
+    """
+    sort_field = sort.lstrip('-+')
+    if sort_field not in ANALYSIS_SORT_FIELDS:
+        raise ValueError(f"Invalid sort field: {sort_field}")
+    
+    def sort_key(entry):
+        return (str(entry.get(sort_field, '')), str(entry.get("file", '')))
+    
+    return sort_key, sort.startswith('-')
+
+
+def query_analyses(ticker: Optional[str] = None, grade: Optional[str] = None,
+                   date_from: Optional[str] = None, date_to: Optional[str] = None,
+                   sort: str = "-date", limit: int = ANALYSIS_PAGE_SIZE,
+                   cursor: Optional[str] = None, fields: Optional[list[str]] = None,
+                   use_markdown_fallback: bool = True) -> dict:
+    """
+    Query the analysis archive with filtering, keyset pagination and projection.
+    
+    Works on manifest entries (or the markdown section index), so no
+    analysis document is opened. Use load_analysis() for the full document.
+    
+    Args:
+        ticker: Comma-separated tickers to include (case-insensitive)
+        grade: Comma-separated grades to include (exact match, e.g. 'A,A-')
+        date_from: Earliest date to include (inclusive, ISO format)
+        date_to: Latest date to include (inclusive, ISO format)
+        sort: One of ANALYSIS_SORT_FIELDS, prefixed with '-' for descending
+        limit: Page size, capped at ANALYSIS_MAX_PAGE_SIZE
+        cursor: next_cursor from the previous page
+        fields: Fields to return; 'file' and 'ticker' are always included
+        
+    Returns:
+        Dict with 'items', 'next_cursor' (None on the last page) and 'total'
+        (number of matches), plus '_warning'/'_error' passed through from
+        the archive.
+        
+    Raises:
+        ValueError: On an unknown sort field or a malformed cursor.
+    """
+    sort_key, descending = _analysis_sort(sort)
+    limit = max(1, min(int(limit), ANALYSIS_MAX_PAGE_SIZE))
+    
+    if _store is not None:
+        # Filter in SQL (indexed) rather than over the whole manifest
+        analyses = _store.analysis_entries(
+            tickers={t.strip().upper() for t in ticker.split(',') if t.strip()} if ticker else None,
+            grades={g.strip() for g in grade.split(',') if g.strip()} if grade else None,
+            date_from=date_from, date_to=date_to)
+    else:
+        analyses = load_analysis_summaries(use_markdown_fallback=use_markdown_fallback)
+    result = {}
+    if isinstance(analyses, dict):
+        result["_warning"] = analyses.get("_warning")
+        analyses = analyses.get("_analyses", [])
+    if analyses and "_error" in analyses[0]:
+        result["_error"] = analyses[0]["_error"]
+        analyses = []
+    
+    after = _decode_cursor(cursor) if cursor else None
+    matcher = _analysis_matcher(ticker, grade, date_from, date_to)
+    matches = [entry for entry in analyses if matcher(entry)]
+    
+    if after is None:
+        candidates = matches
+    elif descending:
+        candidates = [e for e in matches if sort_key(e) < after]
+    else:
+        candidates = [e for e in matches if sort_key(e) > after]
+    
+    select = heapq.nlargest if descending else heapq.nsmallest
+    page = select(limit + 1, candidates, key=sort_key)
+    has_more = len(page) > limit
+    page = page[:limit]
+    
+    if fields:
+        keep = set(fields) | {"file", "ticker"}
+        items = [{k: v for k, v in entry.items() if k in keep} for entry in page]
+    else:
+        items = [{k: v for k, v in entry.items() if k != "content"} for entry in page]
+    
+    result.update({
+        "items": items,
+        "next_cursor": _encode_cursor(sort_key(page[-1])) if has_more else None,
+        "total": len(matches)
+    })
+    return result
+
+
+def iter_analyses(ticker: Optional[str] = None, grade: Optional[str] = None,
+                  date_from: Optional[str] = None, date_to: Optional[str] = None,
+                  fields: Optional[list[str]] = None, sort: str = "-date",
+                  use_markdown_fallback: bool = True) -> Iterator[dict]:
+    """
+    Iterate over full analysis documents one at a time, in the same order
+    as query_analyses() pages with the same sort.
+    
+    Filters as in query_analyses() are applied to the manifest first, so only
+    matching files are opened. Only one document is held at a time, which
+    lets callers stream arbitrarily large archives.
+    
+    Returns:
+        Iterator of analysis dicts (projected to fields, plus 'file' and
+        'ticker', if given). Files that fail to load or validate are skipped.
+        
+    Raises:
+        ValueError: On an unknown sort field (before anything is read).
+    """
+    sort_key, descending = _analysis_sort(sort)
+    return _iter_analyses(_analysis_matcher(ticker, grade, date_from, date_to), fields,
+                          sort_key, descending, use_markdown_fallback)
+
+
+def _iter_analyses(matcher: Callable[[dict], bool], fields: Optional[list[str]],
+                   sort_key: Callable[[dict], tuple], descending: bool,
+                   use_markdown_fallback: bool) -> Iterator[dict]:
+    _ensure_dirs()
+    
+    keep = set(fields) | {"file", "ticker"} if fields else None
+    
+    _, manifest = _refresh_manifest()
+    names = [name for name in manifest if "_error" not in manifest[name] and matcher(manifest[name])]
+    names.sort(key=lambda name: sort_key(manifest[name]), reverse=descending)
+    
+    if not manifest and use_markdown_fallback:
+        if (PORTFOLIO_DIR / "analysis_history.md").exists():
+            sections = [section for section in _load_markdown_sections() if matcher(section)]
+            sections.sort(key=lambda section: sort_key({**section, "file": _markdown_section_key(section)}),
+                          reverse=descending)
+            for analysis in _iter_markdown_analyses(sections):
+                yield {k: v for k, v in analysis.items() if k in keep} if keep else analysis
+        return
+    
+    for name in names:
+        data = load_analysis(name)
+        if data is None or "_error" in data:
+            continue
+        data["file"] = name
+        yield {k: v for k, v in data.items() if k in keep} if keep else data
+
+
 def load_arnings() -> list:
     """
     Load earnings calendar data.
@@ -541,18 +1692,26 @@ def load_arnings() -> list:
     _ensure_dirs()
     
     json_path = DATA_DIR / "earnings.json"
-    data, error = _load_json_file(json_path)
+    data, digest, error = _load_json_document(json_path)
     
     if data is not None:
         # Handle both list and dict with 'earnings' key
         earnings = data if isinstance(data, list) else data.get('earnings', [])
         
-        for item in earnings:
-            is_valid, validation_error = _validate_data(item, "earnings")
+        # One memoized check for the whole list; items are only checked
+        # one by one (to flag the bad ones) when it fails
+        is_valid, _ = _validate_data(earnings, "earnings_list", digest)
+        if is_valid:
+            return earnings
+        
+        annotated = []
+        for i, item in enumerate(earnings):
+            is_valid, validation_error = _validate_data(item, "earnings", f"{digest}:{i}")
             if not is_valid:
-                item['_validation_error'] = validation_error
+                item = {**item, '_validation_error': validation_error}
+            annotated.append(item)
         
-        return earnings
+        return annotated
     
     # Return empty list with error info
     return [{"_error": error or "No earnings data available", "_count": 0}]
@@ -568,10 +1727,10 @@ def load_schedule() -> dict:
     _ensure_dirs()
     
     json_path = DATA_DIR / "schedule.json"
-    data, error = _load_json_file(json_path)
+    data, digest, error = _load_json_document(json_path)
     
     if data is not None:
-        is_valid, validation_error = _validate_data(data, "schedule")
+        is_valid, validation_error = _validate_data(data, "schedule", digest)
         if is_valid:
             return data
         else:
@@ -596,10 +1755,10 @@ def load_ideas() -> dict:
     _ensure_dirs()
     
     json_path = DATA_DIR / "ideas.json"
-    data, error = _load_json_file(json_path)
+    data, digest, error = _load_json_document(json_path)
     
     if data is not None:
-        is_valid, validation_error = _validate_data(data, "ideas")
+        is_valid, validation_error = _validate_data(data, "ideas", digest)
         if is_valid:
             return data
         else:
@@ -614,6 +1773,41 @@ def load_ideas() -> dict:
     }
 
 
+def update_idea(idea_id: str, changes: dict) -> Optional[dict]:
+    """
+    Update one idea's fields and stamp ideas.json's last_updated.
+    
+    With the SQLite backend only that idea's row is rewritten; otherwise
+    ideas.json is rewritten atomically.
+    
+    Returns:
+        The updated idea, or None if no idea has that id.
+    """
+    _ensure_dirs()
+    
+    now = datetime.now().isoformat()
+    if _store is not None:
+        return _store.update_item("ideas", idea_id, changes, extras={"last_updated": now})
+    
+    json_path = DATA_DIR / "ideas.json"
+    data, _, _ = _load_json_document(json_path)
+    data = _copy_json(data)  # Cached documents are shared
+    ideas = data.get('ideas', []) if isinstance(data, dict) else data
+    if not isinstance(ideas, list):
+        return None
+    for idea in ideas:
+        if isinstance(idea, dict) and idea.get('id') == idea_id:
+            idea.update(changes)
+            break
+    else:
+        return None
+    if isinstance(data, dict):
+        data['last_updated'] = now
+    if not _write_json_atomic(json_path, data):
+        raise OSError(f"Could not write {json_path}")
+    return idea
+
+
 def load_corporate() -> dict:
     """
     Load corporate events data.
@@ -624,10 +1818,10 @@ def load_corporate() -> dict:
     _ensure_dirs()
     
     json_path = DATA_DIR / "corporate.json"
-    data, error = _load_json_file(json_path)
+    data, digest, error = _load_json_document(json_path)
     
     if data is not None:
-        is_valid, validation_error = _validate_data(data, "corporate")
+        is_valid, validation_error = _validate_data(data, "corporate", digest)
         if is_valid:
             return data
         else:
@@ -652,21 +1846,17 @@ def load_api_usage() -> list:
     _ensure_dirs()
     
     json_path = DATA_DIR / "api_usage.json"
-    data, error = _load_json_file(json_path)
+    data, digest, error = _load_json_document(json_path)
     
     if data is not None:
-        # Load schema for validation if available
-        schema_path = SCHEMAS_DIR / "api_usage.schema.json"
-        if HAS_JSONSCHEMA and schema_path.exists():
-            try:
-                with open(schema_path, 'r', encoding='utf-8') as f:
-                    schema = json.load(f)
-                validate(instance=data, schema=schema)
-            except Exception as e:
-                # Don't fail on validation error, just add warning
-                if isinstance(data, list):
-                    for item in data:
-                        item['_validation_warning'] = f"Schema validation: {str(e)}"
+        # Validate against SCHEMAS_DIR/api_usage.schema.json if present
+        is_valid, validation_error = _validate_data(data, "api_usage", digest)
+        if not is_valid:
+            # Don't fail on validation error, just add warning
+            if isinstance(data, list):
+                warning = f"Schema validation: {validation_error}"
+                data = [{**item, '_validation_warning': warning} if isinstance(item, dict) else item
+                        for item in data]
         
         return data
     
@@ -696,8 +1886,7 @@ def load_team() -> dict:
                     hierarchy[reports_to] = []
                 hierarchy[reports_to].append(member['id'])
         
-        data['hierarchy'] = hierarchy
-        return data
+        return {**data, 'hierarchy': hierarchy}
     
     return {
         "departments": [],
@@ -725,7 +1914,7 @@ def get_all_tickers() -> list[str]:
         for holding in account.get('holdings', []):
             tickers.add(holding.get('ticker', ''))
     
-    analyses = load_analyses()
+    analyses = load_analysis_summaries()
     if isinstance(analyses, list):
         for analysis in analyses:
             if isinstance(analysis, dict):
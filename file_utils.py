@@ -0,0 +1,98 @@
+"""
+Mission Control File Utilities
+
+The data directory, atomic writes and cross-worker file locks shared by the
+modules that keep state on disk (prices, price_store, price_history,
+portfolio_versions, data_layer).
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+# Configuration - Docker-aware paths
+if os.path.exists('/app/data'):
+    DATA_ROOT = '/app/data'
+else:
+    WORKSPACE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    DATA_ROOT = os.path.join(WORKSPACE, 'portfolio')
+
+
+def data_path(*parts):
+    """Path of a file or directory under DATA_ROOT"""
+    return os.path.join(DATA_ROOT, *parts)
+
+
+def write_atomic(path, content):
+    """
+    Write str or bytes via a temp file and rename, so readers (and mmaps of
+    the old file) never see a partial file.
+    """
+    path = os.fspath(path)
+    directory, name = os.path.split(path)
+    tmp_file = os.path.join(directory, f'.{name}.{os.getpid()}.{threading.get_ident()}.tmp')
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    try:
+        with open(tmp_file, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_file, path)
+    except BaseException:
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+        raise
+
+
+def write_json_atomic(path, data, indent=None):
+    """write_atomic for a JSON document (compact unless indent is given)"""
+    write_atomic(path, json.dumps(data, indent=indent, separators=None if indent else (',', ':')))
+
+
+# Without fcntl, locks only exclude threads of this process
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+
+@contextmanager
+def file_lock(lock_path, blocking=True):
+    """
+    Hold an exclusive flock on lock_path, shared across gunicorn workers.
+
+    The lock file's directory is created if needed (the first lock on a
+    fresh volume comes before anything else has written there).
+
+    Yields True if the lock is held, False if blocking=False and another
+    process or thread already holds it.
+    """
+    lock_path = os.fspath(lock_path)
+    if not HAS_FCNTL:
+        with _thread_locks_guard:
+            lock = _thread_locks.setdefault(lock_path, threading.Lock())
+        if not lock.acquire(blocking):
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            lock.release()
+        return
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    with open(lock_path, 'a') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
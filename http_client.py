@@ -0,0 +1,129 @@
+"""
+Mission Control Outbound HTTP Client
+
+One shared requests.Session for every external API call, so quotes reuse
+kept-alive connections (one urllib3 pool per host) instead of paying a new
+TCP+TLS handshake each time. Records per-host latency and connection reuse.
+"""
+
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Timeouts in seconds as (connect, read); per-host entries override the default
+DEFAULT_TIMEOUT = (
+    float(os.environ.get('HTTP_CONNECT_TIMEOUT', 3.05)),
+    float(os.environ.get('HTTP_READ_TIMEOUT', 10)),
+)
+HOST_TIMEOUTS = {
+    'finnhub.io': (3.05, 5),
+}
+
+# Connections kept alive per host; should cover the largest per-provider
+# concurrency in prices.PROVIDER_LIMITS
+POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', 10))
+POOL_HOSTS = 10
+
+USER_AGENT = 'Mozilla/5.0'
+
+_session = None
+_session_lock = threading.Lock()
+_stats = {}  # host -> counters
+_stats_lock = threading.Lock()
+
+
+def _get_session():
+    """Create the shared session on first use"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_MAXSIZE, max_retries=0)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers['User-Agent'] = USER_AGENT
+            _session = session
+        return _session
+
+
+def _record(host, elapsed, ok):
+    with _stats_lock:
+        stats = _stats.setdefault(host, {'requests': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+        stats['requests'] += 1
+        if not ok:
+            stats['errors'] += 1
+        ms = elapsed * 1000
+        stats['total_ms'] += ms
+        stats['max_ms'] = max(stats['max_ms'], ms)
+
+
+def get(url, params=None, headers=None, timeout=None):
+    """
+    GET through the shared session.
+
+    Args:
+        url: Absolute URL
+        params: Query parameters
+        headers: Extra request headers
+        timeout: (connect, read) seconds; defaults to HOST_TIMEOUTS / DEFAULT_TIMEOUT
+
+    Returns:
+        requests.Response (raises requests.RequestException on network errors)
+    """
+    host = urlsplit(url).hostname or ''
+    if timeout is None:
+        timeout = HOST_TIMEOUTS.get(host, DEFAULT_TIMEOUT)
+
+    start = time.perf_counter()
+    ok = False
+    try:
+        response = _get_session().get(url, params=params, headers=headers, timeout=timeout)
+        ok = response.status_code < 400
+        return response
+    finally:
+        _record(host, time.perf_counter() - start, ok)
+
+
+def get_json(url, params=None, headers=None, timeout=None):
+    """GET and decode JSON, raising requests.HTTPError on 4xx/5xx"""
+    response = get(url, params=params, headers=headers, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+def get_stats():
+    """
+    Per-host request counts, latency and connection reuse.
+
+    Returns:
+        Dict of host -> {requests, errors, avg_ms, max_ms,
+        connections_opened, connections_reused}
+    """
+    pool_counts = {}
+    if _session is not None:
+        for adapter in set(_session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                opened, served = pool_counts.get(pool.host, (0, 0))
+                pool_counts[pool.host] = (opened + pool.num_connections, served + pool.num_requests)
+
+    result = {}
+    with _stats_lock:
+        for host, stats in _stats.items():
+            opened, served = pool_counts.get(host, (0, 0))
+            result[host] = {
+                'requests': stats['requests'],
+                'errors': stats['errors'],
+                'avg_ms': round(stats['total_ms'] / stats['requests'], 1) if stats['requests'] else 0,
+                'max_ms': round(stats['max_ms'], 1),
+                'connections_opened': opened,
+                'connections_reused': max(0, served - opened),
+            }
+    return result
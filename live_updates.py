@@ -0,0 +1,146 @@
+"""
+Mission Control Live Updates
+
+Fan-out of price ticks and portfolio deltas to Server-Sent Events clients.
+
+Each gunicorn worker runs one watcher thread. It checks the shared price store
+version and the holdings version every LIVE_POLL_SECONDS (a few stat() calls)
+and broadcasts the resulting events to every client connected to that
+worker. Clients block on their own queue, so an idle connection costs a
+thread (gthread workers), not a whole worker process.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+
+LIVE_POLL_SECONDS = float(os.environ.get('MC_LIVE_POLL_SECONDS', 1.0))
+KEEPALIVE_SECONDS = float(os.environ.get('MC_LIVE_KEEPALIVE_SECONDS', 15))
+# Connections are closed after this long; EventSource reconnects on its own
+# (with Last-Event-ID), which spreads clients across workers again
+MAX_STREAM_SECONDS = float(os.environ.get('MC_LIVE_MAX_SECONDS', 600))
+# Per worker, so that streams cannot take every gthread thread
+MAX_CLIENTS = int(os.environ.get('MC_LIVE_MAX_CLIENTS', 8))
+CLIENT_QUEUE_SIZE = 100
+RECONNECT_MS = 3000
+
+# Event ids are '<process token>:<version>'; versions of another worker's
+# model mean nothing here, so a mismatched token always gets a reset
+PROCESS_TOKEN = uuid.uuid4().hex[:8]
+
+
+def format_event(event, data, event_id=None):
+    """Encode one SSE message"""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    for line in json.dumps(data, separators=(',', ':')).splitlines():
+        lines.append(f'data: {line}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def event_id(version):
+    return f'{PROCESS_TOKEN}:{version}'
+
+
+def parse_event_id(value):
+    """Version from a Last-Event-ID issued by this process, else None"""
+    token, _, version = (value or '').partition(':')
+    if token != PROCESS_TOKEN:
+        return None
+    try:
+        return int(version)
+    except ValueError:
+        return None
+
+
+class UpdateHub:
+    """
+    Watches for changes while anyone is subscribed and broadcasts events.
+
+    check(state) is called every interval with a dict it may keep state in;
+    it returns a list of (event, data, id) tuples to broadcast.
+    """
+
+    def __init__(self, check, interval=LIVE_POLL_SECONDS, max_clients=MAX_CLIENTS):
+        self._check = check
+        self.interval = interval
+        self.max_clients = max_clients
+        self._clients = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._state = {}
+        self.last_error = None
+
+    @property
+    def client_count(self):
+        return len(self._clients)
+
+    def subscribe(self):
+        """Register a client queue; returns None when the worker is full"""
+        with self._lock:
+            if len(self._clients) >= self.max_clients:
+                return None
+            client = queue.Queue(CLIENT_QUEUE_SIZE)
+            self._clients.add(client)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='live-updates', daemon=True)
+                self._thread.start()
+            return client
+
+    def unsubscribe(self, client):
+        with self._lock:
+            self._clients.discard(client)
+
+    def broadcast(self, messages):
+        with self._lock:
+            clients = list(self._clients)
+        for client in clients:
+            for message in messages:
+                try:
+                    client.put_nowait(message)
+                except queue.Full:
+                    # Too far behind to catch up by deltas; it will reconnect
+                    self.unsubscribe(client)
+                    break
+
+    def _run(self):
+        while True:
+            if self._clients:
+                try:
+                    events = self._check(self._state)
+                    if events:
+                        self.broadcast([format_event(e, data, eid) for e, data, eid in events])
+                    self.last_error = None
+                except Exception as e:
+                    self.last_error = str(e)
+                    print(f"Live update check error: {e}")
+            else:
+                # Start from scratch when the next client arrives
+                self._state.clear()
+            time.sleep(self.interval)
+
+    def stream(self, client, initial=()):
+        """
+        Generate the SSE body for a subscribed client.
+
+        Args:
+            client: Queue returned by subscribe()
+            initial: Messages (already formatted) to send first
+        """
+        deadline = time.monotonic() + MAX_STREAM_SECONDS
+        try:
+            yield f'retry: {RECONNECT_MS}\n\n'
+            for message in initial:
+                yield message
+            while time.monotonic() < deadline and client in self._clients:
+                try:
+                    yield client.get(timeout=KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+        finally:
+            self.unsubscribe(client)
@@ -0,0 +1,214 @@
+"""
+Mission Control Option Pricing
+
+Black-Scholes marks and greeks for a whole batch of option positions in one
+vectorized pass (NumPy), with a per-contract math fallback.
+
+Volatility and the risk-free rate are model inputs, not market data: set
+OPTION_VOLATILITY / OPTION_RISK_FREE_RATE, or per-ticker volatilities in
+OPTION_VOLATILITY_OVERRIDES ("TSLA=0.6,NVDA=0.5").
+"""
+
+import math
+import os
+from datetime import date, datetime
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+def _parse_overrides(raw):
+    overrides = {}
+    for item in raw.split(','):
+        ticker, _, vol = item.partition('=')
+        try:
+            overrides[ticker.strip().upper()] = float(vol)
+        except ValueError:
+            continue
+    return overrides
+
+
+DEFAULT_VOLATILITY = float(os.environ.get('OPTION_VOLATILITY', 0.30))
+RISK_FREE_RATE = float(os.environ.get('OPTION_RISK_FREE_RATE', 0.045))
+VOLATILITY_OVERRIDES = _parse_overrides(os.environ.get('OPTION_VOLATILITY_OVERRIDES', ''))
+
+DAYS_PER_YEAR = 365.0
+CONTRACT_MULTIPLIER = 100
+
+GREEKS = ('delta', 'gamma', 'theta', 'vega')
+
+
+def volatility_for(ticker):
+    """Model volatility for an underlying"""
+    return VOLATILITY_OVERRIDES.get(ticker.upper(), DEFAULT_VOLATILITY)
+
+
+def years_to_expiry(expiration, today=None):
+    """
+    Year fraction until an expiration date ('YYYY-MM-DD'), or None if unparseable.
+
+    Expired options return 0.0 and are valued at intrinsic.
+    """
+    today = today or date.today()
+    try:
+        expiry = datetime.strptime(str(expiration)[:10], '%Y-%m-%d').date()
+    except ValueError:
+        return None
+    return max((expiry - today).days, 0) / DAYS_PER_YEAR
+
+# ============================================================================
+# BLACK-SCHOLES
+# ============================================================================
+
+def _black_scholes_math(spot, strike, years, vol, rate, is_call):
+    """One contract, per share: (price, delta, gamma, theta/day, vega/vol point)"""
+    if years <= 0 or vol <= 0:
+        intrinsic = max(spot - strike, 0.0) if is_call else max(strike - spot, 0.0)
+        if is_call:
+            delta = 1.0 if spot > strike else 0.0
+        else:
+            delta = -1.0 if spot < strike else 0.0
+        return intrinsic, delta, 0.0, 0.0, 0.0
+
+    sqrt_t = math.sqrt(years)
+    d1 = (math.log(spot / strike) + (rate + 0.5 * vol * vol) * years) / (vol * sqrt_t)
+    d2 = d1 - vol * sqrt_t
+    cdf = lambda x: 0.5 * math.erfc(-x / math.sqrt(2.0))
+    pdf_d1 = math.exp(-0.5 * d1 * d1) / math.sqrt(2.0 * math.pi)
+    discount = strike * math.exp(-rate * years)
+
+    if is_call:
+        price = spot * cdf(d1) - discount * cdf(d2)
+        delta = cdf(d1)
+        theta = -spot * pdf_d1 * vol / (2 * sqrt_t) - rate * discount * cdf(d2)
+    else:
+        price = discount * cdf(-d2) - spot * cdf(-d1)
+        delta = cdf(d1) - 1.0
+        theta = -spot * pdf_d1 * vol / (2 * sqrt_t) + rate * discount * cdf(-d2)
+    gamma = pdf_d1 / (spot * vol * sqrt_t)
+    vega = spot * pdf_d1 * sqrt_t
+    return price, delta, gamma, theta / DAYS_PER_YEAR, vega / 100.0
+
+
+def _norm_cdf(x):
+    """Standard normal CDF over an array (erfc approximation, relative error < 1.2e-7)"""
+    z = np.abs(x) / math.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.5 * z)
+    poly = (-1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (0.09678418 + t * (-0.18628806
+            + t * (0.27886807 + t * (-1.13520398 + t * (1.48851587 + t * (-0.82215223 + t * 0.17087277)))))))))
+    erfc = t * np.exp(-z * z + poly)
+    return np.where(x >= 0, 1.0 - 0.5 * erfc, 0.5 * erfc)
+
+
+def _black_scholes_numpy(spot, strike, years, vol, rate, is_call):
+    """Vectorized _black_scholes_math over equal-length arrays"""
+    live = (years > 0) & (vol > 0)
+    # Placeholders keep the math finite on expired rows; they are replaced below
+    t = np.where(live, years, 1.0)
+    v = np.where(live, vol, 1.0)
+    sqrt_t = np.sqrt(t)
+    d1 = (np.log(spot / strike) + (rate + 0.5 * v * v) * t) / (v * sqrt_t)
+    d2 = d1 - v * sqrt_t
+    n_d1, n_d2 = _norm_cdf(d1), _norm_cdf(d2)
+    pdf_d1 = np.exp(-0.5 * d1 * d1) / math.sqrt(2.0 * math.pi)
+    discount = strike * np.exp(-rate * t)
+    decay = -spot * pdf_d1 * v / (2 * sqrt_t)
+
+    price = np.where(is_call, spot * n_d1 - discount * n_d2, discount * (1 - n_d2) - spot * (1 - n_d1))
+    delta = np.where(is_call, n_d1, n_d1 - 1.0)
+    theta = np.where(is_call, decay - rate * discount * n_d2, decay + rate * discount * (1 - n_d2))
+    gamma = pdf_d1 / (spot * v * sqrt_t)
+    vega = spot * pdf_d1 * sqrt_t
+
+    intrinsic = np.where(is_call, np.maximum(spot - strike, 0.0), np.maximum(strike - spot, 0.0))
+    expired_delta = np.where(is_call, (spot > strike) * 1.0, (spot < strike) * -1.0)
+    zero = np.zeros_like(spot)
+    return (np.where(live, price, intrinsic),
+            np.where(live, delta, expired_delta),
+            np.where(live, gamma, zero),
+            np.where(live, theta, zero) / DAYS_PER_YEAR,
+            np.where(live, vega, zero) / 100.0)
+
+
+def black_scholes(spots, strikes, years, vols, is_call, rate=None):
+    """
+    Price a batch of European options.
+
+    Args:
+        spots, strikes, years, vols: Sequences of equal length (spot and
+            strike must be > 0)
+        is_call: Sequence of bools (False = put)
+        rate: Risk-free rate (defaults to RISK_FREE_RATE)
+
+    Returns:
+        Dict of 'price', 'delta', 'gamma', 'theta', 'vega' lists, per share;
+        theta is per calendar day and vega per volatility point.
+    """
+    rate = RISK_FREE_RATE if rate is None else rate
+    if not HAS_NUMPY:
+        rows = [_black_scholes_math(s, k, t, v, rate, c) for s, k, t, v, c in zip(spots, strikes, years, vols, is_call)]
+        columns = list(zip(*rows)) or [()] * 5
+        return {name: list(col) for name, col in zip(('price',) + GREEKS, columns)}
+
+    arrays = _black_scholes_numpy(np.asarray(spots, dtype=np.float64), np.asarray(strikes, dtype=np.float64),
+                                  np.asarray(years, dtype=np.float64), np.asarray(vols, dtype=np.float64),
+                                  rate, np.asarray(is_call, dtype=bool))
+    return {name: col.tolist() for name, col in zip(('price',) + GREEKS, arrays)}
+
+# ============================================================================
+# POSITIONS
+# ============================================================================
+
+def mark_positions(options, spot_for, today=None):
+    """
+    Mark dashboard option rows to model, in place.
+
+    Each row (as built by valuation) gets 'underlying_price', 'mark' (per
+    share), 'volatility', 'pricing' and position-level 'greeks'; its
+    'current_value' becomes mark x contracts x 100. Rows that cannot be
+    modelled (no underlying price, bad strike or expiration) keep their entry
+    value and are flagged 'pricing': 'entry_premium'.
+
+    Args:
+        options: List of option row dicts
+        spot_for: Callable ticker -> underlying price (<= 0 if unknown)
+        today: Valuation date (defaults to today)
+
+    Returns:
+        Dict of portfolio greeks: delta (share equivalents), delta_dollars,
+        gamma, theta ($/day), vega ($ per vol point).
+    """
+    batch = []
+    for row in options:
+        spot = spot_for(row['ticker'])
+        strike = row['strike']
+        years = years_to_expiry(row['expiration'], today)
+        row['underlying_price'] = spot
+        if (not isinstance(spot, (int, float)) or spot <= 0 or not isinstance(strike, (int, float))
+                or strike <= 0 or years is None):
+            # The row may carry an earlier model mark (incremental updates)
+            row.update(mark=None, volatility=None, pricing='entry_premium',
+                       greeks={name: 0.0 for name in GREEKS},
+                       current_value=row.get('total_entry_value', row.get('current_value', 0)))
+            continue
+        batch.append((row, spot, strike, years, volatility_for(row['ticker']),
+                      str(row['type']).upper() == 'CALL'))
+
+    totals = {'delta': 0.0, 'delta_dollars': 0.0, 'gamma': 0.0, 'theta': 0.0, 'vega': 0.0}
+    if not batch:
+        return totals
+
+    rows, spots, strikes, years, vols, is_call = zip(*batch)
+    marks = black_scholes(spots, strikes, years, vols, is_call)
+    for i, row in enumerate(rows):
+        multiplier = row['total_contracts'] * CONTRACT_MULTIPLIER
+        greeks = {name: marks[name][i] * multiplier for name in GREEKS}
+        row.update(mark=marks['price'][i], volatility=vols[i], pricing='black_scholes', greeks=greeks,
+                   current_value=marks['price'][i] * multiplier)
+        for name in GREEKS:
+            totals[name] += greeks[name]
+        totals['delta_dollars'] += greeks['delta'] * spots[i]
+    return totals
@@ -0,0 +1,191 @@
+"""
+Mission Control Portfolio Versions
+
+Cross-worker version numbers for computed Holdings views, and deltas between
+them for /api/portfolio?since=<version>.
+
+Every distinct view (by content) gets the next integer from a registry shared
+by all gunicorn workers; identical views computed by different workers share
+a version. The last SNAPSHOT_HISTORY views are kept on disk, so a client
+further behind than that gets a full snapshot instead of a delta.
+"""
+
+import hashlib
+import json
+import os
+
+from file_utils import data_path, file_lock, write_atomic
+
+VERSIONS_DIR = data_path('portfolio_versions')
+
+SNAPSHOT_HISTORY = int(os.environ.get('MC_PORTFOLIO_SNAPSHOTS', 50))
+
+# The parts of a view that are versioned; bookkeeping fields such as
+# last_price_refresh or price_version do not make a new version
+ROW_SECTIONS = ('stocks', 'options', 'misc')
+MAP_SECTIONS = ('cash', 'account_totals')
+VALUE_SECTIONS = ('totals', 'greeks')
+
+
+def row_key(section, row):
+    """Identity of a view row across versions, before de-duplication (see row_keys)"""
+    if section == 'stocks':
+        return row['ticker']
+    if section == 'options':
+        strike = row['strike']
+        if isinstance(strike, float) and strike.is_integer():
+            strike = int(strike)  # as JavaScript prints it
+        account = (row.get('accounts') or [{}])[0].get('account', '')
+        return f"{account}|{row['ticker']}|{row['type']}|{strike}|{row['expiration']}"
+    return f"{row['account']}|{row['asset']}"
+
+
+def row_keys(section, rows):
+    """
+    Unique keys for a section's rows, in order; the dashboard builds the same keys.
+
+    Rows that share a row_key (e.g. two lots of one asset in one account)
+    are told apart by occurrence: 'key', 'key#1', 'key#2', ...
+    """
+    seen = {}
+    keys = []
+    for row in rows or []:
+        key = row_key(section, row)
+        n = seen.get(key, 0)
+        seen[key] = n + 1
+        keys.append(f'{key}#{n}' if n else key)
+    return keys
+
+
+# Decimal places numbers are compared at. An incrementally updated model and
+# a rebuilt one sum in a different order, so they disagree in the last bits
+CANONICAL_DIGITS = 6
+
+
+def _rounded(value):
+    if isinstance(value, float):
+        return round(value, CANONICAL_DIGITS) + 0.0  # + 0.0 turns -0.0 into 0.0
+    if isinstance(value, dict):
+        return {k: _rounded(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_rounded(v) for v in value]
+    return value
+
+
+def _canonical(view):
+    content = {name: _rounded(view.get(name)) for name in ROW_SECTIONS + MAP_SECTIONS + VALUE_SECTIONS}
+    return json.dumps(content, sort_keys=True, separators=(',', ':'), default=str)
+
+
+def _snapshot_path(version):
+    return os.path.join(VERSIONS_DIR, f'{version}.json')
+
+
+def _read_head():
+    """(version, digest) of the newest registered view, or (0, None)"""
+    try:
+        with open(os.path.join(VERSIONS_DIR, 'head'), 'r') as f:
+            version, digest = f.read().split()
+        return int(version), digest
+    except (OSError, ValueError):
+        return 0, None
+
+
+def register_view(view):
+    """
+    Version for a computed view, registering it if its content is new.
+
+    Returns:
+        The view's version (increases with every content change).
+    """
+    canonical = _canonical(view)
+    digest = hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+    version, head_digest = _read_head()
+    if digest == head_digest:
+        return version
+
+    with file_lock(os.path.join(VERSIONS_DIR, 'registry.lock')):
+        version, head_digest = _read_head()
+        if digest == head_digest:
+            return version
+        version += 1
+        write_atomic(_snapshot_path(version), canonical)
+        write_atomic(os.path.join(VERSIONS_DIR, 'head'), f'{version} {digest}')
+        _prune(version)
+    return version
+
+
+def _prune(version):
+    for name in os.listdir(VERSIONS_DIR):
+        stem, ext = os.path.splitext(name)
+        if ext == '.json' and stem.isdigit() and int(stem) <= version - SNAPSHOT_HISTORY:
+            try:
+                os.remove(os.path.join(VERSIONS_DIR, name))
+            except OSError:
+                pass
+
+
+def load_snapshot(version):
+    """Versioned content of a registered view, or None if no longer kept"""
+    try:
+        with open(_snapshot_path(int(version)), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _diff_rows(section, old_rows, new_rows):
+    old = dict(zip(row_keys(section, old_rows), old_rows or []))
+    new_keys = row_keys(section, new_rows)
+    kept = set(new_keys)
+    diff = {'added': {}, 'changed': {}, 'removed': [key for key in old if key not in kept]}
+    for key, row in zip(new_keys, new_rows or []):
+        if key not in old:
+            diff['added'][key] = row
+        elif old[key] != row:
+            diff['changed'][key] = row
+    if diff['added'] or diff['removed']:
+        diff['order'] = new_keys
+    return diff
+
+
+def _diff_map(old, new):
+    old, new = old or {}, new or {}
+    return {
+        'added': {k: v for k, v in new.items() if k not in old},
+        'changed': {k: v for k, v in new.items() if k in old and old[k] != v},
+        'removed': [k for k in old if k not in new],
+    }
+
+
+def delta_since(since, view):
+    """
+    Changes from version since to a registered view.
+
+    Rows are compared as JSON (as the client received them), with numbers
+    rounded to CANONICAL_DIGITS. Row sections
+    ('stocks', 'options', 'misc') map row key (see row_keys) to each added
+    or changed row, list removed row keys, and give the new key order when
+    rows were added or removed; 'cash' and 'account_totals' do the same by key; 'totals' and
+    'greeks' are sent whole.
+
+    Returns:
+        The delta dict, or None if since is unknown or no longer kept.
+    """
+    if since == view['portfolio_version']:
+        old = None
+    else:
+        old = load_snapshot(since)
+        if old is None or since > view['portfolio_version']:
+            return None
+    # Compare like with like: the view as it would be serialized
+    new = json.loads(_canonical(view))
+    old = old or new
+
+    delta = {name: view[name] for name in view if name not in ROW_SECTIONS + MAP_SECTIONS}
+    delta.update(delta=True, since=since)
+    for name in ROW_SECTIONS:
+        delta[name] = _diff_rows(name, old.get(name), new.get(name))
+    for name in MAP_SECTIONS:
+        delta[name] = _diff_map(old.get(name), new.get(name))
+    return delta
@@ -0,0 +1,250 @@
+"""
+Mission Control Price History
+
+Append-only time series of every fetched quote, one small binary file per
+symbol, so charts and performance analytics never reparse JSON.
+
+Each refresh appends the quotes it fetched (a symbol is only appended when
+its fetch time is newer than its last record). Reads map the file and
+bisect on the timestamp column. When a file grows past COMPACT_BYTES it is
+compacted: recent records stay at full resolution and older ones are
+downsampled to the last quote per hour, then per day. The compacted file is
+swapped in with os.replace(), so readers that already mapped the old one
+are unaffected.
+
+Layout (little-endian), price_history/<kind>-<SYMBOL>.bin:
+    header  '<4sI'   magic, layout version
+    record  '<ddB'   fetch time (epoch seconds), price, source code
+
+Records are stored row by row rather than as separate time/price/source
+columns: an append is then one O_APPEND write of one record, which cannot
+interleave with another worker's, and a file never needs rewriting to grow.
+Readers still get columns (read_range), and bisect the time field in place.
+"""
+
+import bisect
+import mmap
+import os
+import struct
+import threading
+import time
+from datetime import datetime
+
+from file_utils import data_path, write_atomic
+from price_store import KINDS, SOURCES
+
+HISTORY_DIR = data_path('price_history')
+
+MAGIC = b'MCPH'
+LAYOUT_VERSION = 1
+HEADER = struct.Struct('<4sI')
+RECORD = struct.Struct('<ddB')
+
+# Retention tiers for compaction: (minimum age in seconds, bucket seconds)
+RAW_DAYS = float(os.environ.get('PRICE_HISTORY_RAW_DAYS', 7))
+HOURLY_DAYS = float(os.environ.get('PRICE_HISTORY_HOURLY_DAYS', 90))
+DOWNSAMPLE_TIERS = ((HOURLY_DAYS * 86400, 86400), (RAW_DAYS * 86400, 3600))
+COMPACT_BYTES = int(os.environ.get('PRICE_HISTORY_COMPACT_BYTES', 256 * 1024))
+
+_SYMBOL_CHARS = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789.-_^=')
+
+# Per file: (size, last fetch time) as of our last append, so unchanged
+# symbols cost one stat(); and the size that triggers the next compaction
+_last_times = {}
+_compact_at = {}
+_state_lock = threading.Lock()
+
+
+def history_path(symbol, kind='stocks'):
+    """History file for a symbol, or None if the symbol cannot be a file name"""
+    if kind not in KINDS or not symbol or not set(symbol) <= _SYMBOL_CHARS or symbol.startswith('.'):
+        return None
+    return os.path.join(HISTORY_DIR, f'{kind}-{symbol}.bin')
+
+
+def _epoch(timestamp):
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _last_time(path):
+    """Fetch time of a file's last record (0.0 if empty or missing)"""
+    try:
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER.size + RECORD.size:
+                return 0.0
+            f.seek(HEADER.size + (size - HEADER.size) // RECORD.size * RECORD.size - RECORD.size)
+            return RECORD.unpack(f.read(RECORD.size))[0]
+    except OSError:
+        return 0.0
+
+
+def append_prices(price_cache, now=None):
+    """
+    Append newly fetched quotes from a price_cache.json-style dict.
+
+    Callers must serialize writers (prices.py holds the price file lock).
+    Files that grow past COMPACT_BYTES are compacted.
+
+    Returns:
+        Number of records appended.
+    """
+    appended = 0
+    os.makedirs(HISTORY_DIR, exist_ok=True)
+    for kind in KINDS:
+        for symbol, entry in (price_cache.get('prices', {}).get(kind) or {}).items():
+            path = history_path(symbol, kind)
+            try:
+                price = float(entry.get('price'))
+            except (AttributeError, TypeError, ValueError):
+                continue
+            fetched_at = _epoch(entry.get('timestamp'))
+            if path is None or fetched_at <= 0:
+                continue
+            try:
+                current_size = os.stat(path).st_size
+            except OSError:
+                current_size = 0
+            with _state_lock:
+                cached = _last_times.get(path)
+            # Another process may have appended since; then re-read the tail
+            last = cached[1] if cached and cached[0] == current_size else _last_time(path)
+            if fetched_at <= last:
+                continue
+
+            source = entry.get('source', '')
+            record = RECORD.pack(fetched_at, price, SOURCES.index(source) if source in SOURCES else 0)
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                size = os.fstat(fd).st_size
+                if size == 0:
+                    record = HEADER.pack(MAGIC, LAYOUT_VERSION) + record
+                os.write(fd, record)
+            finally:
+                os.close(fd)
+            size += len(record)
+            appended += 1
+            with _state_lock:
+                _last_times[path] = (size, fetched_at)
+                threshold = _compact_at.get(path, COMPACT_BYTES)
+            if size > threshold:
+                _, kept = compact(symbol, kind, now=now)
+                # If recent data alone is this big, let it grow by half again first
+                compacted_size = HEADER.size + kept * RECORD.size
+                with _state_lock:
+                    _last_times[path] = (compacted_size, fetched_at)
+                    _compact_at[path] = max(COMPACT_BYTES, compacted_size * 3 // 2)
+    return appended
+
+
+def _read_records(path):
+    """All (time, price, source code) records of a file, oldest first"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return []
+    if len(data) < HEADER.size or HEADER.unpack_from(data, 0) != (MAGIC, LAYOUT_VERSION):
+        return []
+    end = HEADER.size + (len(data) - HEADER.size) // RECORD.size * RECORD.size
+    return list(RECORD.iter_unpack(data[HEADER.size:end]))
+
+
+def _downsample(records, now):
+    """Keep the last record per tier bucket for records older than each tier's age"""
+    kept = []
+    for record in records:
+        age = now - record[0]
+        bucket = None
+        for min_age, seconds in DOWNSAMPLE_TIERS:
+            if age >= min_age:
+                bucket = (seconds, int(record[0] // seconds))
+                break
+        if bucket is not None and kept and kept[-1][0] == bucket:
+            kept[-1] = (bucket, record)
+        else:
+            kept.append((bucket, record))
+    return [record for _, record in kept]
+
+
+def compact(symbol, kind='stocks', now=None):
+    """
+    Downsample a symbol's history in place (see DOWNSAMPLE_TIERS).
+
+    Returns:
+        (records before, records after).
+    """
+    path = history_path(symbol, kind)
+    if path is None:
+        return 0, 0
+    records = _read_records(path)
+    kept = _downsample(records, time.time() if now is None else now)
+    write_atomic(path, HEADER.pack(MAGIC, LAYOUT_VERSION) + b''.join(RECORD.pack(*record) for record in kept))
+    return len(records), len(kept)
+
+
+class _Column:
+    """Read-only sequence view of one record field in a mapped file, for bisect"""
+
+    def __init__(self, buf, count, index):
+        self._buf = buf
+        self._count = count
+        self._index = index
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        return RECORD.unpack_from(self._buf, HEADER.size + i * RECORD.size)[self._index]
+
+
+def read_range(symbol, kind='stocks', start=None, end=None, max_points=None):
+    """
+    Quotes for a symbol between two times.
+
+    Args:
+        start, end: Epoch seconds, inclusive (None = unbounded)
+        max_points: If given, return at most this many points by taking the
+            last quote of evenly sized runs
+
+    Returns:
+        Dict of equal-length 'time', 'price' and 'source' lists, oldest
+        first (empty lists if there is no history).
+
+    Raises:
+        ValueError: If max_points is given and not positive.
+    """
+    if max_points is not None and max_points <= 0:
+        raise ValueError(f"max_points must be positive: {max_points}")
+    columns = {'time': [], 'price': [], 'source': []}
+    path = history_path(symbol, kind)
+    if path is None:
+        return columns
+    try:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < HEADER.size + RECORD.size:
+                return columns
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if HEADER.unpack_from(mapped, 0) != (MAGIC, LAYOUT_VERSION):
+                    return columns
+                count = (len(mapped) - HEADER.size) // RECORD.size
+                times = _Column(mapped, count, 0)
+                lo = 0 if start is None else bisect.bisect_left(times, start)
+                hi = count if end is None else bisect.bisect_right(times, end)
+                step = 1
+                if max_points and hi - lo > max_points:
+                    step = -(-(hi - lo) // max_points)
+                # Last record of each run of step records (always includes the newest)
+                for i in range(hi - 1, lo - 1, -step):
+                    t, price, source = RECORD.unpack_from(mapped, HEADER.size + i * RECORD.size)
+                    columns['time'].append(t)
+                    columns['price'].append(price)
+                    columns['source'].append(SOURCES[source] if source < len(SOURCES) else '')
+    except (OSError, ValueError):
+        return {'time': [], 'price': [], 'source': []}
+    for values in columns.values():
+        values.reverse()
+    return columns
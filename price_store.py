@@ -0,0 +1,155 @@
+"""
+Mission Control Shared Price Store
+
+A fixed-layout binary table of the latest prices, shared by every gunicorn
+worker through mmap. Readers never parse JSON. They get a consistent snapshot
+because writers build a complete new file and os.replace() it into place, so a
+mapped file is never modified. A version counter in the header increases with
+every write.
+
+Layout (little-endian):
+    header  '<4sIQI4x'   magic, layout version, data version, record count
+    record  '<16sBB6xdd' symbol, kind (0 stock, 1 crypto), source code,
+                         price, fetch time (epoch seconds)
+"""
+
+import mmap
+import os
+import struct
+import threading
+from datetime import datetime
+
+from file_utils import data_path, write_atomic
+
+STORE_FILE = data_path('price_store.bin')
+
+MAGIC = b'MCPS'
+LAYOUT_VERSION = 1
+HEADER = struct.Struct('<4sIQI4x')
+RECORD = struct.Struct('<16sBB6xdd')
+SYMBOL_BYTES = 16
+
+KINDS = ('stocks', 'crypto')
+SOURCES = ('', 'finnhub', 'yahoo', 'coingecko', 'constant')
+
+
+class PriceSnapshot:
+    """One consistent version of the store"""
+
+    def __init__(self, version, entries):
+        self.version = version
+        # symbol -> (kind, price, source, fetched_at); crypto wins on symbol clashes
+        self.entries = entries
+        self.prices = {symbol: entry[1] for symbol, entry in entries.items()}
+
+    def get(self, symbol, default=None):
+        return self.prices.get(symbol, default)
+
+
+EMPTY_SNAPSHOT = PriceSnapshot(0, {})
+
+_cache_key = None
+_cache_snapshot = EMPTY_SNAPSHOT
+_cache_lock = threading.Lock()
+
+
+def _parse(buf):
+    """Decode a store image; raises ValueError if it is not a valid store"""
+    if len(buf) < HEADER.size:
+        raise ValueError('price store truncated')
+    magic, layout, version, count = HEADER.unpack_from(buf, 0)
+    if magic != MAGIC or layout != LAYOUT_VERSION:
+        raise ValueError('not a price store (or unsupported layout)')
+    if len(buf) != HEADER.size + count * RECORD.size:
+        raise ValueError('price store size does not match record count')
+
+    entries = {}
+    stocks = []
+    for raw_symbol, kind, source, price, fetched_at in RECORD.iter_unpack(buf[HEADER.size:]):
+        symbol = raw_symbol.rstrip(b'\0').decode('ascii')
+        entry = (KINDS[kind], price, SOURCES[source] if source < len(SOURCES) else '', fetched_at)
+        if kind == 0:
+            stocks.append((symbol, entry))
+        else:
+            entries[symbol] = entry
+    for symbol, entry in stocks:
+        entries.setdefault(symbol, entry)
+    return PriceSnapshot(version, entries)
+
+
+def read_snapshot(path=None):
+    """
+    Return the current store snapshot.
+
+    Costs one stat() when nothing changed. Otherwise the new file is mapped
+    and decoded once and then reused by later calls in this process.
+
+    Returns:
+        PriceSnapshot (version 0 and no prices if the store does not exist yet).
+    """
+    global _cache_key, _cache_snapshot
+    path = path or STORE_FILE
+    try:
+        st = os.stat(path)
+    except OSError:
+        return EMPTY_SNAPSHOT
+    key = (path, st.st_ino, st.st_size, st.st_mtime_ns)
+
+    with _cache_lock:
+        if key == _cache_key:
+            return _cache_snapshot
+        try:
+            with open(path, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    snapshot = _parse(memoryview(mapped).toreadonly())
+        except (OSError, ValueError) as e:
+            print(f"Price store unreadable ({e})")
+            return EMPTY_SNAPSHOT
+        _cache_key, _cache_snapshot = key, snapshot
+        return snapshot
+
+
+def _read_version(path):
+    try:
+        with open(path, 'rb') as f:
+            magic, layout, version, _ = HEADER.unpack(f.read(HEADER.size))
+        return version if magic == MAGIC else 0
+    except (OSError, struct.error):
+        return 0
+
+
+def _epoch(timestamp):
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def write_prices(price_cache, path=None):
+    """
+    Replace the store with the prices in a price_cache.json-style dict.
+
+    Callers must serialize writers (prices.py holds the price file lock).
+    Symbols that do not fit the fixed 16-byte ASCII field are skipped.
+
+    Returns:
+        The new data version.
+    """
+    path = path or STORE_FILE
+    records = []
+    for kind_code, kind in enumerate(KINDS):
+        for symbol, entry in (price_cache.get('prices', {}).get(kind) or {}).items():
+            try:
+                raw_symbol = symbol.encode('ascii')
+                price = float(entry.get('price'))
+            except (AttributeError, UnicodeEncodeError, TypeError, ValueError):
+                continue
+            if len(raw_symbol) > SYMBOL_BYTES:
+                continue
+            source = entry.get('source', '')
+            source_code = SOURCES.index(source) if source in SOURCES else 0
+            records.append(RECORD.pack(raw_symbol, kind_code, source_code, price, _epoch(entry.get('timestamp'))))
+
+    version = _read_version(path) + 1
+    write_atomic(path, HEADER.pack(MAGIC, LAYOUT_VERSION, version, len(records)) + b''.join(records))
+    return version
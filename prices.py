@@ -0,0 +1,739 @@
+"""
+Mission Control Price Fetching
+
+Quote providers (Finnhub, Yahoo Finance, CoinGecko), the TTL-based price
+cache refresh and the background refresher that keeps it warm. All provider calls go through the
+pooled session in http_client.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+import http_client
+from file_utils import data_path, file_lock, write_json_atomic
+import price_history
+import price_store
+
+PRICE_FILE = data_path('price_cache.json')
+
+# Refresh job state files, shared by all gunicorn workers
+JOBS_DIR = os.path.join(os.path.dirname(PRICE_FILE), 'refresh_jobs')
+
+# API Keys - Production should use environment variables
+# For local development, fallback to demo key (rotate regularly)
+FINNHUB_API_KEY = os.environ.get('FINNHUB_API_KEY') or 'd68o369r01qq5rjg8lcgd68o369r01qq5rjg8ld0'
+
+# Price Constants - for assets not available via APIs
+PRICE_CONSTANTS = {
+    'SGOV': 100.0,  # iShares 0-3 Month Treasury Bond ETF - standard NAV
+}
+
+# Tickers priced from Yahoo Finance instead of Finnhub
+MUTUAL_FUNDS = ['VSEQX', 'VTCLX', 'VTMSX', 'VIG', 'VYM', 'VXUS']
+
+# CoinGecko ids for crypto assets (others are looked up by lowercased symbol)
+COINGECKO_IDS = {'ETH': 'ethereum', 'BTC': 'bitcoin', 'SOL': 'solana'}
+
+# Most symbols per request for providers with multi-symbol endpoints.
+# Providers not listed here (Finnhub's free /quote) are fetched one at a time.
+BATCH_SIZES = {
+    'yahoo': 20,
+    'coingecko': 50,
+}
+
+# Seconds a cached price stays fresh, per asset class. Mutual funds only
+# publish an end-of-day NAV; PRICE_CONSTANTS symbols are still quoted but
+# fall back to the constant, so a daily check is plenty.
+PRICE_TTLS = {
+    'equity': int(os.environ.get('PRICE_TTL_EQUITY', 300)),
+    'mutual_fund': int(os.environ.get('PRICE_TTL_MUTUAL_FUND', 12 * 3600)),
+    'crypto': int(os.environ.get('PRICE_TTL_CRYPTO', 60)),
+    'constant': int(os.environ.get('PRICE_TTL_CONSTANT', 24 * 3600)),
+}
+
+# How often the background refresher looks for expired prices
+REFRESH_CHECK_SECONDS = float(os.environ.get('PRICE_REFRESH_CHECK_SECONDS', 15))
+
+# Back-off for symbols whose fetch failed: the first retry waits
+# RETRY_BASE_SECONDS, doubling with each further failure up to
+# RETRY_MAX_SECONDS (a forced refresh retries regardless)
+RETRY_BASE_SECONDS = float(os.environ.get('PRICE_RETRY_BASE_SECONDS', 60))
+RETRY_MAX_SECONDS = float(os.environ.get('PRICE_RETRY_MAX_SECONDS', 3600))
+
+# Concurrency - total worker threads per refresh, plus per-provider limits on
+# in-flight requests and request rate so we stay inside each API's quota
+# (Finnhub free tier: 30 calls/sec).
+REFRESH_WORKERS = int(os.environ.get('PRICE_REFRESH_WORKERS', 16))
+PROVIDER_LIMITS = {
+    'finnhub': {'concurrency': 8, 'per_second': 25},
+    'yahoo': {'concurrency': 4, 'per_second': 10},
+    'coingecko': {'concurrency': 2, 'per_second': 5},
+}
+
+
+class _ProviderLimiter:
+    """Caps concurrent requests and spaces request starts for one provider"""
+
+    def __init__(self, concurrency, per_second):
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._interval = 1.0 / per_second
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def __enter__(self):
+        self._slots.acquire()
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self._interval
+        if start > now:
+            time.sleep(start - now)
+        return self
+
+    def __exit__(self, *exc):
+        self._slots.release()
+        return False
+
+
+_limiters = {name: _ProviderLimiter(**limits) for name, limits in PROVIDER_LIMITS.items()}
+
+# ============================================================================
+# PROVIDERS
+# ============================================================================
+
+def fetch_finnhub_price(ticker):
+    """Fetch stock/ETF price from Finnhub"""
+    try:
+        resp = http_client.get('https://finnhub.io/api/v1/quote',
+                               params={'symbol': ticker, 'token': FINNHUB_API_KEY})
+        if resp.status_code == 200:
+            return resp.json().get('c', 0)
+        return 0
+    except Exception as e:
+        print(f"Finnhub error for {ticker}: {e}")
+        return 0
+
+def fetch_yahoo_price(ticker):
+    """Fetch mutual fund price from Yahoo Finance"""
+    try:
+        data = http_client.get_json(f'https://query1.finance.yahoo.com/v8/finance/chart/{ticker}')
+        result = data.get('chart', {}).get('result', [{}])[0]
+        return result.get('meta', {}).get('regularMarketPrice', 0)
+    except Exception as e:
+        print(f"Yahoo error for {ticker}: {e}")
+        return 0
+
+def parse_yahoo_spark(data, tickers):
+    """
+    Prices from a Yahoo Finance spark response.
+
+    v8 maps each symbol to its series ({"VIG": {"close": [...], ...}});
+    the older v7 layout wraps them as spark.result[].response[].meta.
+
+    Returns:
+        Dict of ticker -> price, for the tickers the response has a price for
+    """
+    prices = {}
+    if not isinstance(data, dict):
+        return prices
+    results = (data.get('spark') or {}).get('result')
+    if results is not None:
+        for result in results:
+            meta = ((result.get('response') or [{}])[0]).get('meta', {})
+            if result.get('symbol') in tickers and meta.get('regularMarketPrice'):
+                prices[result['symbol']] = meta['regularMarketPrice']
+        return prices
+    for ticker in tickers:
+        series = data.get(ticker)
+        closes = [c for c in series.get('close') or [] if c] if isinstance(series, dict) else []
+        if closes:
+            prices[ticker] = closes[-1]
+    return prices
+
+def fetch_yahoo_prices(tickers):
+    """
+    Fetch several Yahoo Finance prices with one spark request.
+
+    Symbols missing from the response are left out; fetch_quotes retries
+    them one at a time. Request errors are raised.
+
+    Returns:
+        Dict of ticker -> price
+    """
+    tickers = list(tickers)
+    data = http_client.get_json('https://query1.finance.yahoo.com/v8/finance/spark',
+                                params={'range': '1d', 'interval': '1d', 'symbols': ','.join(tickers)})
+    return parse_yahoo_spark(data, tickers)
+
+def fetch_coingecko_prices(assets):
+    """
+    Fetch several crypto prices with one CoinGecko simple/price request.
+
+    Returns:
+        Dict of asset -> price (0 if unavailable)
+    """
+    assets = list(assets)
+    asset_ids = {asset: COINGECKO_IDS.get(asset, asset.lower()) for asset in assets}
+    try:
+        data = http_client.get_json('https://api.coingecko.com/api/v3/simple/price',
+                                    params={'vs_currencies': 'usd', 'ids': ','.join(sorted(set(asset_ids.values())))})
+        return {asset: data.get(asset_id, {}).get('usd', 0) for asset, asset_id in asset_ids.items()}
+    except Exception as e:
+        print(f"CoinGecko error for {','.join(assets)}: {e}")
+        return {asset: 0 for asset in assets}
+
+def fetch_coingecko_price(asset):
+    """Fetch crypto price from CoinGecko"""
+    return fetch_coingecko_prices([asset]).get(asset, 0)
+
+PROVIDERS = {
+    'finnhub': fetch_finnhub_price,
+    'yahoo': fetch_yahoo_price,
+    'coingecko': fetch_coingecko_price,
+}
+
+BATCH_PROVIDERS = {
+    'yahoo': fetch_yahoo_prices,
+    'coingecko': fetch_coingecko_prices,
+}
+
+# Batch providers whose misses are retried one symbol at a time (Yahoo's
+# chart endpoint has quotes the spark batch leaves out)
+BATCH_FALLBACK = ('yahoo',)
+
+# After a batch request fails, use per-symbol requests for this long rather
+# than paying for a failing batch call on every refresh
+BATCH_RETRY_SECONDS = float(os.environ.get('PRICE_BATCH_RETRY_SECONDS', 3600))
+
+_batch_failed_at = {}  # provider -> time.monotonic() of the last failed batch
+
+def provider_for(symbol, kind):
+    """Pick the quote provider for a symbol ('stock' or 'crypto')"""
+    if kind == 'crypto':
+        return 'coingecko'
+    return 'yahoo' if symbol in MUTUAL_FUNDS else 'finnhub'
+
+def fetch_quote(symbol, provider):
+    """Fetch one price through the provider's concurrency/rate limiter"""
+    with _limiters[provider]:
+        return PROVIDERS[provider](symbol)
+
+def fetch_quotes(symbols, provider):
+    """
+    Fetch prices for many symbols from one provider in as few requests as it allows.
+
+    Symbols are split into BATCH_SIZES[provider] chunks, one limited request
+    each; providers without a batch endpoint get one request per symbol.
+    Symbols a batch misses (BATCH_FALLBACK providers) are fetched one at a
+    time, each through the limiter. A lone symbol, or any symbol within
+    BATCH_RETRY_SECONDS of a failed batch, skips the batch request.
+
+    Returns:
+        Dict of symbol -> price (0 if unavailable)
+    """
+    symbols = list(symbols)
+    batch_size = BATCH_SIZES.get(provider)
+    failed_at = _batch_failed_at.get(provider)
+    if (not batch_size or len(symbols) == 1
+            or (failed_at is not None and time.monotonic() - failed_at < BATCH_RETRY_SECONDS)):
+        return {symbol: fetch_quote(symbol, provider) for symbol in symbols}
+
+    prices = {}
+    for i in range(0, len(symbols), batch_size):
+        chunk = symbols[i:i + batch_size]
+        try:
+            with _limiters[provider]:
+                prices.update(BATCH_PROVIDERS[provider](chunk))
+            _batch_failed_at.pop(provider, None)
+        except Exception as e:
+            print(f"{provider} batch error for {','.join(chunk)}: {e}")
+            _batch_failed_at[provider] = time.monotonic()
+    for symbol in symbols:
+        if not prices.get(symbol):
+            prices[symbol] = fetch_quote(symbol, provider) if provider in BATCH_FALLBACK else 0
+    return prices
+
+def plan_requests(symbols_by_kind):
+    """
+    Group symbols into provider requests.
+
+    Args:
+        symbols_by_kind: Dict of kind ('stock'/'crypto') -> iterable of symbols
+
+    Returns:
+        List of (provider, [(kind, symbol), ...]) - one entry per request
+    """
+    grouped = {}
+    for kind, symbols in symbols_by_kind.items():
+        for symbol in symbols:
+            if symbol:
+                grouped.setdefault(provider_for(symbol, kind), []).append((kind, symbol))
+
+    planned = []
+    for provider, members in grouped.items():
+        size = BATCH_SIZES.get(provider) or 1
+        for i in range(0, len(members), size):
+            planned.append((provider, members[i:i + size]))
+    return planned
+
+# ============================================================================
+# PRICE CACHE REFRESH
+# ============================================================================
+
+def collect_symbols(holdings):
+    """Return (stock_tickers, misc_assets) to price for the given holdings data"""
+    stock_tickers = set()
+    misc_assets = set()
+
+    for account in holdings.get('accounts', []):
+        for stock in account.get('stocks_etfs', []):
+            ticker = stock.get('Ticker', '')
+            if ticker and ticker not in ['SGOV', 'Cash']:
+                stock_tickers.add(ticker)
+        # Option underlyings are needed for mark-to-model valuation
+        for opt in account.get('options', []):
+            ticker = opt.get('Ticker', '')
+            if ticker:
+                stock_tickers.add(ticker)
+        for misc in account.get('misc', []):
+            asset = misc.get('Asset', '')
+            if asset:
+                misc_assets.add(asset)
+    stock_tickers.add('SGOV')
+
+    return stock_tickers, misc_assets
+
+def _run_request(provider, members):
+    """Run one planned provider request; returns [(kind, symbol, entry or None)]"""
+    symbols = [symbol for _, symbol in members]
+    try:
+        prices = fetch_quotes(symbols, provider)
+    except Exception as e:
+        print(f"Error fetching {','.join(symbols)}: {e}")
+        prices = {}
+
+    results = []
+    timestamp = datetime.now().isoformat()
+    for kind, symbol in members:
+        price = prices.get(symbol, 0)
+        entry = None
+        if price and price > 0:
+            entry = {'price': price, 'source': provider, 'timestamp': timestamp}
+        results.append((kind, symbol, entry))
+    return results
+
+def fetch_prices(stock_tickers, misc_assets, on_results=None):
+    """
+    Fetch all prices concurrently.
+
+    Symbols are grouped into as few requests per provider as its API allows
+    (see plan_requests), and the requests run on a bounded thread pool. Each
+    provider's limiter keeps its in-flight count and request rate within
+    PROVIDER_LIMITS.
+
+    Args:
+        stock_tickers: Stock/ETF/fund tickers
+        misc_assets: Crypto assets
+        on_results: Optional callback, called in the calling thread with each
+            finished request's [(kind, symbol, entry or None)] list
+
+    Returns:
+        Dict with 'stocks' and 'crypto' maps of symbol -> price entry.
+    """
+    planned = plan_requests({'stock': stock_tickers, 'crypto': misc_assets})
+    result = {'stocks': {}, 'crypto': {}}
+    if not planned:
+        return result
+
+    with ThreadPoolExecutor(max_workers=min(REFRESH_WORKERS, len(planned))) as pool:
+        futures = [pool.submit(_run_request, provider, members) for provider, members in planned]
+        for future in as_completed(futures):
+            results = future.result()
+            for kind, symbol, entry in results:
+                if entry is not None:
+                    result['stocks' if kind == 'stock' else 'crypto'][symbol] = entry
+            if on_results is not None:
+                on_results(results)
+    return result
+
+def load_price_cache():
+    """Read price_cache.json, or an empty cache if it is missing or unreadable"""
+    try:
+        with open(PRICE_FILE, 'r') as f:
+            data = json.load(f)
+        if isinstance(data, dict) and isinstance(data.get('prices'), dict):
+            data['prices'].setdefault('stocks', {})
+            data['prices'].setdefault('crypto', {})
+            if not isinstance(data.get('failures'), dict):
+                data['failures'] = {}
+            data['failures'].setdefault('stocks', {})
+            data['failures'].setdefault('crypto', {})
+            return data
+    except (OSError, ValueError):
+        pass
+    return {'version': '2.0', 'last_updated': None, 'prices': {'stocks': {}, 'crypto': {}},
+            'failures': {'stocks': {}, 'crypto': {}}}
+
+def write_price_cache(prices):
+    """
+    Write price_cache.json and the shared price store, each atomically, and
+    append newly fetched quotes to the price history.
+    """
+    # The store lock is held only for the two writes, so get_price_snapshot
+    # can seed the store without waiting on a refresh's network calls
+    with file_lock(f'{price_store.STORE_FILE}.lock'):
+        write_json_atomic(PRICE_FILE, prices, indent=2)
+        price_store.write_prices(prices)
+    try:
+        price_history.append_prices(prices)
+    except OSError as e:
+        # History is best effort; never fail a refresh over it
+        print(f"Price history append failed: {e}")
+
+def get_price_snapshot():
+    """
+    Current prices from the shared store (see price_store).
+
+    Builds the store from price_cache.json the first time if only the JSON
+    cache exists yet. That takes the short store lock (see
+    write_price_cache), never the refresh lock, so a page load does not
+    wait for a refresh in flight.
+    """
+    snapshot = price_store.read_snapshot()
+    if snapshot.version == 0 and os.path.exists(PRICE_FILE):
+        with file_lock(f'{price_store.STORE_FILE}.lock'):
+            if price_store.read_snapshot().version == 0:
+                price_store.write_prices(load_price_cache())
+        snapshot = price_store.read_snapshot()
+    return snapshot
+
+def asset_class(symbol, kind):
+    """Return the PRICE_TTLS class for a symbol ('stock' or 'crypto')"""
+    if symbol in PRICE_CONSTANTS:
+        return 'constant'
+    if kind == 'crypto':
+        return 'crypto'
+    return 'mutual_fund' if symbol in MUTUAL_FUNDS else 'equity'
+
+def _entry_age(entry, now):
+    """Seconds since a cache entry was fetched, or None if unknown"""
+    try:
+        return (now - datetime.fromisoformat(entry['timestamp'])).total_seconds()
+    except (TypeError, KeyError, ValueError):
+        return None
+
+def _backing_off(failure, now):
+    """True while a failed symbol's retry time (see _record_failure) is in the future"""
+    try:
+        return datetime.fromisoformat(failure['retry_after']) > now
+    except (TypeError, KeyError, ValueError):
+        return False
+
+def _record_failure(failure, now=None):
+    """
+    Failure record for a symbol whose fetch just failed.
+
+    Args:
+        failure: The symbol's previous record, or None
+
+    Returns:
+        Dict with 'attempts' (consecutive failures), 'last_attempt' and
+        'retry_after' (ISO timestamps).
+    """
+    now = now or datetime.now()
+    attempts = (failure.get('attempts', 0) if isinstance(failure, dict) else 0) + 1
+    delay = min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS)
+    return {'attempts': attempts, 'last_attempt': now.isoformat(),
+            'retry_after': (now + timedelta(seconds=delay)).isoformat()}
+
+def stale_symbols(price_cache, stock_tickers, misc_assets, now=None):
+    """
+    Find symbols whose cached price is missing or older than its TTL.
+
+    Symbols whose last fetch failed are skipped until their retry time
+    (see _record_failure).
+
+    Returns:
+        Tuple of (stale stock tickers, stale misc assets) as sets.
+    """
+    now = now or datetime.now()
+    stale = {}
+    for kind, bucket, symbols in (('stock', 'stocks', stock_tickers), ('crypto', 'crypto', misc_assets)):
+        entries = price_cache['prices'].get(bucket, {})
+        failures = price_cache.get('failures', {}).get(bucket, {})
+        stale[kind] = set()
+        for symbol in symbols:
+            age = _entry_age(entries.get(symbol), now)
+            if age is None or age >= PRICE_TTLS[asset_class(symbol, kind)]:
+                if not _backing_off(failures.get(symbol), now):
+                    stale[kind].add(symbol)
+    return stale['stock'], stale['crypto']
+
+def refresh_price_cache(holdings, force=False, blocking=True, progress=None):
+    """
+    Refetch expired prices for the positions in holdings and save the cache.
+
+    Only symbols past their PRICE_TTLS entry are requested (every symbol
+    with force=True). Fresh entries, and old entries whose refetch failed,
+    are kept; failed symbols are not retried until their back-off ends
+    (see _record_failure). The cache is saved after every finished
+    provider request, so partial results are visible while the rest are
+    still in flight.
+
+    Args:
+        holdings: Holdings data as returned by load_holdings
+        force: Refetch every symbol regardless of age
+        blocking: Wait for a refresh running in another worker; if False
+            and one is running, return None without fetching
+        progress: Optional object with begin(symbols) and
+            update([(kind, symbol, entry or None)]) methods
+
+    Returns:
+        Tuple of (price cache dict, number of symbols refetched), or None.
+    """
+    with file_lock(f'{PRICE_FILE}.lock', blocking) as locked:
+        if not locked:
+            return None
+
+        stock_tickers, misc_assets = collect_symbols(holdings)
+        prices = load_price_cache()
+        # Forget failures of symbols no longer held
+        for bucket, held in (('stocks', stock_tickers), ('crypto', misc_assets)):
+            failures = prices['failures'][bucket]
+            for symbol in [symbol for symbol in failures if symbol not in held]:
+                del failures[symbol]
+        if not force:
+            stock_tickers, misc_assets = stale_symbols(prices, stock_tickers, misc_assets)
+        if progress is not None:
+            progress.begin(sorted(stock_tickers) + sorted(misc_assets))
+        if not stock_tickers and not misc_assets:
+            return prices, 0
+
+        def publish(results):
+            now = datetime.now()
+            for kind, symbol, entry in results:
+                bucket = 'stocks' if kind == 'stock' else 'crypto'
+                failures = prices['failures'][bucket]
+                if entry is not None:
+                    prices['prices'][bucket][symbol] = entry
+                    failures.pop(symbol, None)
+                else:
+                    failures[symbol] = _record_failure(failures.get(symbol), now)
+            prices['version'] = '2.0'
+            prices['last_updated'] = datetime.now().isoformat()
+            write_price_cache(prices)
+            if progress is not None:
+                progress.update(results)
+
+        fetch_prices(stock_tickers, misc_assets, on_results=publish)
+        return prices, len(stock_tickers) + len(misc_assets)
+
+# ============================================================================
+# REFRESH JOBS
+# ============================================================================
+
+# A refresh requested over HTTP runs as a job on a thread in the worker that
+# received it. Its state lives in JOBS_DIR/<id>.json so a status poll can be
+# answered by any worker. A running job rewrites its file on every update;
+# one that has not been touched for JOB_STALE_SECONDS is reported as lost
+# (its worker was restarted or killed).
+
+JOB_STALE_SECONDS = 300
+JOB_RETENTION_SECONDS = 3600
+
+
+def _job_path(job_id):
+    return os.path.join(JOBS_DIR, f'{job_id}.json')
+
+
+class _RefreshJob:
+    """Progress sink for refresh_price_cache that persists to the job file"""
+
+    def __init__(self, job_id, force):
+        now = datetime.now().isoformat()
+        self.state = {
+            'id': job_id,
+            'status': 'queued',
+            'force': force,
+            'created': now,
+            'updated': now,
+            'finished': None,
+            'total': 0,
+            'completed': 0,
+            'symbols': {},
+            'error': None,
+        }
+
+    def save(self, **changes):
+        self.state.update(changes)
+        self.state['updated'] = datetime.now().isoformat()
+        write_json_atomic(_job_path(self.state['id']), self.state)
+
+    def begin(self, symbols):
+        self.save(status='running', total=len(symbols),
+                  symbols={symbol: {'status': 'pending'} for symbol in symbols})
+
+    def update(self, results):
+        symbols = self.state['symbols']
+        for _, symbol, entry in results:
+            if entry is not None:
+                symbols[symbol] = {'status': 'done', 'price': entry['price'], 'source': entry['source']}
+            else:
+                symbols[symbol] = {'status': 'failed'}
+        completed = sum(1 for info in symbols.values() if info['status'] != 'pending')
+        self.save(completed=completed)
+
+    def run(self, holdings):
+        try:
+            self.save(status='waiting')
+            refresh_price_cache(holdings, force=self.state['force'], progress=self)
+            self.save(status='done', finished=datetime.now().isoformat())
+        except Exception as e:
+            print(f"Refresh job {self.state['id']} failed: {e}")
+            self.save(status='failed', error=str(e), finished=datetime.now().isoformat())
+
+
+def _prune_jobs():
+    """Delete job files older than JOB_RETENTION_SECONDS"""
+    cutoff = time.time() - JOB_RETENTION_SECONDS
+    try:
+        with os.scandir(JOBS_DIR) as it:
+            for entry in it:
+                if entry.name.endswith('.json') and entry.stat().st_mtime < cutoff:
+                    try:
+                        os.remove(entry.path)
+                    except OSError:
+                        pass
+    except OSError:
+        pass
+
+
+_start_lock = threading.Lock()
+
+
+def _active_job():
+    """State of the refresh job still in flight, if any"""
+    try:
+        with open(os.path.join(JOBS_DIR, 'active'), 'r') as f:
+            job_id = f.read().strip()
+    except OSError:
+        return None
+    job = get_refresh_job(job_id) if job_id else None
+    if job is not None and job['status'] in ('queued', 'waiting', 'running'):
+        return job
+    return None
+
+
+def start_refresh_job(holdings, force=False):
+    """
+    Start a price refresh on a background thread, or join the one in flight.
+
+    Refreshes are single-flight across all workers: while a job is queued or
+    running, further requests get that job back (with 'coalesced': True)
+    instead of starting another round of provider calls. A forced request
+    is only joined to a forced job; otherwise it starts a forced job that
+    waits on the price file lock until the active one finishes.
+
+    Returns:
+        The job's state dict.
+    """
+    os.makedirs(JOBS_DIR, exist_ok=True)
+    with _start_lock, file_lock(os.path.join(JOBS_DIR, 'start.lock')):
+        active = _active_job()
+        if active is not None and (active.get('force') or not force):
+            active['coalesced'] = True
+            return active
+
+        _prune_jobs()
+        job = _RefreshJob(uuid.uuid4().hex[:12], force)
+        job.save()
+        with open(os.path.join(JOBS_DIR, 'active'), 'w') as f:
+            f.write(job.state['id'])
+        state = dict(job.state, coalesced=False)
+
+    threading.Thread(target=job.run, args=(holdings,), name=f'refresh-job-{job.state["id"]}', daemon=True).start()
+    return state
+
+
+def get_refresh_job(job_id):
+    """
+    Read a refresh job's state, from any worker.
+
+    Returns:
+        The job state dict, or None if the id is unknown.
+    """
+    if not job_id.isalnum():
+        return None
+    try:
+        with open(_job_path(job_id), 'r') as f:
+            job = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if job.get('status') in ('queued', 'waiting', 'running'):
+        try:
+            idle = (datetime.now() - datetime.fromisoformat(job['updated'])).total_seconds()
+        except (KeyError, TypeError, ValueError):
+            idle = 0
+        if idle > JOB_STALE_SECONDS:
+            job['status'] = 'lost'
+            job['error'] = 'Refresh worker stopped before the job finished'
+    return job
+
+# ============================================================================
+# BACKGROUND REFRESHER
+# ============================================================================
+
+class BackgroundRefresher:
+    """
+    Daemon thread that keeps price_cache.json warm.
+
+    Every REFRESH_CHECK_SECONDS it refetches whatever has expired. Each
+    gunicorn worker runs one; the price file lock lets only one of them
+    fetch per cycle and the others skip.
+    """
+
+    def __init__(self, load_holdings, interval=REFRESH_CHECK_SECONDS):
+        self._load_holdings = load_holdings
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_run = None
+        self.last_refreshed = 0
+        self.last_error = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='price-refresher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                result = refresh_price_cache(self._load_holdings(), blocking=False)
+                if result is not None:
+                    self.last_run = datetime.now().isoformat()
+                    self.last_refreshed = result[1]
+                    self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Background price refresh error: {e}")
+            self._stop.wait(self.interval)
+
+_refresher = None
+
+def start_background_refresher(load_holdings):
+    """Start this process's background refresher (once) and return it"""
+    global _refresher
+    if _refresher is None:
+        _refresher = BackgroundRefresher(load_holdings)
+    return _refresher.start()
@@ -7,35 +7,77 @@ Uses clean JSON data sources with schema validation
 import os
 import sys
 import json
-from datetime import datetime, timedelta
+import gzip
+import hashlib
+import functools
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from flask import Flask, jsonify, render_template, request
+from flask import Flask, Response, jsonify, make_response, render_template, request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
 # Add mission_control to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Try to import data layer, fallback to inline if not available
 try:
-    from data_layer import load_holdings, load_analyses, load_earnings, load_schedule, load_ideas, load_team
+    from data_layer import (load_holdings, get_holdings_version, get_source_version, load_analyses, load_analysis_summaries, load_analysis, query_analyses, search_analyses, iter_analyses,
+                            load_earnings, load_schedule, load_ideas, update_idea, load_team, load_api_usage, get_cache_stats)
     USE_DATA_LAYER = True
     print("✅ Using new JSON data layer")
 except ImportError as e:
     USE_DATA_LAYER = False
     print(f"⚠️ Data layer not available ({e}), using fallback")
 
+from prices import PRICE_FILE, PRICE_CONSTANTS, get_price_snapshot, start_refresh_job, get_refresh_job, start_background_refresher
+import http_client
+import option_pricing
+import price_history
+import price_store
+from valuation import get_portfolio_model
+import live_updates
+import portfolio_versions
+
+class FastJSONProvider(DefaultJSONProvider):
+    """jsonify via orjson when installed (same sorted keys; ~5-10x faster)"""
+
+    def dumps(self, obj, **kwargs):
+        # response() asks for compact separators, or indent=2 in debug mode;
+        # orjson covers both, anything else goes to the stdlib encoder
+        options = dict(kwargs)
+        separators = tuple(options.pop('separators', (',', ':')))
+        indent = options.pop('indent', None)
+        if HAS_ORJSON and not options and separators == (',', ':') and indent in (None, 2):
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            try:
+                return orjson.dumps(obj, default=self.default, option=option).decode()
+            except TypeError:
+                pass  # e.g. ints beyond 64 bits; the stdlib encoder copes
+        return super().dumps(obj, **kwargs)
+
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 
 # Configuration - Docker-aware paths
 if os.path.exists('/app/data'):
     # Running in Docker container
     WORKSPACE = '/app'
     DATA_DIR = '/app/data'
-    PRICE_FILE = '/app/data/price_cache.json'
 else:
     # Running locally
     WORKSPACE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     DATA_DIR = os.path.join(WORKSPACE, 'portfolio', 'data')
-    PRICE_FILE = os.path.join(WORKSPACE, 'portfolio', 'price_cache.json')
 
 DATA_FILE = os.path.join(DATA_DIR, 'holdings.json')
 ANALYSES_DIR = os.path.join(DATA_DIR, 'analyses')
@@ -44,15 +86,6 @@ ANALYSES_DIR = os.path.join(DATA_DIR, 'analyses')
 MD_DATA_FILE = os.path.join(DATA_DIR, '..', 'unified_portfolio_tracker.md')
 MD_ANALYSIS_FILE = os.path.join(DATA_DIR, '..', 'portfolio_tracker.md')
 
-# API Keys - Production should use environment variables
-# For local development, fallback to demo key (rotate regularly)
-FINNHUB_API_KEY = os.environ.get('FINNHUB_API_KEY') or 'd68o369r01qq5rjg8lcgd68o369r01qq5rjg8ld0'
-
-# Price Constants - for assets not available via APIs
-PRICE_CONSTANTS = {
-    'SGOV': 100.0,  # iShares 0-3 Month Treasury Bond ETF - standard NAV
-}
-
 # ============================================================================
 # DATA PARSING (Legacy - for fallback)
 # ============================================================================
@@ -96,160 +129,263 @@ def parse_markdown_table(content, section_marker):
     return rows
 
 # ============================================================================
-# API ENDPOINTS
+# STREAMING RESPONSES
 # ============================================================================
 
-def transform_holdings_for_dashboard(data):
-    """Transform JSON holdings data to dashboard format"""
-    accounts = data.get('accounts', [])
-    
-    # Aggregate stocks across accounts
-    stocks_map = {}
-    options_list = []
-    cash_data = {'Cash': {'total': 0, 'accounts': []}, 'SGOV': {'total': 0, 'total_shares': 0, 'accounts': [], 'price': 100.0}}
-    misc_total = 0
-    
-    # Load prices from cache if available
-    prices = {}
+# List endpoints accept ?stream=1 to send items as they are serialized instead
+# of building the whole body first. Items go through app.json, so the body is
+# the same JSON as the jsonify response. Only the analysis archive is also
+# read one document at a time (iter_analyses); earnings and ideas are single
+# documents the data layer already holds in memory, so for them streaming
+# just avoids holding the serialized body.
+
+def wants_stream():
+    """True if the client asked for a streamed response"""
+    return request.args.get('stream', '').lower() in ('1', 'true', 'yes')
+
+def stream_json_array(items):
+    """Stream an iterable as a JSON array, one item at a time"""
+    dumps = app.json.dumps
+
+    def generate():
+        yield '['
+        for i, item in enumerate(items):
+            yield (',' if i else '') + dumps(item)
+        yield ']'
+    return Response(generate(), mimetype='application/json')
+
+def stream_json_object(fields, list_key, items):
+    """Stream a JSON object whose list_key array is produced from an iterable"""
+    dumps = app.json.dumps
+
+    def generate():
+        yield '{'
+        for key, value in fields.items():
+            if key != list_key:
+                yield f'{dumps(key)}:{dumps(value)},'
+        yield f'{dumps(list_key)}:['
+        for i, item in enumerate(items):
+            yield (',' if i else '') + dumps(item)
+        yield ']}'
+    return Response(generate(), mimetype='application/json')
+
+# ============================================================================
+# CONDITIONAL REQUESTS
+# ============================================================================
+
+# Data endpoints carry a strong ETag built from the versions (stat results) of
+# the files they read, so If-None-Match is answered with 304 before anything
+# is loaded. Every other /api GET gets an ETag hashed from its body.
+# Responses are sent with Cache-Control: no-cache, so browsers revalidate
+# instead of needing cache-busting query strings.
+#
+# The ETag also keys a per-process cache of the serialized body, raw and
+# gzipped, so a client without the current version is served the stored
+# bytes without loading or serializing anything. Streamed responses
+# (?stream=1) are never cached.
+#
+# The gzip and identity bodies are different representations, so the gzip
+# one is tagged '<etag>-gzip'; responses that may be either (304s included)
+# carry Vary: Accept-Encoding.
+
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get('MC_RESPONSE_CACHE_BYTES', 32 * 1024 * 1024))
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+
+_response_cache = OrderedDict()  # etag -> (raw bytes, gzip bytes or None, mimetype)
+_response_cache_bytes = 0
+_response_cache_lock = threading.Lock()
+
+def _accepts_gzip():
+    return 'gzip' in request.accept_encodings
+
+def _gzip_etag(etag):
+    """ETag of the gzip-encoded representation of the body tagged etag"""
+    return f'{etag}-gzip'
+
+def _cached_response(entry):
+    """Build a response from cached (raw, gzipped, mimetype) bytes"""
+    raw, gzipped, mimetype = entry
+    if gzipped is not None and _accepts_gzip():
+        response = Response(gzipped, mimetype=mimetype)
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(raw, mimetype=mimetype)
+    response.vary.add('Accept-Encoding')
+    return response
+
+def _cache_response(etag, response):
+    """Store a finished response's body under its ETag; returns the entry"""
+    global _response_cache_bytes
+    raw = response.get_data()
+    gzipped = gzip.compress(raw, GZIP_LEVEL) if len(raw) >= GZIP_MIN_BYTES else None
+    entry = (raw, gzipped, response.mimetype)
+    size = len(raw) + len(gzipped or b'')
+    if size > RESPONSE_CACHE_MAX_BYTES // 4:
+        return entry
+    with _response_cache_lock:
+        old = _response_cache.pop(etag, None)
+        if old is not None:
+            _response_cache_bytes -= len(old[0]) + len(old[1] or b'')
+        _response_cache[etag] = entry
+        _response_cache_bytes += size
+        while _response_cache_bytes > RESPONSE_CACHE_MAX_BYTES and _response_cache:
+            _, evicted = _response_cache.popitem(last=False)
+            _response_cache_bytes -= len(evicted[0]) + len(evicted[1] or b'')
+    return entry
+
+def _code_version():
+    """Stats of the app's modules, so a deploy invalidates every ETag"""
+    app_dir = os.path.dirname(os.path.abspath(__file__))
+    versions = []
+    for name in sorted(os.listdir(app_dir)):
+        if name.endswith('.py'):
+            st = os.stat(os.path.join(app_dir, name))
+            versions.append((name, st.st_mtime_ns, st.st_size))
+    return versions
+
+CODE_VERSION = _code_version()
+
+def _stat_version(path):
     try:
-        if os.path.exists(PRICE_FILE):
-            with open(PRICE_FILE, 'r') as f:
-                price_data = json.load(f)
-                # Handle nested structure: {"prices": {"stocks": {"TICKER": {"price": 123}}}}
-                if isinstance(price_data, dict) and 'prices' in price_data:
-                    stocks_data = price_data['prices'].get('stocks', {})
-                    prices = {ticker: data.get('price', -1) for ticker, data in stocks_data.items()}
-                    # Also add crypto prices
-                    crypto_data = price_data['prices'].get('crypto', {})
-                    for asset, data in crypto_data.items():
-                        prices[asset] = data.get('price', -1)
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def portfolio_version():
+    """Everything /api/portfolio depends on, without loading any of it"""
+    return (
+        get_holdings_version(use_markdown_fallback=True),
+        _stat_version(price_store.STORE_FILE),
+        _stat_version(PRICE_FILE),
+        sorted(PRICE_CONSTANTS.items()),
+        date.today().isoformat(),  # option marks decay daily
+        (option_pricing.DEFAULT_VOLATILITY, option_pricing.RISK_FREE_RATE,
+         sorted(option_pricing.VOLATILITY_OVERRIDES.items())),
+    )
+
+def conditional(*sources):
+    """
+    Decorate an endpoint with a source-derived ETag.
+
+    Args:
+        sources: data_layer source names (see get_source_version) or
+            callables returning a version
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not USE_DATA_LAYER:
+                return view(*args, **kwargs)
+            try:
+                versions = [source() if callable(source) else get_source_version(source) for source in sources]
+            except Exception as e:
+                print(f"ETag version error for {request.path}: {e}")
+                return view(*args, **kwargs)
+            query = sorted((k, v) for k, v in request.args.items(multi=True) if k != 't')
+            etag = hashlib.blake2b(repr((request.path, query, versions, CODE_VERSION)).encode(),
+                                   digest_size=16).hexdigest()
+
+            # Either representation is current; confirm the one the client holds
+            matched = next((tag for tag in (etag, _gzip_etag(etag)) if request.if_none_match.contains(tag)), None)
+            if matched is not None:
+                response = Response(status=304)
+                response.vary.add('Accept-Encoding')
+                response.set_etag(matched)
+            else:
+                with _response_cache_lock:
+                    entry = _response_cache.get(etag)
+                    if entry is not None:
+                        _response_cache.move_to_end(etag)
+                if entry is not None:
+                    response = _cached_response(entry)
                 else:
-                    prices = price_data
-    except Exception as e:
-        print(f"Error loading prices: {e}")
-        pass
-    
-    for account in accounts:
-        account_name = account.get('name', 'Unknown')
-        
-        # Process stocks
-        for stock in account.get('stocks_etfs', []):
-            ticker = stock.get('Ticker', '')
-            shares = stock.get('Shares', 0)
-            cost_basis = stock.get('Cost Basis', 0)
-            
-            if ticker not in stocks_map:
-                stocks_map[ticker] = {
-                    'ticker': ticker,
-                    'total_shares': 0,
-                    'total_cost_basis': 0,
-                    'total_value': 0,
-                    'price': prices.get(ticker, PRICE_CONSTANTS.get(ticker, -1)),  # Check cache, then constants, then error
-                    'accounts': []
-                }
-            
-            stocks_map[ticker]['total_shares'] += shares
-            stocks_map[ticker]['total_cost_basis'] += cost_basis
-            stocks_map[ticker]['accounts'].append({
-                'account': account_name,
-                'shares': shares,
-                'cost_basis': cost_basis
-            })
-        
-        # Process options - preserve sign for short positions
-        for opt in account.get('options', []):
-            contracts = opt.get('Contracts', 0)  # Don't use abs() - preserve sign
-            premium = opt.get('Entry Premium', 0)
-            # For short options (negative contracts), value is negative (obligation)
-            # For long options (positive contracts), value is positive (asset)
-            notional_value = contracts * premium * 100
-            options_list.append({
-                'ticker': opt.get('Ticker', ''),
-                'type': opt.get('Type', 'PUT'),
-                'strike': opt.get('Strike', 0),
-                'expiration': opt.get('Expiration', ''),
-                'total_contracts': contracts,  # Preserve negative for short
-                'total_entry_value': notional_value,
-                'current_value': notional_value,  # Simplified - should use current option price
-                'accounts': [{'account': account_name, 'contracts': contracts, 'entry_premium': premium}],
-                'note': f"{contracts} contracts @ ${premium}"
-            })
-        
-        # Process cash
-        for cash_item in account.get('cash', []):
-            asset = cash_item.get('Asset', 'Cash')
-            qty = cash_item.get('Quantity', 0)
-            if asset == 'Cash':
-                cash_data['Cash']['total'] += qty
-                cash_data['Cash']['accounts'].append({'account': account_name, 'value': qty})
-            elif asset == 'SGOV':
-                cash_data['SGOV']['total'] += qty * 100  # Assuming $100/share
-                cash_data['SGOV']['total_shares'] += qty
-                cash_data['SGOV']['accounts'].append({'account': account_name, 'value': qty * 100})
-        
-    # Process misc assets (crypto, etc.) with live prices
-    misc_list = []
-    for account in accounts:
-        account_name = account.get('name', 'Unknown')
-        for misc in account.get('misc', []):
-            asset = misc.get('Asset', '')
-            amount = misc.get('Amount', 0)
-            cost_basis = misc.get('Cost Basis', 0)
-            asset_type = misc.get('Type', 'Other')
-            
-            # Get live price if available
-            price = prices.get(asset, 0)
-            current_value = amount * price if price > 0 else cost_basis
-            
-            misc_list.append({
-                'asset': asset,
-                'type': asset_type,
-                'amount': amount,
-                'price': price,
-                'cost_basis': cost_basis,
-                'current_value': current_value,
-                'account': account_name
-            })
-    
-    misc_total = sum(m['current_value'] for m in misc_list)
-    
-    # Calculate stock values and returns
-    stocks_list = []
-    for stock in stocks_map.values():
-        stock['total_value'] = stock['total_shares'] * stock['price']
-        cost_per_share = stock['total_cost_basis'] / stock['total_shares'] if stock['total_shares'] > 0 else 0
-        stock['total_return_pct'] = ((stock['price'] - cost_per_share) / cost_per_share * 100) if cost_per_share > 0 else 0
-        stocks_list.append(stock)
-    
-    # Calculate totals
-    stocks_total = sum(s['total_value'] for s in stocks_list)
-    options_total = sum(o['current_value'] for o in options_list)
-    cash_total = cash_data['Cash']['total'] + cash_data['SGOV']['total']
-    
-    return {
-        'stocks': stocks_list,
-        'options': options_list,
-        'cash': cash_data,
-        'misc': misc_list,
-        'totals': {
-            'stocks_etfs': stocks_total,
-            'options': options_total,
-            'cash_equivalents': cash_total,
-            'misc': misc_total,
-            'grand_total': stocks_total + options_total + cash_total + misc_total
-        },
-        'last_price_refresh': data.get('last_updated', datetime.now().isoformat())
-    }
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    if not response.is_streamed:
+                        response = _cached_response(_cache_response(etag, response))
+                response.set_etag(_gzip_etag(etag) if response.headers.get('Content-Encoding') == 'gzip' else etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
+
+@app.after_request
+def add_content_etag(response):
+    """ETag (body hash) and gzip for /api GETs that have no source-derived ETag"""
+    if (request.method == 'GET' and request.path.startswith('/api/') and response.status_code == 200
+            and not response.is_streamed and 'ETag' not in response.headers):
+        response.add_etag()
+        response.headers['Cache-Control'] = 'no-cache'
+        compress = False
+        if response.content_length and response.content_length >= GZIP_MIN_BYTES:
+            response.vary.add('Accept-Encoding')
+            compress = _accepts_gzip()
+            if compress:
+                response.set_etag(_gzip_etag(response.get_etag()[0]))
+        response = response.make_conditional(request)
+        if response.status_code == 200 and compress:
+            response.set_data(gzip.compress(response.get_data(), GZIP_LEVEL))
+            response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+# ============================================================================
+# API ENDPOINTS
+# ============================================================================
+
+def transform_holdings_for_dashboard(data, version=None):
+    """
+    Transform JSON holdings data to dashboard format.
+
+    The view comes from this worker's valuation.PortfolioModel; pass the
+    holdings version (see get_holdings_version) so that price changes are
+    applied to the existing model instead of revaluing everything. Its
+    'portfolio_version' comes from the cross-worker registry in
+    portfolio_versions.
+    """
+    # Prices from the shared store (no JSON parse; same snapshot for the whole view)
+    price_snapshot = get_price_snapshot()
+    model = get_portfolio_model(data, price_snapshot.prices, PRICE_CONSTANTS, holdings_version=version)
+    _, view = model.snapshot()
+    view = dict(view)
+    view['last_price_refresh'] = data.get('last_updated', datetime.now().isoformat())
+    view['price_version'] = price_snapshot.version
+    view['portfolio_version'] = portfolio_versions.register_view(view)
+    return view
+
+def portfolio_payload():
+    """Holdings tab view for the current holdings and prices"""
+    version = get_holdings_version(use_markdown_fallback=True)
+    data = load_holdings(use_markdown_fallback=True)
+    # Transform to dashboard format
+    return transform_holdings_for_dashboard(data, version)
 
 @app.route('/api/portfolio')
+@conditional(portfolio_version)
 def api_portfolio():
-    """Return complete portfolio data for Holdings tab"""
+    """
+    Return complete portfolio data for Holdings tab.
+
+    With ?since=<portfolio_version> only the changes since that version are
+    returned (see portfolio_versions.delta_since; marked 'delta': true), or
+    the full view if that version is no longer kept.
+    """
     try:
         if USE_DATA_LAYER:
-            data = load_holdings(use_markdown_fallback=True)
-            # Transform to dashboard format
-            transformed = transform_holdings_for_dashboard(data)
-            return jsonify(transformed)
+            since = request.args.get('since')
+            if since is not None:
+                try:
+                    since = int(since)
+                except ValueError:
+                    return jsonify({'error': 'since must be an integer version'}), 400
+            view = portfolio_payload()
+            if since is not None:
+                delta = portfolio_versions.delta_since(since, view)
+                if delta is not None:
+                    return jsonify(delta)
+            return jsonify(view)
         else:
             # Fallback to old parsing
             return jsonify({'error': 'Data layer not available'}), 500
@@ -257,139 +393,235 @@ def api_portfolio():
         import traceback
         return jsonify({'error': str(e), 'traceback': traceback.format_exc()}), 500
 
-def fetch_yahoo_price(ticker):
-    """Fetch mutual fund price from Yahoo Finance"""
-    try:
-        import urllib.request
-        url = f'https://query1.finance.yahoo.com/v8/finance/chart/{ticker}'
-        req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-        with urllib.request.urlopen(req, timeout=10) as response:
-            data = json.loads(response.read().decode())
-            result = data.get('chart', {}).get('result', [{}])[0]
-            return result.get('meta', {}).get('regularMarketPrice', 0)
-    except Exception as e:
-        print(f"Yahoo error for {ticker}: {e}")
-        return 0
+# ============================================================================
+# LIVE UPDATES (Server-Sent Events)
+# ============================================================================
+
+def live_check(state):
+    """
+    One watcher poll: price ticks since the last poll, then the portfolio
+    delta (or a reset when the model was rebuilt).
+    """
+    events = []
+    snapshot = get_price_snapshot()
+    if snapshot.version != state.get('price_version'):
+        previous = state.get('prices')
+        if previous is not None:
+            changed = {symbol: price for symbol, price in snapshot.prices.items() if previous.get(symbol) != price}
+            if changed:
+                events.append(('prices', {'version': snapshot.version, 'prices': changed}, None))
+        state['price_version'], state['prices'] = snapshot.version, snapshot.prices
+
+    holdings_version = get_holdings_version(use_markdown_fallback=True)
+    key = (holdings_version, snapshot.version, date.today())
+    if key == state.get('key'):
+        return events
+    state['key'] = key
+    model = get_portfolio_model(load_holdings(use_markdown_fallback=True), snapshot.prices, PRICE_CONSTANTS,
+                                holdings_version=holdings_version)
+    if 'model_version' in state:
+        events.extend(portfolio_events(model, state['model_version']))
+    state['model_version'] = model.version
+    return events
 
-def fetch_coingecko_price(asset):
-    """Fetch crypto price from CoinGecko"""
+def portfolio_events(model, since):
+    """
+    Events that bring a client at model version since up to date.
+
+    A delta also carries the 'portfolio_version' (see portfolio_versions) of
+    the view it produces, so the client's next /api/portfolio?since= poll
+    starts from there instead of re-requesting the same changes.
+    """
+    version, view = model.snapshot()
+    if since == version:
+        return []
+    delta = model.changes_since(since) if since is not None else None
+    if delta is None:
+        return [('portfolio', {'version': version, 'reset': True}, live_updates.event_id(version))]
+    if delta['version'] == version:
+        delta['portfolio_version'] = portfolio_versions.register_view(view)
+    return [('portfolio', delta, live_updates.event_id(delta['version']))]
+
+live_hub = live_updates.UpdateHub(live_check)
+
+@app.route('/api/live')
+def api_live():
+    """
+    Stream price ticks and portfolio deltas as Server-Sent Events.
+
+    Events: 'prices' ({version, prices: changed symbols}) and 'portfolio'
+    (a PortfolioModel delta with its portfolio_version, or
+    {version, reset: true} meaning refetch
+    /api/portfolio). Reconnects resume from Last-Event-ID when they reach
+    the same worker.
+    """
+    if not USE_DATA_LAYER:
+        return jsonify({'error': 'Data layer not available'}), 500
+    client = live_hub.subscribe()
+    if client is None:
+        response = jsonify({'error': 'Too many live connections'})
+        response.status_code = 503
+        response.headers['Retry-After'] = '30'
+        return response
     try:
-        import urllib.request
-        asset_map = {'ETH': 'ethereum', 'BTC': 'bitcoin', 'SOL': 'solana'}
-        asset_id = asset_map.get(asset, asset.lower())
-        url = f'https://api.coingecko.com/api/v3/simple/price?ids={asset_id}&vs_currencies=usd'
-        req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-        with urllib.request.urlopen(req, timeout=10) as response:
-            data = json.loads(response.read().decode())
-            return data.get(asset_id, {}).get('usd', 0)
-    except Exception as e:
-        print(f"CoinGecko error for {asset}: {e}")
-        return 0
+        price_snapshot = get_price_snapshot()
+        model = get_portfolio_model(load_holdings(use_markdown_fallback=True), price_snapshot.prices,
+                                    PRICE_CONSTANTS, holdings_version=get_holdings_version(use_markdown_fallback=True))
+        since = live_updates.parse_event_id(request.headers.get('Last-Event-ID'))
+        initial = [live_updates.format_event(*event) for event in portfolio_events(model, since)]
+    except Exception:
+        live_hub.unsubscribe(client)
+        raise
+    response = Response(live_hub.stream(client, initial), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 @app.route('/api/refresh-prices', methods=['POST'])
 def refresh_prices():
-    """Refresh all prices from APIs"""
+    """
+    Start a refresh of expired prices (?force=1 refetches everything).
+
+    Returns 202 with the job id immediately; poll /api/refresh-prices/<job_id>.
+    A refresh already in flight on any worker is joined instead of repeated
+    (a forced one only joins a forced refresh).
+    """
     try:
-        import requests
-        
-        # Get all tickers and misc assets from holdings
         data = load_holdings(use_markdown_fallback=True)
-        stock_tickers = set()
-        misc_assets = set()
-        
-        for account in data.get('accounts', []):
-            for stock in account.get('stocks_etfs', []):
-                ticker = stock.get('Ticker', '')
-                if ticker and ticker not in ['SGOV', 'Cash']:
-                    stock_tickers.add(ticker)
-            for misc in account.get('misc', []):
-                asset = misc.get('Asset', '')
-                if asset:
-                    misc_assets.add(asset)
-        stock_tickers.add('SGOV')
-        
-        prices = {'version': '2.0', 'last_updated': datetime.now().isoformat(), 'prices': {'stocks': {}, 'crypto': {}}}
-        
-        # Fetch stock prices (Finnhub for most, Yahoo for mutual funds)
-        mutual_funds = ['VSEQX', 'VTCLX', 'VTMSX', 'VIG', 'VYM', 'VXUS']
-        
-        for ticker in stock_tickers:
-            if not ticker:
-                continue
-            try:
-                if ticker in mutual_funds:
-                    # Use Yahoo Finance for mutual funds
-                    price = fetch_yahoo_price(ticker)
-                    source = 'yahoo'
-                else:
-                    # Use Finnhub for regular stocks
-                    url = f'https://finnhub.io/api/v1/quote?symbol={ticker}&token={FINNHUB_API_KEY}'
-                    resp = requests.get(url, timeout=5)
-                    price = 0
-                    if resp.status_code == 200:
-                        data = resp.json()
-                        price = data.get('c', 0)
-                    source = 'finnhub'
-                
-                if price > 0:
-                    prices['prices']['stocks'][ticker] = {
-                        'price': price,
-                        'source': source,
-                        'timestamp': datetime.now().isoformat()
-                    }
-            except Exception as e:
-                print(f"Error fetching {ticker}: {e}")
-                continue
-        
-        # Fetch crypto prices from CoinGecko
-        for asset in misc_assets:
-            try:
-                price = fetch_coingecko_price(asset)
-                if price > 0:
-                    prices['prices']['crypto'][asset] = {
-                        'price': price,
-                        'source': 'coingecko',
-                        'timestamp': datetime.now().isoformat()
-                    }
-            except Exception as e:
-                print(f"Error fetching {asset}: {e}")
-                continue
-        
-        # Save to cache
-        with open(PRICE_FILE, 'w') as f:
-            json.dump(prices, f, indent=2)
-        
-        stocks_count = len(prices['prices']['stocks'])
-        crypto_count = len(prices['prices']['crypto'])
-        
-        return jsonify({
-            'success': True, 
-            'prices_updated': stocks_count + crypto_count,
-            'stocks': stocks_count,
-            'crypto': crypto_count
-        })
+        force = request.args.get('force', '').lower() in ('1', 'true', 'yes')
+        job = start_refresh_job(data, force=force)
+        return jsonify({'success': True, 'job_id': job['id'], 'status': job['status'],
+                        'coalesced': job['coalesced']}), 202
     except Exception as e:
         import traceback
         return jsonify({'success': False, 'error': str(e), 'traceback': traceback.format_exc()}), 500
 
+@app.route('/api/price-history/<symbol>')
+def api_price_history(symbol):
+    """
+    Return a symbol's quote history as columns (time, price, source).
+
+    Query params: kind ('stocks' or 'crypto'; default: whichever has
+    history, crypto first), from, to (ISO dates/times, inclusive), points
+    (maximum number of points, downsampled).
+    """
+    try:
+        args = request.args
+        try:
+            start = datetime.fromisoformat(args['from']).timestamp() if args.get('from') else None
+            end = datetime.fromisoformat(args['to']).timestamp() if args.get('to') else None
+            if args.get('to') and len(args['to']) == 10:
+                end += 86400 - 1e-6  # a date includes that whole day
+            points = int(args['points']) if args.get('points') else None
+            if points is not None and points <= 0:
+                raise ValueError(f"points must be positive: {points}")
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        kinds = [args['kind']] if args.get('kind') else ['crypto', 'stocks']
+        for kind in kinds:
+            history = price_history.read_range(symbol, kind, start, end, points)
+            if history['time'] or kind == kinds[-1]:
+                return jsonify({'symbol': symbol, 'kind': kind, **history})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/refresh-prices/<job_id>')
+def refresh_prices_status(job_id):
+    """Return a refresh job's status and per-symbol progress"""
+    job = get_refresh_job(job_id)
+    if job is None:
+        return jsonify({'error': f'Unknown refresh job: {job_id}'}), 404
+    return jsonify(job)
+
 @app.route('/api/analysis-archive')
+@conditional('analyses')
 def api_analysis_archive():
-    """Return stock analysis archive for Analysis Archive tab"""
+    """
+    Return one page of the stock analysis archive for Analysis Archive tab.
+    
+    Query params: ticker, grade (comma-separated), from, to (ISO dates),
+    sort (date/ticker/grade/file, '-' prefix for descending), limit, cursor,
+    fields (comma-separated projection). Content is served by /api/analysis/<file>.
+    
+    With ?stream=1 the filtered archive is streamed as a JSON array of full
+    documents instead, in the same sort order (no paging; fields still projects).
+    """
+    try:
+        if USE_DATA_LAYER:
+            args = request.args
+            fields = args.get('fields')
+            if wants_stream():
+                try:
+                    analyses = iter_analyses(
+                        ticker=args.get('ticker'),
+                        grade=args.get('grade'),
+                        date_from=args.get('from'),
+                        date_to=args.get('to'),
+                        fields=[f for f in fields.split(',') if f] if fields else None,
+                        sort=args.get('sort', '-date')
+                    )
+                except ValueError as e:
+                    return jsonify({'error': str(e)}), 400
+                return stream_json_array(analyses)
+            try:
+                page = query_analyses(
+                    ticker=args.get('ticker'),
+                    grade=args.get('grade'),
+                    date_from=args.get('from'),
+                    date_to=args.get('to'),
+                    sort=args.get('sort', '-date'),
+                    limit=int(args.get('limit', 50)),
+                    cursor=args.get('cursor'),
+                    fields=[f for f in fields.split(',') if f] if fields else None
+                )
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            return jsonify(page)
+        else:
+            return jsonify({'items': [], 'next_cursor': None, 'total': 0})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/analysis/<key>')
+@conditional('analyses')
+def api_analysis(key):
+    """Return one full analysis document, including content (by file name, or section key for markdown)"""
     try:
         if USE_DATA_LAYER:
-            analyses = load_analyses(use_markdown_fallback=True)
-            return jsonify(analyses)
+            analysis = load_analysis(key)
+            if analysis is None:
+                return jsonify({'error': 'Analysis not found'}), 404
+            return jsonify(analysis)
         else:
-            return jsonify([])
+            return jsonify({'error': 'Data layer not available'}), 500
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/analysis-search')
+@conditional('analyses')
+def api_analysis_search():
+    """Full-text search over the analysis archive (q, limit)"""
+    try:
+        if USE_DATA_LAYER:
+            try:
+                limit = min(int(request.args.get('limit', 20)), 100)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            return jsonify(search_analyses(request.args.get('q', ''), limit=limit))
+        else:
+            return jsonify({'query': '', 'total': 0, 'hits': []})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/earnings-research')
+@conditional('earnings')
 def api_earnings_research():
     """Return earnings research for Earnings Research tab"""
     try:
         if USE_DATA_LAYER:
             earnings = load_earnings()
+            if wants_stream():
+                return stream_json_array(earnings)
             return jsonify(earnings)
         else:
             return jsonify([])
@@ -397,11 +629,14 @@ def api_earnings_research():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/ideas')
+@conditional('ideas')
 def api_ideas():
     """Return ideas for Ideas & Notes tab"""
     try:
         if USE_DATA_LAYER:
             ideas = load_ideas()
+            if wants_stream() and isinstance(ideas, dict):
+                return stream_json_object(ideas, 'ideas', ideas.get('ideas', []))
             return jsonify(ideas)
         else:
             return jsonify([])
@@ -434,13 +669,7 @@ def queue_idea():
         
         # Update status to in_progress if it's approved
         if idea.get('status') == 'approved':
-            idea['status'] = 'in_progress'
-            # Save updated ideas
-            from pathlib import Path
-            import json
-            ideas_file = Path(WORKSPACE) / 'portfolio' / 'data' / 'ideas.json'
-            with open(ideas_file, 'w') as f:
-                json.dump({'ideas': ideas_list, 'last_updated': datetime.now().isoformat()}, f, indent=2)
+            idea = update_idea(idea_id, {'status': 'in_progress'}) or idea
         
         # Add to queue file for notification
         try:
@@ -477,6 +706,7 @@ def queue_status():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/schedule')
+@conditional('schedule')
 def api_schedule():
     """Return schedule for Schedule tab"""
     try:
@@ -489,6 +719,7 @@ def api_schedule():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/corporate')
+@conditional('corporate')
 def api_corporate():
     """Return corporate structure for Corporate tab"""
     try:
@@ -506,38 +737,108 @@ def api_corporate():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/usage')
-def api_usage():
-    """Return API usage for API Usage tab"""
-    try:
-        # Read from api_usage.json
+def usage_payload():
+    """API usage tab view built from api_usage.json"""
+    if USE_DATA_LAYER:
+        # Same source (JSON or SQLite) as the 'api_usage' ETag
+        api_list = [api for api in load_api_usage() if '_error' not in api]
+    else:
+        # Fallback: load directly from JSON
         api_file = os.path.join(DATA_DIR, 'api_usage.json')
+        api_list = []
         if os.path.exists(api_file):
             with open(api_file, 'r') as f:
                 api_list = json.load(f)
-                # Transform to expected format
-                api_usage_data = {}
-                total_cost = 0.0
-                for api in api_list:
-                    api_id = api.get('id', api.get('name', 'unknown'))
-                    api_usage_data[api_id] = {
-                        'name': api.get('name', 'Unknown'),
-                        'purpose': api.get('purpose', ''),
-                        'status': api.get('status', 'Active'),
-                        'tier': api.get('tier', 'Free'),
-                        'limit': api.get('limits', {}).get('requests_per_min') or api.get('limits', {}).get('monthly_limit') or 'N/A',
-                        'calls_this_month': api.get('calls_this_month', 0),
-                        'cost': api.get('cost_this_month', 0.0),
-                        'dashboard_url': api.get('dashboard_url', '')
-                    }
-                    total_cost += api.get('cost_this_month', 0.0)
-                return jsonify({'apis': api_usage_data, 'total_cost': total_cost})
-        # Fallback: return empty structure
-        return jsonify({'apis': {}, 'total_cost': 0.0})
+
+    # Transform to expected format
+    api_usage_data = {}
+    total_cost = 0.0
+    for api in api_list:
+        api_id = api.get('id', api.get('name', 'unknown'))
+        api_usage_data[api_id] = {
+            'name': api.get('name', 'Unknown'),
+            'purpose': api.get('purpose', ''),
+            'status': api.get('status', 'Active'),
+            'tier': api.get('tier', 'Free'),
+            'limit': api.get('limits', {}).get('requests_per_min') or api.get('limits', {}).get('monthly_limit') or 'N/A',
+            'calls_this_month': api.get('calls_this_month', 0),
+            'cost': api.get('cost_this_month', 0.0),
+            'dashboard_url': api.get('dashboard_url', '')
+        }
+        total_cost += api.get('cost_this_month', 0.0)
+    return {'apis': api_usage_data, 'total_cost': total_cost}
+
+@app.route('/api/usage')
+@conditional('api_usage')
+def api_usage():
+    """Return API usage for API Usage tab"""
+    try:
+        return jsonify(usage_payload())
     except Exception as e:
         import traceback
         return jsonify({'error': str(e), 'traceback': traceback.format_exc()}), 500
 
+# Fields the Earnings tab cards show; full research stays on /api/earnings-research
+EARNINGS_SUMMARY_FIELDS = ('ticker', 'grade', 'date', 'expected_move', 'action', 'iv_rank')
+# Matches the Analysis tab's page size
+BOOTSTRAP_ANALYSIS_LIMIT = 60
+
+def _bootstrap_section(build):
+    """One bootstrap section; a failure is reported in place instead of failing the page"""
+    try:
+        return build()
+    except Exception as e:
+        return {'error': str(e)}
+
+@app.route('/api/bootstrap')
+@conditional(portfolio_version, 'analyses', 'earnings', 'ideas', 'schedule', 'corporate', 'api_usage')
+def api_bootstrap():
+    """
+    Everything the dashboard needs for its first paint, in one request.
+
+    Sections: portfolio (the full Holdings view), analysis (first archive
+    page, no content), earnings (card fields only), ideas, schedule,
+    corporate and usage. Each section has the same shape as its tab
+    endpoint; analysis content and full earnings research stay lazy.
+    """
+    if not USE_DATA_LAYER:
+        return jsonify({'error': 'Data layer not available'}), 500
+
+    def earnings_summaries():
+        earnings = load_earnings()
+        if not isinstance(earnings, list):
+            return earnings
+        return [{k: e[k] for k in EARNINGS_SUMMARY_FIELDS if k in e} for e in earnings if isinstance(e, dict)]
+
+    return jsonify({
+        'portfolio': _bootstrap_section(portfolio_payload),
+        'analysis': _bootstrap_section(lambda: query_analyses(sort='-date', limit=BOOTSTRAP_ANALYSIS_LIMIT)),
+        'earnings': _bootstrap_section(earnings_summaries),
+        'ideas': _bootstrap_section(load_ideas),
+        'schedule': _bootstrap_section(load_schedule),
+        'corporate': _bootstrap_section(load_team),
+        'usage': _bootstrap_section(usage_payload),
+    })
+
+@app.route('/api/cache-stats')
+def api_cache_stats():
+    """Return data layer file cache hit/miss counters"""
+    try:
+        if USE_DATA_LAYER:
+            return jsonify(get_cache_stats())
+        else:
+            return jsonify({})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/http-stats')
+def api_http_stats():
+    """Return per-host latency and connection reuse for outbound price API calls"""
+    try:
+        return jsonify(http_client.get_stats())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/')
 def dashboard():
     """Render dashboard"""
@@ -548,6 +849,10 @@ def corporate_test():
     """Standalone corporate tab test"""
     return render_template('corporate_test_standalone.html')
 
+# Keep price_cache.json warm in the background (one thread per worker process)
+if USE_DATA_LAYER and os.environ.get('PRICE_BACKGROUND_REFRESH', '1') != '0':
+    start_background_refresher(lambda: load_holdings(use_markdown_fallback=True))
+
 if __name__ == '__main__':
     import sys
     port = int(sys.argv[1]) if len(sys.argv) > 1 else 8080
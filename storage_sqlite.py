@@ -0,0 +1,428 @@
+"""
+Mission Control SQLite Storage
+
+Optional storage engine for the data layer (MC_STORAGE=sqlite). The JSON
+documents (holdings.json, ideas.json, ...) and the analyses/ archive live in
+one SQLite database instead of one file per domain:
+
+- list-shaped documents are stored one row per item (accounts, ideas,
+  events, earnings) with indexed key/status/ticker/date columns, so a point
+  update rewrites one row instead of the whole file;
+- analyses are stored one row per file with indexed ticker/date/grade
+  columns, so archive filters run in SQL without opening any document;
+- every write bumps a per-domain version, which the data layer reports as
+  the source version (ETags, view caches).
+
+The database runs in WAL mode, so gunicorn workers read concurrently while
+one writes.
+
+Import/export the existing JSON files:
+    python storage_sqlite.py import [--data-dir DIR] [--db FILE]
+    python storage_sqlite.py export [--data-dir DIR] [--db FILE]
+"""
+
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+# domain -> (file name, item list key, item key field); documents without an
+# item list are stored whole
+DOCUMENTS = {
+    "holdings": ("holdings.json", "accounts", "name"),
+    "ideas": ("ideas.json", "ideas", "id"),
+    "schedule": ("schedule.json", "events", "id"),
+    "earnings": ("earnings.json", "earnings", "ticker"),
+    "corporate": ("corporate.json", None, None),
+    "api_usage": ("api_usage.json", None, None),
+}
+DOCUMENT_FILES = {spec[0]: domain for domain, spec in DOCUMENTS.items()}
+
+# Manifest fields kept in their own columns / in the 'extra' column
+ANALYSIS_COLUMNS = ("ticker", "date", "grade", "summary")
+ANALYSIS_EXTRA_FIELDS = ("price_target", "entry", "current", "gain")
+
+BUSY_TIMEOUT_MS = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    name TEXT PRIMARY KEY,
+    shape TEXT NOT NULL,            -- 'list', 'object' (items under a key) or 'document'
+    extras TEXT,                    -- the document without its item list
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS items (
+    domain TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    item_key TEXT,
+    status TEXT,
+    ticker TEXT,
+    date TEXT,
+    body TEXT NOT NULL,
+    PRIMARY KEY (domain, position)
+);
+CREATE INDEX IF NOT EXISTS items_key ON items (domain, item_key);
+CREATE INDEX IF NOT EXISTS items_status ON items (domain, status);
+CREATE INDEX IF NOT EXISTS items_ticker ON items (domain, ticker);
+CREATE INDEX IF NOT EXISTS items_date ON items (domain, date);
+CREATE TABLE IF NOT EXISTS analyses (
+    file TEXT PRIMARY KEY,
+    ticker TEXT,
+    date TEXT,
+    grade TEXT,
+    summary TEXT,
+    extra TEXT,
+    body TEXT NOT NULL,
+    version INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS analyses_ticker ON analyses (upper(ticker));
+CREATE INDEX IF NOT EXISTS analyses_date ON analyses (date);
+CREATE INDEX IF NOT EXISTS analyses_grade ON analyses (grade);
+"""
+
+
+def _dumps(data: Any) -> str:
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+
+
+def _column(item: Any, field: Optional[str]) -> Optional[str]:
+    """Indexed column value for an item field (stored as text)"""
+    if not field or not isinstance(item, dict) or item.get(field) is None:
+        return None
+    return str(item[field])
+
+
+class SQLiteStore:
+    """
+    One SQLite database holding every data-layer domain.
+
+    Connections are per thread; all methods are safe to call from any
+    thread or gunicorn worker.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._local = threading.local()
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            with self._schema_lock:
+                if not self._schema_ready:
+                    conn.executescript(SCHEMA)
+                    self._schema_ready = True
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _write(self):
+        """Write transaction (taken up front, so concurrent writers queue instead of deadlocking)"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection, name: str, shape: str, extras: Optional[str] = None,
+              keep_extras: bool = False) -> int:
+        row = conn.execute("SELECT version, extras FROM documents WHERE name = ?", (name,)).fetchone()
+        version = (row[0] if row else 0) + 1
+        if keep_extras and row:
+            extras = row[1]
+        conn.execute("INSERT OR REPLACE INTO documents (name, shape, extras, version) VALUES (?, ?, ?, ?)",
+                     (name, shape, extras, version))
+        return version
+
+    # ------------------------------------------------------------------
+    # Documents
+    # ------------------------------------------------------------------
+
+    def version(self, domain: str) -> Optional[int]:
+        """Current version of a domain, or None if it was never stored."""
+        row = self._conn().execute("SELECT version FROM documents WHERE name = ?", (domain,)).fetchone()
+        return row[0] if row else None
+
+    def load_document(self, domain: str) -> tuple[Optional[Any], Optional[int], int]:
+        """
+        Rebuild a domain's JSON document.
+
+        Returns:
+            Tuple of (document or None if never stored, version, stored
+            JSON length). All come from one read transaction.
+        """
+        _, list_key, _ = DOCUMENTS[domain]
+        conn = self._conn()
+        conn.execute("BEGIN")
+        try:
+            row = conn.execute("SELECT shape, extras, version FROM documents WHERE name = ?", (domain,)).fetchone()
+            if row is None:
+                return None, None, 0
+            shape, extras, version = row
+            if shape == "document":
+                return json.loads(extras), version, len(extras)
+            bodies = [body for (body,) in conn.execute(
+                "SELECT body FROM items WHERE domain = ? ORDER BY position", (domain,))]
+        finally:
+            conn.execute("COMMIT")
+        items = [json.loads(body) for body in bodies]
+        size = sum(map(len, bodies)) + len(extras or '')
+        if shape == "list":
+            return items, version, size
+        document = json.loads(extras) if extras else {}
+        document[list_key] = items
+        return document, version, size
+
+    def save_document(self, domain: str, document: Any) -> int:
+        """
+        Replace a domain's document.
+
+        Returns:
+            The new version.
+        """
+        with self._write() as conn:
+            return self._save_document(conn, domain, document)
+
+    @staticmethod
+    def _save_document(conn: sqlite3.Connection, domain: str, document: Any) -> int:
+        """save_document inside the caller's write transaction"""
+        _, list_key, key_field = DOCUMENTS[domain]
+        if list_key and isinstance(document, list):
+            shape, extras, items = "list", None, document
+        elif list_key and isinstance(document, dict) and isinstance(document.get(list_key), list):
+            shape, items = "object", document[list_key]
+            extras = _dumps({k: v for k, v in document.items() if k != list_key})
+        else:
+            shape, extras, items = "document", _dumps(document), []
+
+        conn.execute("DELETE FROM items WHERE domain = ?", (domain,))
+        conn.executemany(
+            "INSERT INTO items (domain, position, item_key, status, ticker, date, body) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(domain, position, _column(item, key_field), _column(item, "status"), _column(item, "ticker"),
+              _column(item, "date"), _dumps(item)) for position, item in enumerate(items)])
+        return SQLiteStore._bump(conn, domain, shape, extras)
+
+    def find_items(self, domain: str, **filters: str) -> list:
+        """Items whose indexed columns (item_key, status, ticker, date) equal the given values"""
+        columns = {"item_key", "status", "ticker", "date"}
+        if not filters.keys() <= columns:
+            raise ValueError(f"Unknown item filter: {sorted(filters.keys() - columns)}")
+        where = "".join(f" AND {column} = ?" for column in filters)
+        rows = self._conn().execute(f"SELECT body FROM items WHERE domain = ?{where} ORDER BY position",
+                                    (domain, *filters.values()))
+        return [json.loads(body) for (body,) in rows]
+
+    def update_item(self, domain: str, key: str, changes: dict, extras: Optional[dict] = None) -> Optional[dict]:
+        """
+        Point update: merge changes into the item whose key field equals key.
+
+        Args:
+            extras: Top-level document fields to set as well (e.g. last_updated)
+
+        Returns:
+            The updated item, or None if there is no such item.
+        """
+        _, _, key_field = DOCUMENTS[domain]
+        with self._write() as conn:
+            row = conn.execute("SELECT position, body FROM items WHERE domain = ? AND item_key = ? ORDER BY position",
+                               (domain, str(key))).fetchone()
+            if row is None:
+                return None
+            position, body = row
+            item = json.loads(body)
+            item.update(changes)
+            conn.execute("UPDATE items SET item_key = ?, status = ?, ticker = ?, date = ?, body = ? "
+                         "WHERE domain = ? AND position = ?",
+                         (_column(item, key_field), _column(item, "status"), _column(item, "ticker"),
+                          _column(item, "date"), _dumps(item), domain, position))
+            shape, stored_extras = conn.execute("SELECT shape, extras FROM documents WHERE name = ?",
+                                                (domain,)).fetchone()
+            if extras and shape == "object":
+                stored_extras = _dumps({**(json.loads(stored_extras) if stored_extras else {}), **extras})
+            self._bump(conn, domain, shape, stored_extras)
+        return item
+
+    # ------------------------------------------------------------------
+    # Analyses
+    # ------------------------------------------------------------------
+
+    def analyses_version(self) -> int:
+        return self.version("analyses") or 0
+
+    def save_analysis(self, file: str, data: dict) -> int:
+        """Insert or replace one analysis document; returns the archive version"""
+        with self._write() as conn:
+            version = self._bump(conn, "analyses", "analyses")
+            self._save_analysis(conn, file, data, version)
+        return version
+
+    @staticmethod
+    def _save_analysis(conn: sqlite3.Connection, file: str, data: dict, version: int) -> None:
+        extra = {field: data[field] for field in ANALYSIS_EXTRA_FIELDS if field in data}
+        conn.execute("INSERT OR REPLACE INTO analyses (file, ticker, date, grade, summary, extra, body, version) "
+                     "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                     (file, *(data.get(field, '') for field in ANALYSIS_COLUMNS), _dumps(extra),
+                      _dumps(data), version))
+
+    def delete_analysis(self, file: str) -> bool:
+        with self._write() as conn:
+            deleted = conn.execute("DELETE FROM analyses WHERE file = ?", (file,)).rowcount > 0
+            if deleted:
+                self._bump(conn, "analyses", "analyses")
+        return deleted
+
+    def analysis_version(self, file: str) -> Optional[int]:
+        """Row version of one analysis, or None if it is not stored"""
+        row = self._conn().execute("SELECT version FROM analyses WHERE file = ?", (file,)).fetchone()
+        return row[0] if row else None
+
+    def load_analysis(self, file: str) -> tuple[Optional[dict], Optional[int], int]:
+        """(document, row version, stored JSON length) of one analysis, or (None, None, 0)"""
+        row = self._conn().execute("SELECT body, version FROM analyses WHERE file = ?", (file,)).fetchone()
+        return (json.loads(row[0]), row[1], len(row[0])) if row else (None, None, 0)
+
+    def analysis_entries(self, tickers: Optional[Iterable[str]] = None, grades: Optional[Iterable[str]] = None,
+                         date_from: Optional[str] = None, date_to: Optional[str] = None) -> list[dict]:
+        """
+        Manifest-style entries (file, ticker, date, grade, summary, optional
+        fields, plus 'mtime' = row version and 'size' = document length),
+        filtered in SQL. Same filter semantics as the data layer's matcher.
+        """
+        where, params = [], []
+        if tickers is not None:
+            tickers = list(tickers)
+            where.append(f"upper(ticker) IN ({','.join('?' * len(tickers))})")
+            params.extend(tickers)
+        if grades is not None:
+            grades = list(grades)
+            where.append(f"grade IN ({','.join('?' * len(grades))})")
+            params.extend(grades)
+        if date_from:
+            where.append("date >= ?")
+            params.append(date_from)
+        if date_to:
+            where.append("substr(date, 1, ?) <= ?")
+            params.extend([len(date_to), date_to])
+        sql = "SELECT file, ticker, date, grade, summary, extra, version, length(body) FROM analyses"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        entries = []
+        for file, ticker, date, grade, summary, extra, version, size in self._conn().execute(sql + " ORDER BY file", params):
+            entry = {"file": file, "mtime": version, "size": size,
+                     "ticker": ticker, "date": date, "grade": grade, "summary": summary}
+            if extra:
+                entry.update(json.loads(extra))
+            entries.append(entry)
+        return entries
+
+    # ------------------------------------------------------------------
+    # Import / export
+    # ------------------------------------------------------------------
+
+    def import_json(self, data_dir: Path, analyses_dir: Path) -> dict:
+        """
+        Load every JSON document and analysis file into the database
+        (replacing what is there). Missing files are skipped.
+
+        Everything is written in one transaction, and each domain's version
+        (the analyses archive's included) is bumped once.
+
+        Returns:
+            Dict of domain -> number of items (or 1 for whole documents).
+        """
+        documents = {}
+        for domain, (file_name, _, _) in DOCUMENTS.items():
+            path = Path(data_dir) / file_name
+            if path.is_file():
+                with open(path, 'r', encoding='utf-8') as f:
+                    documents[domain] = json.load(f)
+
+        analyses = {}
+        files = sorted(Path(analyses_dir).glob("*.json")) if Path(analyses_dir).is_dir() else []
+        for path in files:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Skipping {path.name}: {e}")
+                continue
+            if isinstance(data, dict):
+                analyses[path.name] = data
+
+        counts = {}
+        with self._write() as conn:
+            for domain, document in documents.items():
+                self._save_document(conn, domain, document)
+                list_key = DOCUMENTS[domain][1]
+                items = document if isinstance(document, list) else (document or {}).get(list_key) if list_key else None
+                counts[domain] = len(items) if isinstance(items, list) else 1
+
+            version = self._bump(conn, "analyses", "analyses")
+            conn.execute("DELETE FROM analyses")
+            for file, data in analyses.items():
+                self._save_analysis(conn, file, data, version)
+        counts["analyses"] = len(analyses)
+        return counts
+
+    def export_json(self, data_dir: Path, analyses_dir: Path) -> dict:
+        """
+        Write every stored domain back out as the data layer's JSON files.
+
+        Returns:
+            Dict of domain -> number of files written.
+        """
+        counts = {}
+        Path(data_dir).mkdir(parents=True, exist_ok=True)
+        for domain, (file_name, _, _) in DOCUMENTS.items():
+            document, _, _ = self.load_document(domain)
+            if document is None:
+                continue
+            with open(Path(data_dir) / file_name, 'w', encoding='utf-8') as f:
+                json.dump(document, f, indent=2, ensure_ascii=False)
+            counts[domain] = 1
+
+        Path(analyses_dir).mkdir(parents=True, exist_ok=True)
+        entries = self.analysis_entries()
+        for entry in entries:
+            data, _, _ = self.load_analysis(entry["file"])
+            with open(Path(analyses_dir) / entry["file"], 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+        counts["analyses"] = len(entries)
+        return counts
+
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+if __name__ == "__main__":
+    import argparse
+
+    import data_layer
+
+    parser = argparse.ArgumentParser(description="Import/export Mission Control JSON data to/from SQLite")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("--data-dir", type=Path, default=data_layer.DATA_DIR)
+    parser.add_argument("--db", type=Path, default=data_layer.SQLITE_FILE)
+    args = parser.parse_args()
+
+    store = SQLiteStore(args.db)
+    analyses_dir = args.data_dir / "analyses"
+    if args.command == "import":
+        counts = store.import_json(args.data_dir, analyses_dir)
+        print(f"Imported into {args.db}: {counts}")
+    else:
+        counts = store.export_json(args.data_dir, analyses_dir)
+        print(f"Exported {args.db} to {args.data_dir}: {counts}")
@@ -0,0 +1,42 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Importing server must not start the background price refresher
+os.environ.setdefault('PRICE_BACKGROUND_REFRESH', '0')
+
+
+@pytest.fixture(autouse=True)
+def isolated_storage(monkeypatch, tmp_path):
+    """Keep the data files, price cache, store, history and versions out of the real data directory"""
+    import data_layer
+    import portfolio_versions
+    import price_history
+    import price_store
+    import prices
+
+    storage = tmp_path / 'storage'
+    monkeypatch.setattr(prices, 'PRICE_FILE', str(storage / 'price_cache.json'))
+    monkeypatch.setattr(prices, 'JOBS_DIR', str(storage / 'refresh_jobs'))
+    monkeypatch.setattr(price_store, 'STORE_FILE', str(storage / 'price_store.bin'))
+    monkeypatch.setattr(price_history, 'HISTORY_DIR', str(storage / 'price_history'))
+    monkeypatch.setattr(portfolio_versions, 'VERSIONS_DIR', str(storage / 'portfolio_versions'))
+
+    data_dir = tmp_path / 'data'
+    monkeypatch.setattr(data_layer, 'PORTFOLIO_DIR', tmp_path)
+    monkeypatch.setattr(data_layer, 'DATA_DIR', data_dir)
+    monkeypatch.setattr(data_layer, 'SCHEMAS_DIR', tmp_path / 'schemas')
+    monkeypatch.setattr(data_layer, 'ANALYSES_DIR', data_dir / 'analyses')
+    monkeypatch.setattr(data_layer, 'ANALYSES_MANIFEST_FILE', data_dir / 'analyses_manifest.json')
+    monkeypatch.setattr(data_layer, 'COMPILED_DIR', data_dir / 'compiled')
+    # In-memory state built from the previous paths
+    monkeypatch.setattr(data_layer, '_manifest_entries', None)
+    monkeypatch.setattr(data_layer, '_search_docs', {})
+    monkeypatch.setattr(data_layer, '_search_postings', {})
+    monkeypatch.setattr(data_layer, '_search_total_length', 0)
+    monkeypatch.setattr(data_layer, '_search_generation', None)
+    data_layer.clear_cache()
+    return storage
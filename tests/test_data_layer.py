@@ -0,0 +1,104 @@
+import json
+
+import data_layer
+
+
+def _write(name, data):
+    data_layer.DATA_DIR.mkdir(parents=True, exist_ok=True)
+    (data_layer.DATA_DIR / name).write_text(json.dumps(data))
+
+
+def test_cache_hit_does_not_reparse(monkeypatch):
+    _write('schedule.json', {'events': [{'title': 'FOMC', 'date': '2026-11-04'}]})
+    first = data_layer.load_schedule()
+
+    def fail(*args, **kwargs):
+        raise AssertionError('cache hit re-parsed the file')
+
+    monkeypatch.setattr(data_layer.json, 'loads', fail)
+    monkeypatch.setattr(data_layer, '_copy_json', fail)
+    second = data_layer.load_schedule()
+
+    assert second is first
+    assert data_layer.get_cache_stats()['hits'] == 1
+
+
+def test_mutating_loaders_do_not_touch_the_cache():
+    _write('corporate.json', {'team': [{'id': 'b', 'reports_to': 'a'}]})
+    _write('ideas.json', {'ideas': [{'id': 'x', 'ticker': 'AAPL', 'status': 'watching', 'thesis': ''}]})
+
+    assert data_layer.load_team()['hierarchy'] == {'a': ['b']}
+    cached, _, _ = data_layer._load_json_document(data_layer.DATA_DIR / 'corporate.json')
+    assert 'hierarchy' not in cached
+
+    before = data_layer.load_ideas()
+    data_layer.update_idea('x', {'status': 'ready'})
+    assert before['ideas'][0]['status'] == 'watching'
+    assert data_layer.load_ideas()['ideas'][0]['status'] == 'ready'
+
+
+def test_earnings_validated_once_per_document():
+    _write('earnings.json', [{'ticker': 'AAPL', 'date': '2026-10-30'}, {'ticker': 'MSFT', 'date': '2026-10-28'}])
+
+    assert data_layer.load_earnings() == data_layer.load_earnings()
+    stats = data_layer.get_cache_stats()['validation']
+    assert (stats['validated'], stats['skipped']) == (1, 1)
+
+
+def test_invalid_earnings_items_are_flagged():
+    _write('earnings.json', {'earnings': [{'ticker': 'AAPL', 'date': '2026-10-30'}, {'ticker': 'MSFT'}]})
+
+    earnings = data_layer.load_earnings()
+    assert '_validation_error' not in earnings[0]
+    assert 'date' in earnings[1]['_validation_error']
+
+
+ANALYSIS_HISTORY = """# Analysis History
+
+## AAPL
+**Analyzed:** 2026-09-01
+**Grade:** B
+First look.
+
+## MSFT
+**Analyzed:** 2026-09-01
+**Grade:** A
+Cloud.
+
+## AAPL
+**Analyzed:** 2026-10-01
+**Grade:** A-
+Second look.
+"""
+
+
+def _write_history():
+    (data_layer.PORTFOLIO_DIR / 'analysis_history.md').write_text(ANALYSIS_HISTORY)
+
+
+def test_markdown_sections_of_one_ticker_have_distinct_keys():
+    _write_history()
+
+    listed = data_layer.load_analysis_summaries()['_analyses']
+    keys = [entry['file'] for entry in listed if entry['ticker'] == 'AAPL']
+    assert len(set(keys)) == 2
+
+    contents = [data_layer.load_analysis(key)['content'] for key in keys]
+    assert [c.splitlines()[-1] for c in contents] == ['First look.', 'Second look.']
+    assert data_layer.load_analysis('AAPL')['content'] == contents[0]
+
+
+def test_markdown_pages_do_not_skip_or_repeat_ties():
+    _write_history()
+    (data_layer.PORTFOLIO_DIR / 'analysis_history.md').write_text(
+        ANALYSIS_HISTORY.replace('2026-10-01', '2026-09-01'))
+
+    seen, cursor = [], None
+    while True:
+        page = data_layer.query_analyses(sort='-date', limit=1, cursor=cursor)
+        seen += [item['file'] for item in page['items']]
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+
+    assert len(seen) == len(set(seen)) == 3
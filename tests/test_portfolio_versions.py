@@ -0,0 +1,76 @@
+import copy
+
+import portfolio_versions
+
+
+def _option(account, value):
+    return {'ticker': 'AAPL', 'type': 'CALL', 'strike': 150.0, 'expiration': '2027-01-15',
+            'total_contracts': 1, 'current_value': value,
+            'accounts': [{'account': account, 'contracts': 1, 'entry_premium': 5}]}
+
+
+def _misc(amount):
+    return {'asset': 'bitcoin', 'type': 'Crypto', 'amount': amount, 'account': 'A'}
+
+
+def _view(b_value, second_lot):
+    return {'stocks': [], 'options': [_option('A', 100.0), _option('B', b_value)],
+            'misc': [_misc(1), _misc(second_lot)], 'cash': {}, 'account_totals': {},
+            'totals': {'grand_total': 100.0 + b_value}, 'greeks': {}}
+
+
+def _apply(base, delta):
+    """Python mirror of the dashboard's applyVersionDelta row merge"""
+    view = copy.deepcopy(base)
+    for section in portfolio_versions.ROW_SECTIONS:
+        changes = delta[section]
+        keys = portfolio_versions.row_keys(section, base[section])
+        rows = dict(zip(keys, base[section]))
+        for key in changes['removed']:
+            rows.pop(key)
+        rows.update(changes['added'])
+        rows.update(changes['changed'])
+        view[section] = [rows[key] for key in changes.get('order', keys)]
+    return view
+
+
+def test_same_contract_in_two_accounts(tmp_path, monkeypatch):
+    monkeypatch.setattr(portfolio_versions, 'VERSIONS_DIR', str(tmp_path))
+    old = _view(200.0, 2)
+    old['portfolio_version'] = since = portfolio_versions.register_view(old)
+    new = _view(300.0, 3)
+    new['portfolio_version'] = portfolio_versions.register_view(new)
+
+    delta = portfolio_versions.delta_since(since, new)
+
+    options = delta['options']
+    assert not options['added'] and not options['removed']
+    assert list(options['changed']) == ['B|AAPL|CALL|150|2027-01-15']
+    assert list(delta['misc']['changed']) == ['A|bitcoin#1']
+
+    merged = _apply(old, delta)
+    assert merged['options'] == new['options']
+    assert merged['misc'] == new['misc']
+
+
+def test_incremental_and_rebuilt_views_share_a_version():
+    from datetime import date
+
+    from valuation import PortfolioModel
+
+    holdings = {'accounts': [
+        {'name': 'A', 'stocks_etfs': [{'Ticker': 'AAPL', 'Shares': 3.3, 'Cost Basis': 100.1},
+                                      {'Ticker': 'MSFT', 'Shares': 7, 'Cost Basis': 50.5}],
+         'options': [{'Ticker': 'AAPL', 'Type': 'CALL', 'Strike': 150, 'Expiration': '2027-01-15',
+                      'Contracts': -2, 'Entry Premium': 1.37}],
+         'misc': [{'Asset': 'bitcoin', 'Amount': 0.123, 'Cost Basis': 1000}]},
+        {'name': 'B', 'stocks_etfs': [{'Ticker': 'AAPL', 'Shares': 1.1, 'Cost Basis': 10}]},
+    ]}
+    before = {'AAPL': 187.31, 'MSFT': 411.07, 'bitcoin': 61234.5}
+    after = {'AAPL': 191.17, 'MSFT': 402.9, 'bitcoin': 59876.25}
+
+    incremental = PortfolioModel(holdings, before, {}, today=date(2026, 1, 5))
+    incremental.sync(after)
+    rebuilt = PortfolioModel(holdings, after, {}, today=date(2026, 1, 5))
+
+    assert portfolio_versions.register_view(incremental.view) == portfolio_versions.register_view(rebuilt.view)
@@ -0,0 +1,151 @@
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+import file_utils
+import prices
+
+
+def test_refresh_creates_cache_directory(monkeypatch, isolated_storage):
+    monkeypatch.setattr(prices, 'fetch_quotes', lambda symbols, provider: {})
+    assert not isolated_storage.exists()
+
+    assert prices.refresh_price_cache({'accounts': []}) is not None
+    assert os.path.isdir(isolated_storage)
+
+
+def test_failed_symbols_back_off(monkeypatch):
+    calls = []
+
+    def fetch_quotes(symbols, provider):
+        calls.append(set(symbols))
+        return {}
+
+    monkeypatch.setattr(prices, 'fetch_quotes', fetch_quotes)
+    holdings = {'accounts': [{'stocks_etfs': [{'Ticker': 'DEAD'}]}]}
+
+    prices.refresh_price_cache(holdings)
+    failure = prices.load_price_cache()['failures']['stocks']['DEAD']
+    assert failure['attempts'] == 1
+    assert any('DEAD' in symbols for symbols in calls)
+
+    # Within the back-off window the next check does not ask again
+    calls.clear()
+    assert prices.refresh_price_cache(holdings)[1] == 0
+    assert calls == []
+
+    # A forced refresh does, and the back-off doubles
+    prices.refresh_price_cache(holdings, force=True)
+    failure = prices.load_price_cache()['failures']['stocks']['DEAD']
+    assert failure['attempts'] == 2
+    retry_after = datetime.fromisoformat(failure['retry_after'])
+    last_attempt = datetime.fromisoformat(failure['last_attempt'])
+    assert retry_after - last_attempt == timedelta(seconds=2 * prices.RETRY_BASE_SECONDS)
+
+
+def test_success_clears_failure(monkeypatch):
+    holdings = {'accounts': [{'stocks_etfs': [{'Ticker': 'AAPL'}]}]}
+    monkeypatch.setattr(prices, 'fetch_quotes', lambda symbols, provider: {})
+    prices.refresh_price_cache(holdings)
+
+    monkeypatch.setattr(prices, 'fetch_quotes', lambda symbols, provider: {s: 10.0 for s in symbols})
+    prices.refresh_price_cache(holdings, force=True)
+
+    cache = prices.load_price_cache()
+    assert cache['failures']['stocks'] == {}
+    assert cache['prices']['stocks']['AAPL']['price'] == 10.0
+
+
+def test_forced_refresh_is_not_joined_to_unforced_job(monkeypatch):
+    started = []
+    monkeypatch.setattr(prices._RefreshJob, 'run', lambda job, holdings: started.append(job.state['force']))
+
+    first = prices.start_refresh_job({'accounts': []})
+    joined = prices.start_refresh_job({'accounts': []})
+    forced = prices.start_refresh_job({'accounts': []}, force=True)
+    joined_forced = prices.start_refresh_job({'accounts': []}, force=True)
+    joined_unforced = prices.start_refresh_job({'accounts': []})
+
+    assert joined['id'] == first['id'] and joined['coalesced']
+    assert forced['id'] != first['id'] and not forced['coalesced'] and forced['force']
+    assert joined_forced['id'] == joined_unforced['id'] == forced['id']
+    for thread in threading.enumerate():
+        if thread.name.startswith('refresh-job-'):
+            thread.join(timeout=5)
+    assert sorted(started) == [False, True]
+
+
+def test_snapshot_seeding_does_not_wait_for_a_refresh():
+    cache = prices.load_price_cache()
+    cache['prices']['stocks']['AAPL'] = {'price': 190.0, 'source': 'finnhub', 'timestamp': datetime.now().isoformat()}
+    os.makedirs(os.path.dirname(prices.PRICE_FILE))
+    file_utils.write_json_atomic(prices.PRICE_FILE, cache)
+
+    snapshots = []
+    with file_utils.file_lock(f'{prices.PRICE_FILE}.lock'):  # a refresh in flight
+        reader = threading.Thread(target=lambda: snapshots.append(prices.get_price_snapshot()))
+        reader.start()
+        reader.join(timeout=5)
+        assert not reader.is_alive()
+    assert snapshots[0].prices['AAPL'] == 190.0
+
+
+SPARK_FILE = os.path.join(os.path.dirname(__file__), 'data', 'yahoo_spark_v8.json')
+
+
+def _spark_response():
+    with open(SPARK_FILE) as f:
+        return json.load(f)
+
+
+def test_parse_yahoo_spark():
+    prices_by_ticker = prices.parse_yahoo_spark(_spark_response(), ['VTCLX', 'VIG', 'VSEQX', 'VYM'])
+
+    # Trailing nulls are skipped; symbols without a close are left out
+    assert prices_by_ticker == {'VTCLX': 338.91, 'VIG': 212.4}
+
+
+def test_spark_misses_go_through_the_limiter(monkeypatch):
+    requests = []
+    limited = []
+
+    def get_json(url, params=None, **kwargs):
+        requests.append(url)
+        return _spark_response()
+
+    def fetch_one(ticker):
+        requests.append(ticker)
+        return 50.0
+
+    real_fetch_quote = prices.fetch_quote
+
+    def fetch_quote(symbol, provider):
+        limited.append(symbol)
+        return real_fetch_quote(symbol, provider)
+
+    monkeypatch.setattr(prices.http_client, 'get_json', get_json)
+    monkeypatch.setitem(prices.PROVIDERS, 'yahoo', fetch_one)
+    monkeypatch.setattr(prices, 'fetch_quote', fetch_quote)
+    monkeypatch.setattr(prices, '_batch_failed_at', {})
+
+    result = prices.fetch_quotes(['VTCLX', 'VIG', 'VSEQX'], 'yahoo')
+
+    assert result == {'VTCLX': 338.91, 'VIG': 212.4, 'VSEQX': 50.0}
+    assert len(requests) == 2 and limited == ['VSEQX']
+
+
+def test_failed_batch_is_skipped_on_later_refreshes(monkeypatch):
+    batches = []
+
+    def get_json(url, params=None, **kwargs):
+        batches.append(url)
+        raise OSError('spark unavailable')
+
+    monkeypatch.setattr(prices.http_client, 'get_json', get_json)
+    monkeypatch.setitem(prices.PROVIDERS, 'yahoo', lambda ticker: 10.0)
+    monkeypatch.setattr(prices, '_batch_failed_at', {})
+
+    assert prices.fetch_quotes(['VIG', 'VYM'], 'yahoo') == {'VIG': 10.0, 'VYM': 10.0}
+    assert prices.fetch_quotes(['VIG', 'VYM'], 'yahoo') == {'VIG': 10.0, 'VYM': 10.0}
+    assert len(batches) == 1
@@ -0,0 +1,150 @@
+import json
+
+import server
+
+
+def test_portfolio_is_serialized_with_orjson(monkeypatch):
+    calls = []
+    real_dumps = server.orjson.dumps
+
+    def spy(*args, **kwargs):
+        calls.append(args[0])
+        return real_dumps(*args, **kwargs)
+
+    monkeypatch.setattr(server.orjson, 'dumps', spy)
+    server._response_cache.clear()
+
+    response = server.app.test_client().get('/api/portfolio')
+
+    assert response.status_code == 200
+    assert any(isinstance(obj, dict) and 'totals' in obj for obj in calls)
+    assert response.get_json()['totals'] == server.app.json.loads(response.get_data())['totals']
+
+
+def test_usage_reads_through_data_layer(monkeypatch, tmp_path):
+    import data_layer
+
+    data_layer.DATA_DIR.mkdir(parents=True)
+    (data_layer.DATA_DIR / 'api_usage.json').write_text(
+        json.dumps([{'id': 'finnhub', 'name': 'Finnhub', 'cost_this_month': 1.5}]))
+    monkeypatch.setattr(server, 'DATA_DIR', str(tmp_path / 'elsewhere'))
+    server._response_cache.clear()
+
+    response = server.app.test_client().get('/api/usage')
+
+    assert response.status_code == 200
+    assert response.get_json()['apis']['finnhub']['name'] == 'Finnhub'
+    assert response.get_json()['total_cost'] == 1.5
+
+
+def test_usage_etag_and_body_change_together():
+    import data_layer
+
+    data_layer.DATA_DIR.mkdir(parents=True)
+    usage_file = data_layer.DATA_DIR / 'api_usage.json'
+    usage_file.write_text(json.dumps([{'id': 'finnhub', 'cost_this_month': 1.0}]))
+    server._response_cache.clear()
+    client = server.app.test_client()
+
+    first = client.get('/api/usage')
+    usage_file.write_text(json.dumps([{'id': 'finnhub', 'cost_this_month': 2.25}]))
+    second = client.get('/api/usage', headers={'If-None-Match': first.headers['ETag']})
+
+    assert second.status_code == 200
+    assert second.headers['ETag'] != first.headers['ETag']
+    assert second.get_json()['total_cost'] == 2.25
+
+
+def test_streamed_archive_matches_paged_order():
+    import data_layer
+
+    data_layer.ANALYSES_DIR.mkdir(parents=True)
+    for name, date in (('AAPL_1.json', '2026-09-01'), ('MSFT_1.json', '2026-10-01'), ('NVDA_1.json', '2026-08-01')):
+        (data_layer.ANALYSES_DIR / name).write_text(json.dumps(
+            {'ticker': name[:4], 'date': date, 'grade': 'B', 'summary': ''}))
+    client = server.app.test_client()
+
+    paged = [item['file'] for item in client.get('/api/analysis-archive').get_json()['items']]
+    streamed = [item['file'] for item in client.get('/api/analysis-archive?stream=1').get_json()]
+
+    assert paged == streamed == ['MSFT_1.json', 'AAPL_1.json', 'NVDA_1.json']
+    assert client.get('/api/analysis-archive?stream=1&sort=bogus').status_code == 400
+
+
+def test_streamed_body_matches_jsonify():
+    import data_layer
+
+    data_layer.DATA_DIR.mkdir(parents=True)
+    (data_layer.DATA_DIR / 'earnings.json').write_text(
+        '[{"ticker": "AAPL", "date": "2026-10-30", "eps_estimate": NaN, "notes": "caf\\u00e9"}]')
+    client = server.app.test_client()
+
+    streamed = client.get('/api/earnings-research?stream=1').get_data(as_text=True)
+    server._response_cache.clear()
+    full = client.get('/api/earnings-research').get_data(as_text=True)
+
+    assert streamed == full.rstrip('\n')
+
+
+def test_price_history_rejects_non_positive_points():
+    client = server.app.test_client()
+
+    assert client.get('/api/price-history/AAPL?points=0').status_code == 400
+    assert client.get('/api/price-history/AAPL?points=-5').status_code == 400
+    assert client.get('/api/price-history/AAPL?points=10').status_code == 200
+
+
+def test_live_delta_carries_the_registry_version():
+    import portfolio_versions
+    from valuation import PortfolioModel
+
+    holdings = {'accounts': [{'name': 'A', 'stocks_etfs': [{'Ticker': 'AAPL', 'Shares': 10}]}]}
+    model = PortfolioModel(holdings, {'AAPL': 200.0}, {})
+    since = model.version
+    model.sync({'AAPL': 210.0})
+
+    [(name, delta, _)] = server.portfolio_events(model, since)
+
+    assert name == 'portfolio'
+    assert delta['portfolio_version'] == portfolio_versions.register_view(model.snapshot()[1])
+
+
+def test_gzip_and_identity_bodies_have_distinct_etags():
+    import data_layer
+
+    data_layer.DATA_DIR.mkdir(parents=True)
+    (data_layer.DATA_DIR / 'api_usage.json').write_text(
+        json.dumps([{'id': f'api{i}', 'name': f'API {i}', 'cost_this_month': i} for i in range(100)]))
+    server._response_cache.clear()
+    client = server.app.test_client()
+
+    zipped = client.get('/api/usage', headers={'Accept-Encoding': 'gzip'})
+    plain = client.get('/api/usage', headers={'Accept-Encoding': 'identity'})
+    assert zipped.headers['Content-Encoding'] == 'gzip' and 'Content-Encoding' not in plain.headers
+    assert zipped.headers['ETag'] != plain.headers['ETag']
+
+    for first in (zipped, plain):
+        again = client.get('/api/usage', headers={'If-None-Match': first.headers['ETag'],
+                                                  'Accept-Encoding': first.headers.get('Content-Encoding', 'identity')})
+        assert again.status_code == 304
+        assert again.headers['ETag'] == first.headers['ETag']
+        assert 'Accept-Encoding' in again.headers['Vary']
+
+
+def test_content_etag_differs_per_encoding(monkeypatch):
+    history = {'time': list(range(500)), 'price': [100.0] * 500, 'source': ['yahoo'] * 500}
+    monkeypatch.setattr(server.price_history, 'read_range', lambda *args: history)
+    client = server.app.test_client()
+
+    zipped = client.get('/api/price-history/AAPL?kind=stocks', headers={'Accept-Encoding': 'gzip'})
+    plain = client.get('/api/price-history/AAPL?kind=stocks', headers={'Accept-Encoding': 'identity'})
+    assert zipped.headers['Content-Encoding'] == 'gzip' and 'Content-Encoding' not in plain.headers
+    assert zipped.headers['ETag'] != plain.headers['ETag']
+
+    again = client.get('/api/price-history/AAPL?kind=stocks',
+                       headers={'If-None-Match': zipped.headers['ETag'], 'Accept-Encoding': 'gzip'})
+    assert again.status_code == 304
+    assert 'Accept-Encoding' in again.headers['Vary']
+    stale = client.get('/api/price-history/AAPL?kind=stocks',
+                       headers={'If-None-Match': plain.headers['ETag'], 'Accept-Encoding': 'gzip'})
+    assert stale.status_code == 200 and stale.headers['Content-Encoding'] == 'gzip'
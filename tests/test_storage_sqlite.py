@@ -0,0 +1,50 @@
+import json
+
+import data_layer
+import storage_sqlite
+
+
+def _sqlite_store(monkeypatch, tmp_path):
+    store = storage_sqlite.SQLiteStore(tmp_path / 'mission_control.db')
+    monkeypatch.setattr(data_layer, '_store', store)
+    monkeypatch.setattr(data_layer, 'DOCUMENT_FILES', storage_sqlite.DOCUMENT_FILES)
+    return store
+
+
+def _write_sources(tmp_path):
+    source = tmp_path / 'source'
+    (source / 'analyses').mkdir(parents=True)
+    (source / 'schedule.json').write_text(json.dumps({'events': [{'id': '1', 'date': '2026-11-04', 'title': 'FOMC'}]}))
+    for ticker in ('AAPL', 'MSFT', 'NVDA'):
+        (source / 'analyses' / f'{ticker}_2026-10-01.json').write_text(json.dumps(
+            {'ticker': ticker, 'date': '2026-10-01', 'grade': 'B', 'summary': ticker}))
+    return source
+
+
+def test_import_is_one_transaction(monkeypatch, tmp_path):
+    store = _sqlite_store(monkeypatch, tmp_path)
+    source = _write_sources(tmp_path)
+
+    counts = store.import_json(source, source / 'analyses')
+
+    assert counts == {'schedule': 1, 'analyses': 3}
+    assert store.analyses_version() == 1
+    assert store.version('schedule') == 1
+
+
+def test_unchanged_documents_are_served_from_cache(monkeypatch, tmp_path):
+    store = _sqlite_store(monkeypatch, tmp_path)
+    source = _write_sources(tmp_path)
+    store.import_json(source, source / 'analyses')
+
+    loads = []
+    real_load = store.load_document
+    monkeypatch.setattr(store, 'load_document', lambda domain: loads.append(domain) or real_load(domain))
+
+    first = data_layer.load_schedule()
+    assert data_layer.load_schedule() is first
+    assert loads == ['schedule']
+
+    store.save_document('schedule', {'events': []})
+    assert data_layer.load_schedule() == {'events': []}
+    assert loads == ['schedule', 'schedule']
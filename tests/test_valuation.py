@@ -0,0 +1,28 @@
+from datetime import date
+
+from valuation import PortfolioModel
+
+TODAY = date(2026, 1, 5)
+
+HOLDINGS = {
+    'accounts': [{
+        'name': 'A',
+        'options': [{'Ticker': 'AAPL', 'Type': 'CALL', 'Strike': 150, 'Expiration': '2027-01-15',
+                     'Contracts': 1, 'Entry Premium': 1.0}],
+    }],
+}
+
+
+def test_spot_going_missing_matches_rebuild():
+    model = PortfolioModel(HOLDINGS, {'AAPL': 200.0}, {}, today=TODAY)
+    assert model.view['options'][0]['pricing'] == 'black_scholes'
+
+    model.sync({})
+    rebuilt = PortfolioModel(HOLDINGS, {}, {}, today=TODAY)
+
+    row = model.view['options'][0]
+    assert row['pricing'] == 'entry_premium'
+    assert row['current_value'] == row['total_entry_value'] == 100.0
+    assert model.view['options'] == rebuilt.view['options']
+    assert model.view['totals'] == rebuilt.view['totals']
+    assert model.view['account_totals'] == rebuilt.view['account_totals']
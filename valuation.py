@@ -0,0 +1,699 @@
+"""
+Mission Control Portfolio Valuation
+
+Turns holdings data plus a price map into the Holdings tab view (stocks
+aggregated by ticker, options, cash, misc and totals).
+
+With NumPy the positions are loaded into columns once, prices are joined by
+symbol index, and values, returns and totals are computed array-wide. Without
+NumPy the original per-position loops are used. Both produce the same output:
+sums accumulate in holdings order, and values that the loops would leave as
+ints stay ints. Options are marked to model by option_pricing in both.
+"""
+
+import threading
+from datetime import date
+
+from option_pricing import mark_positions
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+def _is_int(value):
+    return type(value) is int
+
+
+# ============================================================================
+# LOOP IMPLEMENTATION (fallback)
+# ============================================================================
+
+def _spot_lookup(prices, price_constants):
+    """Underlying price for option marks: cache, then constants, else unknown"""
+    return lambda ticker: prices.get(ticker, price_constants.get(ticker, -1))
+
+
+def _value_holdings_loops(accounts, prices, price_constants, today=None):
+    """Per-position valuation; the reference behaviour for value_holdings"""
+    # Aggregate stocks across accounts
+    stocks_map = {}
+    options_list = []
+    cash_data = {'Cash': {'total': 0, 'accounts': []}, 'SGOV': {'total': 0, 'total_shares': 0, 'accounts': [], 'price': 100.0}}
+    misc_total = 0
+
+    for account in accounts:
+        account_name = account.get('name', 'Unknown')
+
+        # Process stocks
+        for stock in account.get('stocks_etfs', []):
+            ticker = stock.get('Ticker', '')
+            shares = stock.get('Shares', 0)
+            cost_basis = stock.get('Cost Basis', 0)
+
+            if ticker not in stocks_map:
+                stocks_map[ticker] = {
+                    'ticker': ticker,
+                    'total_shares': 0,
+                    'total_cost_basis': 0,
+                    'total_value': 0,
+                    'price': prices.get(ticker, price_constants.get(ticker, -1)),  # Check cache, then constants, then error
+                    'accounts': []
+                }
+
+            stocks_map[ticker]['total_shares'] += shares
+            stocks_map[ticker]['total_cost_basis'] += cost_basis
+            stocks_map[ticker]['accounts'].append({
+                'account': account_name,
+                'shares': shares,
+                'cost_basis': cost_basis
+            })
+
+        # Process options - preserve sign for short positions
+        for opt in account.get('options', []):
+            contracts = opt.get('Contracts', 0)  # Don't use abs() - preserve sign
+            premium = opt.get('Entry Premium', 0)
+            # For short options (negative contracts), value is negative (obligation)
+            # For long options (positive contracts), value is positive (asset)
+            notional_value = contracts * premium * 100
+            options_list.append({
+                'ticker': opt.get('Ticker', ''),
+                'type': opt.get('Type', 'PUT'),
+                'strike': opt.get('Strike', 0),
+                'expiration': opt.get('Expiration', ''),
+                'total_contracts': contracts,  # Preserve negative for short
+                'total_entry_value': notional_value,
+                'current_value': notional_value,  # Replaced by the model mark below when it can be priced
+                'accounts': [{'account': account_name, 'contracts': contracts, 'entry_premium': premium}],
+                'note': f"{contracts} contracts @ ${premium}"
+            })
+
+        # Process cash
+        for cash_item in account.get('cash', []):
+            asset = cash_item.get('Asset', 'Cash')
+            qty = cash_item.get('Quantity', 0)
+            if asset == 'Cash':
+                cash_data['Cash']['total'] += qty
+                cash_data['Cash']['accounts'].append({'account': account_name, 'value': qty})
+            elif asset == 'SGOV':
+                cash_data['SGOV']['total'] += qty * 100  # Assuming $100/share
+                cash_data['SGOV']['total_shares'] += qty
+                cash_data['SGOV']['accounts'].append({'account': account_name, 'value': qty * 100})
+
+    # Process misc assets (crypto, etc.) with live prices
+    misc_list = []
+    for account in accounts:
+        account_name = account.get('name', 'Unknown')
+        for misc in account.get('misc', []):
+            asset = misc.get('Asset', '')
+            amount = misc.get('Amount', 0)
+            cost_basis = misc.get('Cost Basis', 0)
+            asset_type = misc.get('Type', 'Other')
+
+            # Get live price if available
+            price = prices.get(asset, 0)
+            current_value = amount * price if price > 0 else cost_basis
+
+            misc_list.append({
+                'asset': asset,
+                'type': asset_type,
+                'amount': amount,
+                'price': price,
+                'cost_basis': cost_basis,
+                'current_value': current_value,
+                'account': account_name
+            })
+
+    misc_total = sum(m['current_value'] for m in misc_list)
+
+    # Calculate stock values and returns
+    stocks_list = []
+    for stock in stocks_map.values():
+        stock['total_value'] = stock['total_shares'] * stock['price']
+        cost_per_share = stock['total_cost_basis'] / stock['total_shares'] if stock['total_shares'] > 0 else 0
+        stock['total_return_pct'] = ((stock['price'] - cost_per_share) / cost_per_share * 100) if cost_per_share > 0 else 0
+        stocks_list.append(stock)
+
+    # Mark options to model against underlying prices
+    greeks = mark_positions(options_list, _spot_lookup(prices, price_constants), today)
+
+    # Calculate totals
+    stocks_total = sum(s['total_value'] for s in stocks_list)
+    options_total = sum(o['current_value'] for o in options_list)
+    cash_total = cash_data['Cash']['total'] + cash_data['SGOV']['total']
+
+    return {
+        'stocks': stocks_list,
+        'options': options_list,
+        'cash': cash_data,
+        'misc': misc_list,
+        'totals': {
+            'stocks_etfs': stocks_total,
+            'options': options_total,
+            'cash_equivalents': cash_total,
+            'misc': misc_total,
+            'grand_total': stocks_total + options_total + cash_total + misc_total
+        },
+        'greeks': greeks
+    }
+
+# ============================================================================
+# COLUMNAR IMPLEMENTATION
+# ============================================================================
+
+class HoldingsColumns:
+    """
+    Holdings positions as parallel columns.
+
+    Built once per holdings document by load_columns(); value() can then be
+    re-run against any price map without walking the accounts again.
+    """
+
+    def __init__(self):
+        # Stocks: one row per lot, grouped by ticker in first-seen order
+        self.tickers = []
+        self.ticker_lots = []       # per ticker: [{'account', 'shares', 'cost_basis'}]
+        self.lot_ticker = []        # per lot: ticker index
+        self.lot_shares = []
+        self.lot_cost = []
+        # Options: one row per position
+        self.options = []           # per option: static fields
+        self.opt_contracts = []
+        self.opt_premium = []
+        # Cash: Cash and SGOV rows
+        self.cash_rows = []         # (asset, account, qty)
+        # Misc: one row per asset holding
+        self.misc = []              # per row: static fields
+        self.misc_amount = []
+        self.misc_cost = []
+
+    def finish(self):
+        """Convert numeric columns to arrays and record which sums stay ints"""
+        self.n_tickers = len(self.tickers)
+        self.lot_ticker = np.asarray(self.lot_ticker, dtype=np.intp)
+        # A ticker's totals stay ints when every lot's value was an int
+        self.shares_int = self._group_all_int(self.lot_shares)
+        self.cost_int = self._group_all_int(self.lot_cost)
+        self.lot_shares = np.asarray(self.lot_shares, dtype=np.float64)
+        self.lot_cost = np.asarray(self.lot_cost, dtype=np.float64)
+
+        self.opt_int = [_is_int(c) and _is_int(p) for c, p in zip(self.opt_contracts, self.opt_premium)]
+        self.opt_contracts = np.asarray(self.opt_contracts, dtype=np.float64)
+        self.opt_premium = np.asarray(self.opt_premium, dtype=np.float64)
+
+        self.misc_amount_int = [_is_int(a) for a in self.misc_amount]
+        self.misc_cost_int = [_is_int(c) for c in self.misc_cost]
+        self.misc_amount = np.asarray(self.misc_amount, dtype=np.float64)
+        self.misc_cost = np.asarray(self.misc_cost, dtype=np.float64)
+        return self
+
+    def _group_all_int(self, values):
+        non_int = np.bincount(self.lot_ticker, weights=[0.0 if type(v) is int else 1.0 for v in values],
+                              minlength=self.n_tickers)
+        return non_int == 0
+
+    def value(self, prices, price_constants, today=None):
+        """
+        Value every position against a price map; same result as the loops.
+
+        Per-lot account entries are shared with the columns rather than
+        copied, so treat the returned view as read-only.
+        """
+        # Stocks: per-ticker sums (bincount adds in lot order, like the loop)
+        n = self.n_tickers
+        ticker_price_raw = [prices.get(t, price_constants.get(t, -1)) for t in self.tickers]
+        ticker_price = np.asarray(ticker_price_raw, dtype=np.float64)
+        price_int = np.asarray([_is_int(p) for p in ticker_price_raw], dtype=bool)
+        total_shares = np.bincount(self.lot_ticker, weights=self.lot_shares, minlength=n)
+        total_cost = np.bincount(self.lot_ticker, weights=self.lot_cost, minlength=n)
+        total_value = total_shares * ticker_price
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cost_per_share = np.where(total_shares > 0, total_cost / total_shares, 0.0)
+            return_pct = np.where(cost_per_share > 0, (ticker_price - cost_per_share) / cost_per_share * 100, 0.0)
+        value_int = self.shares_int & price_int
+        return_int = ~(cost_per_share > 0)
+
+        stocks_list = []
+        for i, ticker in enumerate(self.tickers):
+            stocks_list.append({
+                'ticker': ticker,
+                'total_shares': _num(total_shares[i], self.shares_int[i]),
+                'total_cost_basis': _num(total_cost[i], self.cost_int[i]),
+                'total_value': _num(total_value[i], value_int[i]),
+                'price': ticker_price_raw[i],
+                'accounts': self.ticker_lots[i],
+                'total_return_pct': _num(return_pct[i], return_int[i]),
+            })
+
+        # Options at entry premium
+        notional = self.opt_contracts * self.opt_premium * 100
+        options_list = []
+        for i, opt in enumerate(self.options):
+            value = _num(notional[i], self.opt_int[i])
+            options_list.append({
+                'ticker': opt['ticker'],
+                'type': opt['type'],
+                'strike': opt['strike'],
+                'expiration': opt['expiration'],
+                'total_contracts': opt['total_contracts'],
+                'total_entry_value': value,
+                'current_value': value,  # Replaced by the model mark below when it can be priced
+                'accounts': [opt['account']],
+                'note': opt['note']
+            })
+
+        # Cash (a handful of rows; plain Python keeps the int/float mix exact)
+        cash_data = {'Cash': {'total': 0, 'accounts': []}, 'SGOV': {'total': 0, 'total_shares': 0, 'accounts': [], 'price': 100.0}}
+        for asset, account_name, qty in self.cash_rows:
+            if asset == 'Cash':
+                cash_data['Cash']['total'] += qty
+                cash_data['Cash']['accounts'].append({'account': account_name, 'value': qty})
+            else:
+                cash_data['SGOV']['total'] += qty * 100
+                cash_data['SGOV']['total_shares'] += qty
+                cash_data['SGOV']['accounts'].append({'account': account_name, 'value': qty * 100})
+
+        # Misc: live price where available, otherwise cost basis
+        misc_price_raw = [prices.get(m['asset'], 0) for m in self.misc]
+        misc_price = np.asarray(misc_price_raw, dtype=np.float64)
+        priced = misc_price > 0
+        misc_value = np.where(priced, self.misc_amount * misc_price, self.misc_cost)
+        misc_list = []
+        for i, m in enumerate(self.misc):
+            is_int = (self.misc_amount_int[i] and _is_int(misc_price_raw[i])) if priced[i] else self.misc_cost_int[i]
+            misc_list.append({
+                'asset': m['asset'],
+                'type': m['type'],
+                'amount': m['amount'],
+                'price': misc_price_raw[i],
+                'cost_basis': m['cost_basis'],
+                'current_value': _num(misc_value[i], is_int),
+                'account': m['account']
+            })
+
+        stocks_total = _seq_sum(total_value, value_int)
+        greeks = mark_positions(options_list, _spot_lookup(prices, price_constants), today)
+        options_total = sum(o['current_value'] for o in options_list)
+        cash_total = cash_data['Cash']['total'] + cash_data['SGOV']['total']
+        misc_total = sum(m['current_value'] for m in misc_list)
+
+        return {
+            'stocks': stocks_list,
+            'options': options_list,
+            'cash': cash_data,
+            'misc': misc_list,
+            'totals': {
+                'stocks_etfs': stocks_total,
+                'options': options_total,
+                'cash_equivalents': cash_total,
+                'misc': misc_total,
+                'grand_total': stocks_total + options_total + cash_total + misc_total
+            },
+            'greeks': greeks
+        }
+
+
+def _num(value, is_int):
+    """NumPy scalar -> Python int/float, matching what the loop would produce"""
+    return int(value) if is_int else float(value)
+
+
+def _seq_sum(values, int_mask):
+    """Left-to-right sum (like sum()), an int when every term is an int"""
+    if len(values) == 0:
+        return 0
+    # cumsum adds strictly left to right; the leading 0.0 mirrors sum()'s
+    # start value (so -0.0 terms normalise the same way)
+    total = float(np.cumsum(np.concatenate(([0.0], values)))[-1])
+    return int(total) if all(int_mask) else total
+
+
+def load_columns(accounts):
+    """Load holdings accounts into a HoldingsColumns (requires NumPy)"""
+    cols = HoldingsColumns()
+    ticker_index = {}
+
+    for account in accounts:
+        account_name = account.get('name', 'Unknown')
+
+        for stock in account.get('stocks_etfs', []):
+            ticker = stock.get('Ticker', '')
+            shares = stock.get('Shares', 0)
+            cost_basis = stock.get('Cost Basis', 0)
+            idx = ticker_index.get(ticker)
+            if idx is None:
+                idx = ticker_index[ticker] = len(cols.tickers)
+                cols.tickers.append(ticker)
+                cols.ticker_lots.append([])
+            cols.lot_ticker.append(idx)
+            cols.lot_shares.append(shares)
+            cols.lot_cost.append(cost_basis)
+            cols.ticker_lots[idx].append({'account': account_name, 'shares': shares, 'cost_basis': cost_basis})
+
+        for opt in account.get('options', []):
+            contracts = opt.get('Contracts', 0)
+            premium = opt.get('Entry Premium', 0)
+            cols.opt_contracts.append(contracts)
+            cols.opt_premium.append(premium)
+            cols.options.append({
+                'ticker': opt.get('Ticker', ''),
+                'type': opt.get('Type', 'PUT'),
+                'strike': opt.get('Strike', 0),
+                'expiration': opt.get('Expiration', ''),
+                'total_contracts': contracts,
+                'account': {'account': account_name, 'contracts': contracts, 'entry_premium': premium},
+                'note': f"{contracts} contracts @ ${premium}"
+            })
+
+        for cash_item in account.get('cash', []):
+            asset = cash_item.get('Asset', 'Cash')
+            if asset in ('Cash', 'SGOV'):
+                cols.cash_rows.append((asset, account_name, cash_item.get('Quantity', 0)))
+
+    for account in accounts:
+        account_name = account.get('name', 'Unknown')
+        for misc in account.get('misc', []):
+            amount = misc.get('Amount', 0)
+            cost_basis = misc.get('Cost Basis', 0)
+            cols.misc_amount.append(amount)
+            cols.misc_cost.append(cost_basis)
+            cols.misc.append({
+                'asset': misc.get('Asset', ''),
+                'type': misc.get('Type', 'Other'),
+                'amount': amount,
+                'cost_basis': cost_basis,
+                'account': account_name
+            })
+
+    return cols.finish()
+
+# ============================================================================
+# PUBLIC API
+# ============================================================================
+
+_columns_cache = (None, None)
+
+
+def value_holdings(holdings, prices, price_constants, version=None, today=None):
+    """
+    Build the Holdings tab view.
+
+    Args:
+        holdings: Holdings data as returned by load_holdings
+        prices: Dict of symbol -> latest price
+        price_constants: Fallback prices for symbols missing from prices
+        version: Optional key identifying this holdings document (e.g. the
+            source file's mtime/size); when it matches the previous call the
+            columns are reused instead of reloaded
+        today: Valuation date for option marks (defaults to today)
+
+    Returns:
+        Dict with 'stocks', 'options', 'cash', 'misc', 'totals' and
+        'greeks' (portfolio option greeks).
+    """
+    global _columns_cache
+    accounts = holdings.get('accounts', [])
+    if not HAS_NUMPY:
+        return _value_holdings_loops(accounts, prices, price_constants, today)
+
+    cached_version, columns = _columns_cache
+    if version is None or version != cached_version:
+        columns = load_columns(accounts)
+        if version is not None:
+            _columns_cache = (version, columns)
+    return columns.value(prices, price_constants, today)
+
+# ============================================================================
+# INCREMENTAL MODEL
+# ============================================================================
+
+# A PortfolioModel holds the last computed view and adjusts it in place of a
+# full revaluation when only prices move: each changed symbol touches its own
+# stock/misc rows, the options written on it, the accounts holding them and
+# the totals. Option marks depend on the date, so a new day rebuilds too. Views are
+# copy-on-write, so a view handed to a request is never modified afterwards.
+# Totals are adjusted by differences and can drift from a full revaluation in
+# the last few bits; any holdings change rebuilds the model from scratch.
+
+MODEL_DELTA_HISTORY = 100
+
+
+def _account_totals_row():
+    return {'stocks_etfs': 0, 'options': 0, 'cash_equivalents': 0, 'misc': 0, 'total': 0}
+
+
+def _stock_row_at(row, price):
+    """Revalue one aggregated stock row at a new price (same formulas as the loops)"""
+    row = dict(row)
+    row['price'] = price
+    row['total_value'] = row['total_shares'] * price
+    cost_per_share = row['total_cost_basis'] / row['total_shares'] if row['total_shares'] > 0 else 0
+    row['total_return_pct'] = ((price - cost_per_share) / cost_per_share * 100) if cost_per_share > 0 else 0
+    return row
+
+
+def _option_greeks(row):
+    """A marked option row's contribution to the portfolio greeks"""
+    contribution = dict(row['greeks'])
+    contribution['delta_dollars'] = row['greeks']['delta'] * row['underlying_price'] if row['pricing'] == 'black_scholes' else 0.0
+    return contribution
+
+
+def _misc_row_at(row, price):
+    row = dict(row)
+    row['price'] = price
+    row['current_value'] = row['amount'] * price if price > 0 else row['cost_basis']
+    return row
+
+
+class PortfolioModel:
+    """
+    Maintained portfolio view with per-ticker, per-account and grand totals.
+
+    version increases by one per change (rebuild or price update); deltas for
+    recent versions are kept for changes_since().
+    """
+
+    def __init__(self, holdings, prices, price_constants, holdings_version=None, version=1, today=None):
+        self.holdings_version = holdings_version
+        self.price_constants = dict(price_constants)
+        self.valuation_date = today or date.today()
+        self.version = version
+        self.rebuilt_at = version
+        self._deltas = []  # [(version, delta)], oldest first
+        self._lock = threading.RLock()
+
+        view = value_holdings(holdings, prices, price_constants, version=holdings_version,
+                              today=self.valuation_date)
+        self.stock_index = {row['ticker']: i for i, row in enumerate(view['stocks'])}
+        self.option_index = {}
+        for i, row in enumerate(view['options']):
+            self.option_index.setdefault(row['ticker'], []).append(i)
+        self.misc_index = {}
+        for i, row in enumerate(view['misc']):
+            self.misc_index.setdefault(row['asset'], []).append(i)
+
+        # Per-account totals, plus which accounts hold each ticker
+        accounts = {}
+        self.ticker_accounts = []
+        for row in view['stocks']:
+            holders = []
+            for lot in row['accounts']:
+                accounts.setdefault(lot['account'], _account_totals_row())['stocks_etfs'] += lot['shares'] * row['price']
+                holders.append((lot['account'], lot['shares']))
+            self.ticker_accounts.append(holders)
+        for row in view['options']:
+            for lot in row['accounts']:
+                accounts.setdefault(lot['account'], _account_totals_row())['options'] += row['current_value']
+        for cash in view['cash'].values():
+            for lot in cash['accounts']:
+                accounts.setdefault(lot['account'], _account_totals_row())['cash_equivalents'] += lot['value']
+        for row in view['misc']:
+            accounts.setdefault(row['account'], _account_totals_row())['misc'] += row['current_value']
+        for totals in accounts.values():
+            totals['total'] = totals['stocks_etfs'] + totals['options'] + totals['cash_equivalents'] + totals['misc']
+        view['account_totals'] = accounts
+        self.view = view
+
+    def stock_price(self, ticker, prices):
+        return prices.get(ticker, self.price_constants.get(ticker, -1))
+
+    def sync(self, prices):
+        """
+        Bring the model up to date with a full price map.
+
+        Only symbols whose effective price differs are applied.
+
+        Returns:
+            The delta dict, or None if nothing changed.
+        """
+        with self._lock:
+            return self._apply(*self._changed_prices(prices))
+
+    def _changed_prices(self, prices):
+        stocks = self.view['stocks']
+        options = self.view['options']
+        misc = self.view['misc']
+        stock_prices = {}
+        for ticker, i in self.stock_index.items():
+            price = self.stock_price(ticker, prices)
+            if price != stocks[i]['price']:
+                stock_prices[ticker] = price
+        option_spots = {}
+        for ticker, rows in self.option_index.items():
+            spot = self.stock_price(ticker, prices)
+            if spot != options[rows[0]]['underlying_price']:
+                option_spots[ticker] = spot
+        misc_prices = {}
+        for asset, rows in self.misc_index.items():
+            price = prices.get(asset, 0)
+            if price != misc[rows[0]]['price']:
+                misc_prices[asset] = price
+        return stock_prices, option_spots, misc_prices
+
+    def apply_prices(self, changed):
+        """
+        Apply price ticks for a few symbols, in O(changed symbols).
+
+        Args:
+            changed: Dict of symbol -> new price
+
+        Returns:
+            The delta dict, or None if nothing changed.
+        """
+        with self._lock:
+            view = self.view
+            stock_prices = {s: p for s, p in changed.items()
+                            if s in self.stock_index and p != view['stocks'][self.stock_index[s]]['price']}
+            option_spots = {s: p for s, p in changed.items()
+                            if s in self.option_index and p != view['options'][self.option_index[s][0]]['underlying_price']}
+            misc_prices = {s: p for s, p in changed.items()
+                           if s in self.misc_index and p != view['misc'][self.misc_index[s][0]]['price']}
+            return self._apply(stock_prices, option_spots, misc_prices)
+
+    def _apply(self, stock_prices, option_spots, misc_prices):
+        if not stock_prices and not option_spots and not misc_prices:
+            return None
+
+        old = self.view
+        stocks = list(old['stocks'])
+        options = list(old['options'])
+        misc = list(old['misc'])
+        totals = dict(old['totals'])
+        greeks = dict(old['greeks'])
+        accounts = dict(old['account_totals'])
+        changed_accounts = set()
+
+        def account_row(name):
+            if name not in changed_accounts:
+                accounts[name] = dict(accounts[name])
+                changed_accounts.add(name)
+            return accounts[name]
+
+        delta_stocks = {}
+        for ticker, price in stock_prices.items():
+            i = self.stock_index[ticker]
+            before = stocks[i]
+            after = stocks[i] = _stock_row_at(before, price)
+            totals['stocks_etfs'] += after['total_value'] - before['total_value']
+            for name, shares in self.ticker_accounts[i]:
+                account_row(name)['stocks_etfs'] += shares * price - shares * before['price']
+            delta_stocks[ticker] = after
+
+        delta_options = {}
+        for ticker, spot in option_spots.items():
+            rows = self.option_index[ticker]
+            before = [options[i] for i in rows]
+            after = [dict(row) for row in before]
+            mark_positions(after, lambda _: spot, self.valuation_date)
+            for i, b, a in zip(rows, before, after):
+                options[i] = delta_options[i] = a
+                totals['options'] += a['current_value'] - b['current_value']
+                for lot in a['accounts']:
+                    account_row(lot['account'])['options'] += a['current_value'] - b['current_value']
+                for name, value in _option_greeks(a).items():
+                    greeks[name] += value
+                for name, value in _option_greeks(b).items():
+                    greeks[name] -= value
+
+        delta_misc = {}
+        for asset, price in misc_prices.items():
+            for i in self.misc_index[asset]:
+                before = misc[i]
+                after = misc[i] = _misc_row_at(before, price)
+                totals['misc'] += after['current_value'] - before['current_value']
+                account_row(after['account'])['misc'] += after['current_value'] - before['current_value']
+                delta_misc[i] = after
+
+        for name in changed_accounts:
+            row = accounts[name]
+            row['total'] = row['stocks_etfs'] + row['options'] + row['cash_equivalents'] + row['misc']
+        totals['grand_total'] = totals['stocks_etfs'] + totals['options'] + totals['cash_equivalents'] + totals['misc']
+
+        self.view = dict(old, stocks=stocks, options=options, misc=misc, totals=totals,
+                         greeks=greeks, account_totals=accounts)
+        self.version += 1
+        delta = {
+            'version': self.version,
+            'stocks': delta_stocks,
+            'options': delta_options,
+            'misc': delta_misc,
+            'accounts': {name: accounts[name] for name in changed_accounts},
+            'totals': totals,
+            'greeks': greeks,
+        }
+        self._deltas.append((self.version, delta))
+        del self._deltas[:-MODEL_DELTA_HISTORY]
+        return delta
+
+    def snapshot(self):
+        """Return (version, view) as one consistent pair; treat the view as read-only"""
+        with self._lock:
+            return self.version, self.view
+
+    def changes_since(self, version):
+        """
+        Merge every delta after version into one.
+
+        Returns:
+            The merged delta, an empty delta if version is current, or None if
+            version predates the last rebuild or the kept history.
+        """
+        with self._lock:
+            if version < self.rebuilt_at or version > self.version:
+                return None
+            deltas = [d for v, d in self._deltas if v > version]
+            if len(deltas) != self.version - version:
+                return None
+            merged = {'version': self.version, 'stocks': {}, 'options': {}, 'misc': {}, 'accounts': {},
+                      'totals': self.view['totals'], 'greeks': self.view['greeks']}
+            for delta in deltas:
+                for key in ('stocks', 'options', 'misc', 'accounts'):
+                    merged[key].update(delta[key])
+            return merged
+
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_portfolio_model(holdings, prices, price_constants, holdings_version=None):
+    """
+    This process's PortfolioModel, synced to the given holdings and prices.
+
+    The model is rebuilt when holdings_version, PRICE_CONSTANTS or the date
+    changes, or when no holdings_version is given; otherwise only changed
+    prices are applied.
+    """
+    global _model
+    with _model_lock:
+        model = _model
+        if (model is None or holdings_version is None or model.holdings_version != holdings_version
+                or model.price_constants != price_constants or model.valuation_date != date.today()):
+            next_version = model.version + 1 if model is not None else 1
+            model = _model = PortfolioModel(holdings, prices, price_constants, holdings_version, version=next_version)
+        else:
+            model.sync(prices)
+        return model